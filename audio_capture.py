@@ -0,0 +1,128 @@
+import asyncio
+import time
+from collections import deque, namedtuple
+
+# One captured buffer: raw int16 PCM plus when it was captured.
+# captured_at is time.monotonic() in the callback; stream_time is the
+# offset of the first sample from the start of capture, in seconds.
+CapturedFrame = namedtuple('CapturedFrame', ['data', 'index', 'captured_at', 'stream_time'])
+
+class AudioCapture:
+    """Microphone capture decoupled from the asyncio loop.
+
+    PyAudio runs in callback mode, so PortAudio's own thread delivers each
+    buffer and appends it to a bounded ring. The asyncio side awaits frames
+    with read() - no blocking read and no polling sleep on the event loop.
+    If the consumer falls behind, the oldest frame is dropped and counted.
+    """
+
+    def __init__(self, rate=16000, frames_per_buffer=1024, channels=1, capacity=64):
+        self.rate = rate
+        self.frames_per_buffer = frames_per_buffer
+        self.channels = channels
+        self.capacity = capacity
+
+        self._pa = None
+        self.pyaudio = None
+        self.stream = None
+        self.loop = None
+        self.is_running = False
+
+        # Bounded SPSC ring: the callback thread only appends, the loop only pops;
+        # on overflow append() itself evicts the oldest frame (maxlen), so the two never pop at once
+        self._frames = deque(maxlen=capacity)
+        self._frame_ready = None
+
+        # Counters
+        self.frames_captured = 0
+        self.ring_overflows = 0      # frames dropped because the consumer fell behind
+        self.input_overflows = 0     # PortAudio reported input overflow (driver dropped audio)
+        self.input_underflows = 0    # PortAudio reported input underflow
+        self.max_backlog = 0
+
+    def start(self, loop=None):
+        """Open the input stream in callback mode and start capturing"""
+        self.loop = loop or asyncio.get_running_loop()
+        self._frame_ready = asyncio.Event()
+        self.is_running = True
+
+        # Imported here so CapturedFrame users (replay, servers) don't need PortAudio
+        import pyaudio
+        self._pa = pyaudio
+
+        self.pyaudio = pyaudio.PyAudio()
+        self.stream = self.pyaudio.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.rate,
+            input=True,
+            frames_per_buffer=self.frames_per_buffer,
+            stream_callback=self._on_audio
+        )
+        self.stream.start_stream()
+
+    def _on_audio(self, in_data, frame_count, time_info, status_flags):
+        """PortAudio callback (capture thread): push the buffer into the ring"""
+        captured_at = time.monotonic()
+        pyaudio = self._pa
+        if status_flags & pyaudio.paInputOverflow:
+            self.input_overflows += 1
+        if status_flags & pyaudio.paInputUnderflow:
+            self.input_underflows += 1
+
+        frame = CapturedFrame(in_data, self.frames_captured, captured_at,
+                              self.frames_captured * self.frames_per_buffer / self.rate)
+        self.frames_captured += 1
+
+        if len(self._frames) == self.capacity:
+            self.ring_overflows += 1
+        self._frames.append(frame)
+        self.max_backlog = max(self.max_backlog, len(self._frames))
+
+        try:
+            self.loop.call_soon_threadsafe(self._frame_ready.set)
+        except RuntimeError:
+            pass  # Event loop already closed during shutdown
+
+        return (None, pyaudio.paContinue if self.is_running else pyaudio.paComplete)
+
+    async def read(self):
+        """Wait for the next captured frame; returns None once capture has stopped"""
+        while not self._frames:
+            if not self.is_running:
+                return None
+            self._frame_ready.clear()
+            if self._frames:
+                break
+            await self._frame_ready.wait()
+        return self._frames.popleft()
+
+    def backlog(self):
+        """Number of captured frames waiting to be consumed"""
+        return len(self._frames)
+
+    def get_stats(self):
+        """Capture counters for logging"""
+        return {
+            'frames_captured': self.frames_captured,
+            'ring_overflows': self.ring_overflows,
+            'input_overflows': self.input_overflows,
+            'input_underflows': self.input_underflows,
+            'max_backlog': self.max_backlog,
+        }
+
+    def stop(self):
+        """Stop capturing, wake any pending read() and release PortAudio"""
+        self.is_running = False
+        if self.loop and self._frame_ready:
+            try:
+                self.loop.call_soon_threadsafe(self._frame_ready.set)
+            except RuntimeError:
+                pass
+        if self.stream:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+        if self.pyaudio:
+            self.pyaudio.terminate()
+            self.pyaudio = None
@@ -0,0 +1,119 @@
+import math
+import threading
+
+import numpy as np
+
+class AudioSpan:
+    """The audio behind one final result, with the Stage 1 features computed during pre-filtering"""
+
+    __slots__ = ('start', 'duration', 'offset', 'sample_rate', 'stream_time', 'samples', 'codes', 'energy', 'zcr')
+
+    def __init__(self, start, duration, offset, sample_rate, stream_time, samples, codes, energy, zcr):
+        self.start = start              # Deepgram stream time (seconds of audio it received)
+        self.duration = duration
+        self.offset = offset            # Deepgram stream time of the first sample
+        self.sample_rate = sample_rate
+        self.stream_time = stream_time  # capture stream time of each frame
+        self.samples = samples          # (frames, frame_len) int16
+        self.codes = codes              # STAGE1_* code of each frame from the pre-filter
+        self.energy = energy
+        self.zcr = zcr
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def data(self):
+        """The span as raw int16 PCM bytes"""
+        return self.samples.tobytes()
+
+    def clip(self, start, end):
+        """int16 samples for [start, end) on Deepgram's clock (e.g. one word), cut to the span"""
+        flat = self.samples.reshape(-1)
+        first = max(int((start - self.offset) * self.sample_rate), 0)
+        last = min(int((end - self.offset) * self.sample_rate), len(flat))
+        return flat[first:last] if last > first else flat[:0]
+
+class AudioHistory:
+    """Bounded ring of the frames sent to Deepgram, indexed by Deepgram's stream time.
+
+    Deepgram's result timestamps count seconds of audio it has received, which
+    falls behind capture time whenever the Stage 1 gate or the send gate holds
+    audio back. Frames are recorded in send order, so sent frame k covers
+    [k, k + 1) * frame_seconds on Deepgram's clock and a result's start/duration
+    maps to ring slots with two divisions. Stage 1 features computed by the
+    pre-filter are kept per captured frame (a second ring keyed by capture
+    index) and copied alongside each sent frame, so an utterance's Stage 1
+    verdict needs no new DSP.
+
+    The loop records frames while the listener thread reads spans, so both
+    sides hold a lock; span() copies its slots out before releasing it.
+    """
+
+    def __init__(self, seconds=60.0, frame_len=1024, sample_rate=16000):
+        self.frame_len = frame_len
+        self.sample_rate = sample_rate
+        self.frame_seconds = frame_len / sample_rate
+        self.capacity = math.ceil(seconds / self.frame_seconds)
+
+        # Sent frames; slot = sent frame number % capacity
+        self.samples = np.zeros((self.capacity, frame_len), dtype=np.int16)
+        self.stream_time = np.zeros(self.capacity, dtype=np.float64)
+        self.codes = np.zeros(self.capacity, dtype=np.int8)
+        self.energy = np.zeros(self.capacity, dtype=np.float32)
+        self.zcr = np.zeros(self.capacity, dtype=np.float32)
+        self.frames_sent = 0
+        self._lock = threading.Lock()
+
+        # Pre-filter features of recently captured frames; slot = capture index % capacity
+        self._feature_index = np.full(self.capacity, -1, dtype=np.int64)
+        self._feature_codes = np.zeros(self.capacity, dtype=np.int8)
+        self._feature_energy = np.zeros(self.capacity, dtype=np.float32)
+        self._feature_zcr = np.zeros(self.capacity, dtype=np.float32)
+
+    def record_features(self, index, code, energy, zcr):
+        """Stage 1 features of a captured frame, as the pre-filter computed them"""
+        slot = index % self.capacity
+        with self._lock:
+            self._feature_index[slot] = index
+            self._feature_codes[slot] = code
+            self._feature_energy[slot] = energy
+            self._feature_zcr[slot] = zcr
+
+    def record_sent(self, frames):
+        """Append frames (CapturedFrame-like) in the order they are sent"""
+        with self._lock:
+            for frame in frames:
+                samples = np.frombuffer(frame.data, dtype=np.int16)
+                if len(samples) != self.frame_len:
+                    continue  # odd-sized tail; would break the fixed-length clock
+                slot = self.frames_sent % self.capacity
+                self.samples[slot] = samples
+                self.stream_time[slot] = frame.stream_time
+
+                feature_slot = frame.index % self.capacity
+                if self._feature_index[feature_slot] == frame.index:
+                    self.codes[slot] = self._feature_codes[feature_slot]
+                    self.energy[slot] = self._feature_energy[feature_slot]
+                    self.zcr[slot] = self._feature_zcr[feature_slot]
+                else:
+                    self.codes[slot] = 0  # never analyzed: treat as passed
+                    self.energy[slot] = np.nan
+                    self.zcr[slot] = np.nan
+                self.frames_sent += 1
+
+    def span(self, start, duration):
+        """AudioSpan for [start, start + duration) on Deepgram's clock, or None if not held"""
+        if start is None or duration is None:
+            return None
+        with self._lock:
+            first = max(int(start / self.frame_seconds), self.frames_sent - self.capacity, 0)
+            last = min(math.ceil((start + duration) / self.frame_seconds), self.frames_sent)
+            if last <= first:
+                return None
+
+            # Fancy indexing copies, so the span stays valid after the lock is released
+            slots = np.arange(first, last) % self.capacity
+            return AudioSpan(start, duration, first * self.frame_seconds, self.sample_rate,
+                             self.stream_time[slots], self.samples[slots],
+                             self.codes[slots], self.energy[slots], self.zcr[slots])
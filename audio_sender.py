@@ -0,0 +1,154 @@
+import asyncio
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# A text message (e.g. KeepAlive) queued between audio frames; always sent on its own
+ControlMessage = namedtuple('ControlMessage', ['text'])
+
+class AudioSender:
+    """Sends captured frames to Deepgram, paced by the audio clock.
+
+    Frames are submitted as they are captured (CapturedFrame-like objects
+    with data, captured_at and stream_time). A single sender thread does
+    the blocking websocket send, so the event loop never waits on the
+    socket. If the socket is backlogged while a send is in flight, frames
+    queue up and go out together in one larger send (up to
+    max_coalesce_frames). With pace_to_stream_time, frames are released
+    no earlier than their stream time (used when replaying files in real
+    time); live capture is already paced by the microphone. Control messages
+    (submit_control) go out in queue order, never coalesced with audio.
+    A send that raises (e.g. the socket closed) counts as failed and the
+    queue keeps draining; the first such error goes to on_error(exception).
+    """
+
+    def __init__(self, send, max_coalesce_frames=8, pace_to_stream_time=False, latency_window=1024, on_error=None):
+        self._send = send
+        self._on_error = on_error or (lambda error: print(f"❌ Audio send failed: {error}"))
+        self.last_error = None
+        self.max_coalesce_frames = max(1, max_coalesce_frames)
+        self.pace_to_stream_time = pace_to_stream_time
+
+        self._pending = deque()
+        self._ready = asyncio.Event()
+        self._stopping = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-sender")
+        self._clock_start = None
+
+        # Capture-to-send latency of the most recent frames, in seconds
+        self._latencies = np.zeros(latency_window, dtype=np.float64)
+        self._latency_pos = 0
+        self._latency_count = 0
+
+        # Counters
+        self.frames_sent = 0
+        self.sends = 0
+        self.coalesced_sends = 0
+        self.failed_sends = 0
+        self.control_sends = 0
+
+    def submit(self, frames):
+        """Queue frames for sending, in capture order"""
+        if frames:
+            self._pending.extend(frames)
+            self._ready.set()
+
+    def submit_control(self, text):
+        """Queue a control message after the frames already submitted"""
+        self._pending.append(ControlMessage(text))
+        self._ready.set()
+    
+    def backlog(self):
+        """Frames (and control messages) waiting to be sent"""
+        return len(self._pending)
+
+    def stop(self):
+        """Finish sending what is queued, then let run() return"""
+        self._stopping = True
+        self._ready.set()
+
+    async def run(self):
+        """Sender task: drain the queue until stop() is called and the queue is empty"""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                while not self._pending:
+                    if self._stopping:
+                        return
+                    self._ready.clear()
+                    await self._ready.wait()
+
+                if isinstance(self._pending[0], ControlMessage):
+                    message = self._pending.popleft()
+                    ok = await self._deliver(loop, message.text)
+                    self.control_sends += 1
+                    if not ok:
+                        self.failed_sends += 1
+                    continue
+
+                if self.pace_to_stream_time and not self._stopping:
+                    await self._wait_for_stream_time(self._pending[0])
+
+                batch = [self._pending.popleft()]
+                while self._pending and len(batch) < self.max_coalesce_frames:
+                    if isinstance(self._pending[0], ControlMessage):
+                        break
+                    if self.pace_to_stream_time and not self._is_due(self._pending[0]):
+                        break
+                    batch.append(self._pending.popleft())
+
+                payload = batch[0].data if len(batch) == 1 else b''.join(frame.data for frame in batch)
+                ok = await self._deliver(loop, payload)
+                sent_at = time.monotonic()
+
+                self.sends += 1
+                self.frames_sent += len(batch)
+                if len(batch) > 1:
+                    self.coalesced_sends += 1
+                if not ok:
+                    self.failed_sends += 1
+                for frame in batch:
+                    self._record_latency(sent_at - frame.captured_at)
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def _deliver(self, loop, payload):
+        """One send on the sender thread; False if it reported failure or raised"""
+        try:
+            return await loop.run_in_executor(self._executor, self._send, payload) is not False
+        except Exception as e:
+            if self.last_error is None:
+                self._on_error(e)  # once; later failures are only counted
+            self.last_error = e
+            return False
+
+    def _is_due(self, frame):
+        """True once the audio clock has reached the frame's stream time"""
+        if self._clock_start is None:
+            self._clock_start = time.monotonic() - frame.stream_time
+        return time.monotonic() >= self._clock_start + frame.stream_time
+
+    async def _wait_for_stream_time(self, frame):
+        """Sleep until the frame is due on the audio clock"""
+        if not self._is_due(frame):
+            await asyncio.sleep(self._clock_start + frame.stream_time - time.monotonic())
+
+    def _record_latency(self, latency):
+        self._latencies[self._latency_pos] = latency
+        self._latency_pos = (self._latency_pos + 1) % len(self._latencies)
+        self._latency_count = min(self._latency_count + 1, len(self._latencies))
+
+    def latency_stats(self):
+        """Capture-to-send latency over the recent window, in milliseconds"""
+        if self._latency_count == 0:
+            return None
+        recent = self._latencies[:self._latency_count] * 1000
+        p50, p99 = np.percentile(recent, [50, 99])
+        return {
+            'p50_ms': float(p50),
+            'p99_ms': float(p99),
+            'max_ms': float(recent.max()),
+            'frames': self._latency_count,
+        }
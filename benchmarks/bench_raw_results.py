@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Transcript message decoding benchmark: SDK response objects vs the raw JSON fast path.
+
+For synthetic Deepgram Results messages of 5-400 words, times getting from
+websocket text to the inputs Stages 2-5 read (TranscriptTokens + WordArrays
+columns) through LiveResultResponse.from_json (before) and RawResult (after),
+plus the cost of recognising and dropping an interim message unparsed.
+
+    python benchmarks/bench_raw_results.py [--messages 8] [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deepgram import LiveResultResponse
+
+import raw_results
+from raw_results import RawResult, is_empty, is_interim, is_results
+from transcript_tokens import TranscriptTokens
+from word_arrays import WordArrays
+from bench_stages import synthetic_message
+
+def sdk_path(text):
+    """Before: full SDK decode, then the shared views built from the response objects"""
+    result = LiveResultResponse.from_json(text)
+    words = WordArrays.from_result(result)
+    return TranscriptTokens.from_result(result), words.confidence, words.speaker
+
+def raw_path(text):
+    """After: one JSON decode straight into the shared views"""
+    result = RawResult.from_json(text)
+    words = result.word_arrays()
+    return result.tokens(), words.confidence, words.speaker
+
+def interim_skip(text):
+    """After, interim messages when only finals are needed: three regex scans, no decode"""
+    return is_results(text) and not is_empty(text) and is_interim(text)
+
+def measure(function, texts, repeat):
+    for text in texts[:2]:  # warm up
+        function(text)
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            function(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Raw JSON fast path benchmark")
+    parser.add_argument("--messages", type=int, default=8, help="messages per word count")
+    parser.add_argument("--repeat", type=int, default=20, help="timed passes (best is reported)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    decoder = "orjson" if raw_results.loads is not json.loads else "json"
+    print(f"⚡ Results message decoding ({decoder}), {args.messages} messages per size")
+    print("=" * 78)
+    print(f"{'words':>6} {'SDK µs/msg':>12} {'raw µs/msg':>12} {'speedup':>9} {'interim skip µs':>17} {'bytes':>8}")
+
+    for word_count in (5, 20, 100, 400):
+        finals = [json.dumps(synthetic_message(word_count, 2, "turns", rng)) for _ in range(args.messages)]
+        interims = [json.dumps(synthetic_message(word_count, 2, "turns", rng, is_final=False))
+                    for _ in range(args.messages)]
+
+        before = measure(sdk_path, finals, max(1, args.repeat // 10))
+        after = measure(raw_path, finals, args.repeat)
+        skip = measure(interim_skip, interims, args.repeat)
+        size = sum(len(text) for text in finals) // len(finals)
+        print(f"{word_count:>6} {before:>12.1f} {after:>12.1f} {before / after:>8.1f}x {skip:>17.2f} {size:>8}")
+
+    print("=" * 78)
+    print("SDK = LiveResultResponse.from_json + views; raw = RawResult + views; views = tokens, confidence, speaker")
+
+if __name__ == "__main__":
+    main()
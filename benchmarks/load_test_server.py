@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Multi-stream server load test against a local mock Deepgram websocket.
+
+Starts a SessionManager (filter_server) and a mock of Deepgram's /v1/listen
+endpoint in this process, then streams synthetic voiced PCM from N socket
+clients at real time (or --speed times real time). The mock turns every
+--utterance seconds of audio it receives into one scripted final result:
+the session's user alone, the user interrupted by another person, a TV
+line, and so on. Each session gets different diarization IDs, so an
+accepted transcript with another person's or the TV's words would mean
+state leaked between sessions. Reports event loop lag, per-session
+accepted/leaked transcripts and what the mock received, as JSON.
+
+    python benchmarks/load_test_server.py [--sessions 24] [--seconds 20] [--speed 1.0] [--dsp-workers 4]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The engine wants an API key before it will open a websocket; the mock ignores it
+os.environ.setdefault("DEEPGRAM_API_KEY", "load-test")
+
+from websockets.asyncio.server import serve
+
+from filter_server import SessionManager
+
+SAMPLE_RATE = 16000
+FRAME_LEN = 1024
+
+# Scripted lines by role; words are disjoint so accepted text shows whose words got through
+USER_LINES = ["please turn the kitchen lights on", "please set a timer for ten minutes",
+              "please add milk to the shopping list", "please play some quiet music"]
+OTHER_LINES = ["maybe later tonight", "maybe after dinner", "maybe tomorrow morning"]
+TV_LINES = ["breaking news live from city hall", "stay tuned weather forecast coming up next",
+            "call now special offer operators standing by"]
+OTHER_WORDS = {word for line in OTHER_LINES + TV_LINES for word in line.split()}
+
+def synthetic_voice(seconds, pitch, seed):
+    """Voiced int16 PCM: a harmonic source with drifting pitch and syllable-rate envelope"""
+    rng = np.random.default_rng(seed)
+    count = int(seconds * SAMPLE_RATE)
+    t = np.arange(count) / SAMPLE_RATE
+    f0 = pitch * (1 + 0.05 * np.sin(2 * np.pi * 0.7 * t))
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    source = sum(np.sin(k * phase) / k for k in range(1, 20))
+    envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t + rng.uniform(0, 2 * np.pi))
+    x = 3000 * source * envelope + rng.normal(0, 300, count)
+    return np.clip(x, -32768, 32767).astype(np.int16)
+
+def results_message(parts, start, duration, rng):
+    """Deepgram final Results message for [(speaker, line), ...] spread over [start, start + duration)"""
+    spoken = [(speaker, word) for speaker, line in parts for word in line.split()]
+    step = duration / len(spoken)
+    words = []
+    for i, (speaker, word) in enumerate(spoken):
+        word_start = start + i * step + float(rng.uniform(0, 0.2)) * step
+        words.append({
+            "word": word,
+            "punctuated_word": word,
+            "start": word_start,
+            "end": word_start + step * float(rng.uniform(0.6, 0.8)),
+            "confidence": float(rng.uniform(0.9, 0.99)),
+            "speaker": speaker,
+        })
+    transcript = " ".join(w["word"] for w in words)
+    return {
+        "type": "Results",
+        "channel_index": [0, 1],
+        "is_final": True,
+        "speech_final": True,
+        "start": start,
+        "duration": duration,
+        "channel": {"alternatives": [{"transcript": transcript, "confidence": 0.95, "words": words}]},
+        "metadata": {"request_id": "load-test", "model_uuid": "load-test",
+                     "model_info": {"name": "nova-3", "version": "load-test", "arch": "nova-3"}},
+        "from_finalize": False,
+    }
+
+class MockDeepgram:
+    """Stand-in for Deepgram's live endpoint: one scripted final result per `utterance_seconds` received.
+
+    Connection k's user is diarization speaker k % 4 and the other voice
+    (person or TV) is speaker (k + 1) % 4.
+    """
+
+    def __init__(self, utterance_seconds=2.0):
+        self.utterance_seconds = utterance_seconds
+        self.connections = 0
+        self.bytes_received = 0
+        self.results_sent = 0
+        self.control_messages = 0
+
+    def script(self, n, user, other):
+        """The n-th utterance of a connection as [(speaker, line), ...]"""
+        turn = n % 4
+        if turn == 0:
+            return [(user, USER_LINES[n % len(USER_LINES)])]
+        if turn == 1:
+            return [(user, USER_LINES[(n + 1) % len(USER_LINES)]), (other, OTHER_LINES[n % len(OTHER_LINES)])]
+        if turn == 2:
+            return [(other, TV_LINES[n % len(TV_LINES)])]
+        return [(other, OTHER_LINES[n % len(OTHER_LINES)]), (user, USER_LINES[(n + 2) % len(USER_LINES)])]
+
+    async def handle(self, websocket):
+        index = self.connections
+        self.connections += 1
+        user, other = index % 4, (index + 1) % 4
+        rng = np.random.default_rng(index)
+        received = 0
+        utterances = 0
+        async for message in websocket:
+            if isinstance(message, str):
+                self.control_messages += 1
+                if json.loads(message).get("type") == "CloseStream":
+                    break
+                continue
+            received += len(message)
+            self.bytes_received += len(message)
+            while received / (2 * SAMPLE_RATE) >= (utterances + 1) * self.utterance_seconds:
+                start = utterances * self.utterance_seconds
+                message = results_message(self.script(utterances, user, other), start, self.utterance_seconds, rng)
+                await websocket.send(json.dumps(message))
+                utterances += 1
+                self.results_sent += 1
+
+async def measure_loop_lag(samples, interval=0.01):
+    """Record how late the event loop wakes a 10 ms sleeper, until cancelled"""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+async def run_client(port, name, audio, speed):
+    """Stream one session's audio in real time and collect what comes back"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(json.dumps({"session": name}).encode() + b"\n")
+    transcripts, stats = [], None
+
+    async def receive():
+        nonlocal stats
+        async for line in reader:
+            message = json.loads(line)
+            if "transcript" in message:
+                transcripts.append(message["transcript"])
+            elif "stats" in message:
+                stats = message["stats"]
+            elif "error" in message:
+                raise RuntimeError(message["error"])
+
+    receiver = asyncio.create_task(receive())
+    start = time.monotonic()
+    frame_seconds = FRAME_LEN / SAMPLE_RATE
+    for i in range(len(audio) // FRAME_LEN):
+        delay = start + i * frame_seconds / speed - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        writer.write(audio[i * FRAME_LEN:(i + 1) * FRAME_LEN].tobytes())
+        await writer.drain()
+    writer.write_eof()
+    await receiver
+    writer.close()
+
+    leaked = [text for text in transcripts if OTHER_WORDS & set(text.lower().split())]
+    return {"accepted": len(transcripts), "leaked": len(leaked), "leaked_examples": leaked[:3], "server": stats}
+
+def percentile_ms(values, q):
+    return float(np.percentile(values, q) * 1000) if values else 0.0
+
+async def load_test(sessions, seconds, speed, dsp_workers, utterance_seconds):
+    mock = MockDeepgram(utterance_seconds)
+    async with serve(mock.handle, "127.0.0.1", 0) as mock_server:
+        mock_port = mock_server.sockets[0].getsockname()[1]
+        manager = SessionManager(
+            dsp_workers=dsp_workers,
+            max_sessions=sessions,
+            engine_options={'deepgram_url': f"http://127.0.0.1:{mock_port}", 'raw_results': True},
+            log=lambda message: None,
+        )
+        server = await asyncio.start_server(manager.handle_client, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        audio = [synthetic_voice(seconds, 110 + 10 * (i % 8), i) for i in range(sessions)]
+        lag = []
+        lag_task = asyncio.create_task(measure_loop_lag(lag))
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        results = await asyncio.gather(*(run_client(port, f"room-{i}", audio[i], speed) for i in range(sessions)))
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        lag_task.cancel()
+        server.close()
+        await server.wait_closed()
+        manager.dsp_pool.shutdown()
+
+    per_session = {f"room-{i}": result for i, result in enumerate(results)}
+    return {
+        "wall_seconds": round(wall, 3),
+        "cpu_seconds": round(cpu, 3),
+        "cpu_per_audio_second_ms": round(cpu / (sessions * seconds) * 1000, 3),
+        "loop_lag_ms": {"p50": round(percentile_ms(lag, 50), 3), "p99": round(percentile_ms(lag, 99), 3),
+                        "max": round(percentile_ms(lag, 100), 3)},
+        "mock_deepgram": {"connections": mock.connections, "audio_seconds": mock.bytes_received / (2 * SAMPLE_RATE),
+                          "results_sent": mock.results_sent, "control_messages": mock.control_messages},
+        "accepted": sum(result["accepted"] for result in results),
+        "leaked": sum(result["leaked"] for result in results),
+        "ring_overflows": sum(result["server"]["ring_overflows"] for result in results if result["server"]),
+        "sessions": per_session,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-stream server load test with a mock Deepgram (JSON output)")
+    parser.add_argument("--sessions", type=int, default=24, help="concurrent client sessions")
+    parser.add_argument("--seconds", type=float, default=20.0, help="audio per session")
+    parser.add_argument("--speed", type=float, default=1.0, help="stream audio this many times faster than real time")
+    parser.add_argument("--dsp-workers", type=int, default=4, help="Stage 1 DSP threads shared by the sessions")
+    parser.add_argument("--utterance", type=float, default=2.0, help="seconds of audio per mock final result")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    # Engine start-up prints go to stderr, keeping stdout for the report
+    with contextlib.redirect_stdout(sys.stderr):
+        results = asyncio.run(load_test(args.sessions, args.seconds, args.speed, args.dsp_workers, args.utterance))
+
+    report = {
+        "benchmark": "load_test_server",
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "settings": {"sessions": args.sessions, "seconds": args.seconds, "speed": args.speed,
+                     "dsp_workers": args.dsp_workers, "utterance_seconds": args.utterance},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
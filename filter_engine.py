@@ -0,0 +1,998 @@
+import asyncio
+import datetime
+import ssl
+
+import certifi
+import numpy as np
+from dotenv import load_dotenv
+
+from tv_noise_filter import AdvancedTVNoiseFilter, STAGE1_PASSED
+from phrase_dictionary import PhraseDictionary, file_stamp
+from transcript_tokens import TranscriptTokens
+from word_arrays import WordArrays
+from interim_filter import InterimFilter, REVISED
+from raw_results import RawResult, is_empty, is_interim, is_results, raw_listen_client
+from stage1_analyzer import Stage1Analyzer, Stage1Gate, StreamingSTFT
+from audio_sender import AudioSender
+from send_gate import SendGate, VoiceBudget
+from audio_history import AudioHistory
+from voiceprint import VoiceprintTracker
+from voiceprint_store import VoiceprintStore
+from speaker_locks import SpeakerLocks
+from speaker_activity import SpeakerActivity
+
+# Load environment variables from .env file
+load_dotenv()
+
+def print_log(message):
+    """Default log sink: timestamped line on stdout"""
+    timestamp = datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3]
+    print(f"[{timestamp}] {message}", flush=True)
+
+class VoiceFilterEngine:
+    """GUI-free Voice Filter core: capture, Stage 1, Deepgram session and Stages 2-5.
+
+    Front ends plug in through callbacks, all optional and possibly invoked
+    from worker threads (the Deepgram listener, the audio loop):
+      on_log(message)              - activity log lines
+      on_status(message, level)    - connection/lock status; level is one of
+                                     'success', 'warning', 'danger', 'muted' or None
+      on_transcript(text)          - accepted (filtered) transcripts
+      on_speaker_lock(speaker_id)  - Stage 5 lock changes (None when released)
+      on_provisional(text, accepted) - early decisions on interim results (incremental=True)
+    Accepted transcripts are also available as an async iterator via transcripts().
+    Stage 3 phrase lists come from `dictionary_path` (default dictionaries/tv_phrases.json)
+    and are hot-swapped when that file changes or reload_dictionary() is called. An
+    already loaded `dictionary` is used as is and not watched: its owner swaps in
+    new versions (see filter_server).
+    With raw_results=True, transcript messages are decoded straight from the websocket
+    JSON (see raw_results) instead of through the SDK's response objects.
+    With incremental=True, interim results get provisional Stage 3 / Stage 5 decisions
+    (see interim_filter) and voice commands fire from them, before the final arrives.
+    With voice_profile set (a name, or several for a shared device), each user's
+    enrolled voiceprint is saved under that name (see voiceprint_store) and pre-arms
+    their Stage 5 lock on the next start. Stage 5 keeps up to max_locked_speakers
+    locks (at least one per voice profile); see speaker_locks.
+    Several engines can share one event loop (see filter_server): `dsp_pool` runs
+    their Stage 1 DSP on a shared executor, `ssl_context` is built once for all of
+    them, `voiceprint_store` is one store for their voice profiles and `deepgram_url` points the websocket at another endpoint (e.g. a proxy
+    or a mock server). Everything else - the TV filter and its statistics, speaker
+    locks, voiceprints - is per engine.
+    """
+    
+    def __init__(self, on_log=None, on_status=None, on_transcript=None, on_speaker_lock=None,
+                 dictionary_path=None, raw_results=False, incremental=False, on_provisional=None,
+                 voice_profile=None, voiceprint_dir=None, max_locked_speakers=1,
+                 dsp_pool=None, deepgram_url=None, ssl_context=None, voiceprint_store=None,
+                 dictionary=None):
+        self.on_log = on_log or print_log
+        self.on_status = on_status
+        self.on_transcript = on_transcript
+        self.on_speaker_lock = on_speaker_lock
+        self.on_provisional = on_provisional
+        self.deepgram = None
+        self.deepgram_config = None
+        self.dg_connection = None
+        self.capture = None
+        self.sender = None
+        self.sender_task = None
+        self.send_gate = None
+        self.voice_budget = None
+        self.audio_history = None  # sent audio by Deepgram stream time, for post-transcript Stage 1
+        self.dictionary_task = None
+        self.is_running = False
+        self.loop = None
+        self._transcript_queues = []
+        self.dsp_pool = dsp_pool          # executor for Stage 1 DSP; None runs it on the event loop
+        self.deepgram_url = deepgram_url  # Deepgram endpoint override; None for the SDK default
+        self.ssl_context = ssl_context    # shared by sessions; loading the CA bundle costs tens of ms
+        
+        # Raw JSON fast path for transcript messages
+        self.raw_results = raw_results
+        self.show_interim = True   # log interim results; when off the fast path skips them unparsed
+        self.interim_skipped = 0
+        
+        # Advanced TV noise filtering system
+        self.watch_dictionary_file = dictionary is None  # a shared dictionary is reloaded by its owner
+        dictionary = dictionary or PhraseDictionary.load(dictionary_path)
+        self.dictionary_path = dictionary.path
+        self._dictionary_stamp = file_stamp(dictionary.path)
+        self.tv_filter = AdvancedTVNoiseFilter(dictionary)
+        
+        # Speaker diarization settings (Stage 5)
+        self.speaker_lock_enabled = True
+        self.min_words_to_lock = 3  # Minimum words before locking speaker
+        
+        # Decayed per-speaker counters over the last ~20 final results drive automatic re-locking
+        self.speaker_activity = SpeakerActivity(window=20)
+        self.relock_tv_rate = 0.6        # release a lock whose speaker failed Stages 1-4 this often
+        self.relock_min_utterances = 3.0  # ... once heard in at least this many (decayed) results
+        self.relock_silent_after = 15    # move a lock whose speaker has been absent this many results
+        self.filtered_count = 0
+        self.accepted_count = 0
+        self.accepted_tokens = None  # Tokens of the last transcript Stage 5 accepted
+        self.voiceprints = VoiceprintTracker()  # per-ID voiceprints, independent of diarization IDs
+        
+        # Enrolled voiceprints kept on disk under profile names; stored ones pre-arm their locks
+        if isinstance(voice_profile, str):
+            voice_profile = [name.strip() for name in voice_profile.split(',') if name.strip()]
+        self.voice_profiles = list(voice_profile or ())
+        self.speaker_locks = SpeakerLocks(max_locks=max(max_locked_speakers, len(self.voice_profiles)))
+        self.voiceprint_store = None
+        self._saved_voiceprints = {}  # profile name -> (Voiceprint, version) last written to the store
+        if self.voice_profiles:
+            self.voiceprint_store = voiceprint_store or VoiceprintStore(voiceprint_dir, self.voiceprints.extractor.signature)
+            self.load_voice_profiles()
+        
+        # Early decisions on interim results
+        self.incremental = incremental
+        self.interim_filter = InterimFilter(self.tv_filter)
+        
+        # Voice commands: (name, trigger phrases, handler); the first match in a transcript runs
+        self.commands = []
+        self.add_command('exit', ("exit filter", "stop filter"), self.exit_command)
+        self.add_command('stats', ("show stats", "show statistics"), self.show_filter_statistics, early=True)
+    
+    def init_deepgram(self):
+        """Create the Deepgram client (deferred so constructing the engine stays cheap)"""
+        # Imported here: the SDK is the slowest import and only needed once a session starts
+        from deepgram import DeepgramClient, DeepgramClientOptions
+        
+        # Initialize Deepgram client with SSL context
+        try:
+            self.log_to_terminal("🔧 Initializing Voice Filter with Advanced TV Noise Filtering...")
+            
+            # Import EmbeddedConfig for proper API key handling
+            from embedded_config import EmbeddedConfig
+            
+            api_key = EmbeddedConfig.get_deepgram_key()
+            if not api_key:
+                self.log_to_terminal("❌ Warning: DEEPGRAM_API_KEY not found")
+                return
+            
+            self.log_to_terminal(f"🔑 Deepgram API Key configured")
+            
+            # Use SSL context for certificate verification
+            ssl_context = self.ssl_context or ssl.create_default_context(cafile=certifi.where())
+            
+            # No SDK keepalive thread: the send gate sends KeepAlive itself, only while idle
+            config = DeepgramClientOptions(
+                url=self.deepgram_url or "",
+                options={
+                    "ssl_context": ssl_context
+                }
+            )
+            self.deepgram = DeepgramClient(api_key, config)
+            self.deepgram_config = config
+            self.log_to_terminal("✅ Voice Filter with Advanced TV Filtering initialized successfully")
+        except Exception as e:
+            self.log_to_terminal(f"❌ Error initializing Voice Filter: {e}")
+    
+    def reload_dictionary(self, path=None):
+        """Load a phrase dictionary and hot-swap it into Stage 3 - the Deepgram session is untouched"""
+        path = path or self.dictionary_path
+        current = self.tv_filter.dictionary.version
+        try:
+            dictionary = PhraseDictionary.load(path)
+        except Exception as e:
+            self.log_to_terminal(f"❌ Phrase dictionary reload failed, keeping v{current}: {e}")
+            return False
+        
+        self.tv_filter.use_dictionary(dictionary)
+        self.dictionary_path = dictionary.path
+        self._dictionary_stamp = file_stamp(dictionary.path)
+        self.log_to_terminal(f"📚 Phrase dictionary v{dictionary.version} loaded: {dictionary.phrase_count} phrases")
+        return True
+    
+    async def watch_dictionary(self, interval=2.0):
+        """Poll the dictionary file and hot-swap it whenever it changes"""
+        loop = asyncio.get_running_loop()
+        while self.is_running:
+            await asyncio.sleep(interval)
+            stamp = file_stamp(self.dictionary_path)
+            if stamp is not None and stamp != self._dictionary_stamp:
+                self._dictionary_stamp = stamp  # a broken file is reported once, not every tick
+                # Compile off the event loop so audio keeps flowing
+                await loop.run_in_executor(None, self.reload_dictionary)
+    
+    def log_to_terminal(self, message):
+        """Send a log line to the front end's log sink"""
+        try:
+            self.on_log(message)
+        except Exception as e:
+            print(f"Error logging to terminal: {e}")
+    
+    def update_status(self, message, level=None):
+        """Report a status change to the front end"""
+        try:
+            if self.on_status:
+                self.on_status(message, level)
+        except Exception as e:
+            print(f"Error updating status: {e}")
+    
+    @property
+    def primary_speaker_id(self):
+        """Speaker ID of the first bound Stage 5 lock, or None"""
+        bound = self.speaker_locks.bound_ids()
+        return bound[0] if bound else None
+    
+    def notify_speaker_lock(self):
+        """Report the current Stage 5 lock to the front end"""
+        try:
+            if self.on_speaker_lock:
+                self.on_speaker_lock(self.primary_speaker_id)
+        except Exception as e:
+            print(f"Error updating speaker lock: {e}")
+    
+    def publish_transcript(self, text):
+        """Hand an accepted transcript to the callback and any transcripts() iterators"""
+        try:
+            if self.on_transcript:
+                self.on_transcript(text)
+        except Exception as e:
+            print(f"Error updating transcription display: {e}")
+        
+        if self.loop and self._transcript_queues:
+            for transcript_queue in self._transcript_queues:
+                self.loop.call_soon_threadsafe(transcript_queue.put_nowait, text)
+    
+    async def transcripts(self):
+        """Async iterator over accepted transcripts until the session stops"""
+        transcript_queue = asyncio.Queue()
+        self._transcript_queues.append(transcript_queue)
+        try:
+            while True:
+                text = await transcript_queue.get()
+                if text is None:
+                    return
+                yield text
+        finally:
+            self._transcript_queues.remove(transcript_queue)
+    
+    def apply_5_stage_filtering(self, result, audio_data, tokens=None, words=None):
+        """Apply the 5-stage TV noise filtering system"""
+        self.log_to_terminal("🎯 Applying 5-stage TV noise filtering...")
+        self.accepted_tokens = None
+        
+        # Tokenize once and convert the words to columns once; Stages 2-5 all share them
+        if tokens is None:
+            tokens = TranscriptTokens.from_result(result)
+        if words is None:
+            words = WordArrays.from_result(result)
+        
+        # Process through stages 1-4 (cheapest, most-rejecting first) using the advanced TV filter
+        verdict = self.tv_filter.run_stages(audio_data, result, tokens, words)
+        self.speaker_activity.tick()
+        
+        if verdict is not None:
+            self.record_activity(words, rejected=True)
+            # Audio was filtered out at one of the first 4 stages (or a custom stage);
+            # the verdict is only rendered here, for the log
+            stage = verdict.stage
+            self.log_to_terminal(f"🚫 STAGE {stage.number or '+'} FILTER: {stage.label} - {verdict}")
+            self.log_to_terminal(f"   Reason: {verdict.describe()}")
+            
+            return None  # Audio filtered out before voice locking
+        
+        # Passed stages 1-4, now apply Stage 5 (Voice Locking)
+        self.log_to_terminal("✅ Passed Stages 1-4 → Applying Stage 5 (Voice Locking)")
+        return self.filter_by_primary_speaker(result, tokens, words, audio_data)
+    
+    def filter_by_primary_speaker(self, result, tokens=None, words=None, audio=None):
+        """Stage 5: Filter transcript to only include the locked speakers' words
+        
+        With the utterance's AudioSpan, each locked speaker's words are also
+        checked against their voiceprint (see check_voiceprints).
+        """
+        if words is None:
+            words = WordArrays.from_result(result)
+        if not len(words):
+            self.log_to_terminal("🔍 No word-level data available, using full transcript")
+            self.accepted_tokens = tokens
+            return result.channel.alternatives[0].transcript
+        
+        if tokens is None or tokens.word_texts is None:
+            tokens = TranscriptTokens.from_words(result.channel.alternatives[0].words,
+                                                 result.channel.alternatives[0].transcript)
+        
+        # Speakers in order of first appearance, with their word counts
+        speaker_ids, word_counts = words.speakers()
+        speakers = speaker_ids.tolist()
+        
+        self.log_to_terminal(f"🎤 Stage 5 - Speakers in utterance: {speakers}")
+        self.log_to_terminal(f"📊 Speakers active recently: {len(self.speaker_activity.active())}")
+        
+        # Voiceprint of each speaker's words in this utterance (needs its audio)
+        prints = self.voiceprints.observe(words, audio)
+        
+        # Bind locks to this utterance's speakers, and check locked words against voiceprints
+        locks = self.speaker_locks
+        mismatched = ()
+        if self.speaker_lock_enabled:
+            self.update_speaker_locks(speakers, word_counts, prints)
+            mismatched = self.check_voiceprints(prints)
+        
+        if not locks.any_bound:
+            if prints and locks.armed:
+                # Pre-armed voiceprints were heard and none matched
+                self.count_stage5(speaker_ids, word_counts, np.zeros(len(speakers), dtype=bool))
+                self.record_activity(words)
+                self.filtered_count += 1
+                self.log_to_terminal(f"🚫 STAGE 5 FILTERED: Speaker(s) {speakers} do not match the stored voiceprint(s)")
+                self.log_to_terminal(f"📈 Session Stats - Accepted: {self.accepted_count} | Stage 5 Filtered: {self.filtered_count}")
+                return None
+            
+            # Fallback to full transcript if no speaker lock
+            self.record_activity(words, np.ones(len(speakers), dtype=bool))
+            self.log_to_terminal("⚠️ No speaker lock active - processing all speech")
+            self.accepted_tokens = tokens
+            return result.channel.alternatives[0].transcript
+        
+        # One table lookup per word: keep words of bound speakers whose voice matched
+        keep = locks.mask(words.speaker)
+        kept_speakers = locks.mask(speaker_ids)
+        for speaker_id in mismatched:
+            keep &= words.speaker != speaker_id
+            kept_speakers &= speaker_ids != speaker_id
+        self.count_stage5(speaker_ids, word_counts, kept_speakers)
+        self.record_activity(words, kept_speakers)
+        
+        if keep.any():
+            # Reconstruct transcript from the locked speakers' words only
+            self.accepted_tokens = tokens.select_words(np.flatnonzero(keep).tolist())
+            filtered_transcript = ' '.join(self.accepted_tokens.word_texts)
+            
+            self.accepted_count += 1
+            
+            accepted = ', '.join(str(speaker_id) for speaker_id in speaker_ids[kept_speakers].tolist())
+            self.log_to_terminal(f"✅ STAGE 5 ACCEPTED: Speaker {accepted} said: '{filtered_transcript}'")
+            self.log_to_terminal(f"📈 Session Stats - Accepted: {self.accepted_count} | Stage 5 Filtered: {self.filtered_count}")
+            
+            return filtered_transcript
+        
+        self.filtered_count += 1
+        # Log which speakers were filtered out (no locked speaker was kept, so all of them)
+        self.log_to_terminal(f"🚫 STAGE 5 FILTERED: Speaker(s) {speakers} (no words from a locked speaker)")
+        self.log_to_terminal(f"📈 Session Stats - Accepted: {self.accepted_count} | Stage 5 Filtered: {self.filtered_count}")
+        return None
+    
+    def update_speaker_locks(self, speakers, word_counts, prints):
+        """Bind Stage 5 locks to this utterance's speakers.
+        
+        Locks whose speaker looks TV-like or has gone silent are released or
+        moved first (see relock_speakers). Locks with a voiceprint follow
+        whichever speaker ID sounds like them (pre-armed locks and renumbered
+        speakers alike). An unlocked speaker with at least min_words_to_lock
+        words that does not look TV-like takes a free lock; a pre-armed one
+        only when this utterance could not be judged by voice.
+        """
+        locks = self.speaker_locks
+        tracker = self.voiceprints
+        activity = self.speaker_activity
+        changed = False
+        
+        # Voiceprinted locks not heard for a while give up their ID and are matched by voice again
+        for lock, speaker_id in locks.heard(speakers):
+            self.log_to_terminal(f"⏳ STAGE 5: {lock.name} not heard for {lock.idle} utterances - "
+                                 f"Speaker {speaker_id} released, matching by voice")
+            changed = True
+        
+        if self.relock_speakers(speakers):
+            changed = True
+        
+        for lock in locks:
+            if lock.voiceprint is None:
+                continue
+            current = lock.speaker_id
+            if current in speakers:
+                similarity = tracker.speaker_similarity(current, lock.voiceprint)
+                if similarity is None or similarity >= tracker.match_threshold:
+                    continue
+            # A speaker judged TV-like is never matched back, however close its voice
+            candidates = [speaker_id for speaker_id in prints if locks.lock_of(speaker_id) in (None, lock) and
+                          not activity.looks_tv(speaker_id, self.relock_tv_rate, self.relock_min_utterances)]
+            best_id, best = tracker.best_match(candidates, lock.voiceprint)
+            if best_id is None or best_id == current:
+                continue
+            locks.bind(lock, best_id)
+            changed = True
+            if current is None:
+                self.log_to_terminal(f"🔒 STAGE 5 VOICE LOCK: Speaker {best_id} matches {lock.name}'s voiceprint (similarity {best:.2f})")
+            else:
+                self.log_to_terminal(f"🔁 STAGE 5 VOICEPRINT: {lock.name} is now Speaker {best_id}, was Speaker {current} (similarity {best:.2f})")
+        
+        # Find the unlocked speaker with most words in this utterance (first to speak wins a tie)
+        unlocked = ~locks.mask(np.asarray(speakers))
+        if unlocked.any():
+            top = int(np.where(unlocked, word_counts, -1).argmax())
+            
+            # Only lock if they said enough words and have not been failing Stages 1-4
+            if (word_counts[top] >= self.min_words_to_lock and
+                    not activity.looks_tv(speakers[top], self.relock_tv_rate, self.relock_min_utterances)):
+                lock = next((lock for lock in locks if lock.speaker_id is None and (lock.voiceprint is None or not prints)), None)
+                if lock is None and locks.has_room:
+                    lock = locks.add(f"user {len(locks) + 1}")
+                if lock is not None:
+                    locks.bind(lock, speakers[top])
+                    changed = True
+                    self.log_to_terminal(f"🔒 STAGE 5 VOICE LOCK: Locked to Speaker {speakers[top]}"
+                                         f"{f' ({lock.name})' if locks.max_locks > 1 else ''}")
+        
+        if changed:
+            bound = locks.bound_ids()
+            if bound:
+                self.update_status(f"🔒 Voice Locked to Speaker {', '.join(map(str, bound))}", 'success')
+            self.notify_speaker_lock()
+    
+    def relock_speakers(self, speakers):
+        """Release or move bound locks using the decayed per-speaker counters; returns True if any changed.
+        
+        A locked speaker whose recent results mostly failed Stages 1-4 looks
+        like the TV and loses the lock, and the voiceprint enrolled from it is
+        forgotten (also in the store, for profile locks). A lock whose speaker
+        has been absent for relock_silent_after results moves to the unlocked
+        speaker in this utterance with the most recent words that looks human,
+        if there is one, and re-enrolls from that speaker.
+        """
+        locks = self.speaker_locks
+        activity = self.speaker_activity
+        changed = False
+        for lock in locks:
+            speaker_id = lock.speaker_id
+            if speaker_id is None:
+                continue
+            
+            if activity.looks_tv(speaker_id, self.relock_tv_rate, self.relock_min_utterances):
+                stats = activity.stats(speaker_id)
+                locks.unbind(lock)
+                self.forget_voiceprint(lock)
+                changed = True
+                self.log_to_terminal(f"🔓 STAGE 5 LOCK RELEASED: Speaker {speaker_id} ({lock.name}) looks like TV - "
+                                     f"{stats.tv_rate*100:.0f}% of recent results failed Stages 1-4")
+                continue
+            
+            if lock.idle < self.relock_silent_after:
+                continue
+            candidate, most_words = None, 0.0
+            for other in speakers:
+                stats = activity.stats(other)
+                if (locks.lock_of(other) is None and stats is not None and stats.words > most_words and
+                        stats.utterances >= self.relock_min_utterances and stats.tv_rate < 1 - self.relock_tv_rate):
+                    candidate, most_words = other, stats.words
+            if candidate is None:
+                continue
+            idle = lock.idle
+            locks.bind(lock, candidate)
+            self.forget_voiceprint(lock)
+            changed = True
+            self.log_to_terminal(f"🔀 STAGE 5 RE-LOCK: {lock.name} moved from Speaker {speaker_id} "
+                                 f"(silent for {idle} results) to Speaker {candidate}")
+        return changed
+    
+    def forget_voiceprint(self, lock):
+        """Drop a lock's voiceprint, and its stored profile, so it re-enrolls from its next speaker"""
+        lock.voiceprint = None
+        if lock.profile and self.voiceprint_store is not None:
+            self._saved_voiceprints.pop(lock.name, None)
+            try:
+                self.voiceprint_store.delete(lock.name)
+            except Exception as e:
+                self.log_to_terminal(f"❌ Error deleting voiceprint: {e}")
+    
+    def record_activity(self, words, kept_speakers=None, rejected=False):
+        """Add this final result to each of its speakers' decayed counters"""
+        if not len(words):
+            return
+        speaker_ids, word_counts = words.speakers()
+        confidence = np.bincount(words.speaker, weights=words.confidence)[speaker_ids]
+        kept = kept_speakers.tolist() if kept_speakers is not None else [False] * len(speaker_ids)
+        for speaker_id, count, confidence_sum, keep in zip(speaker_ids.tolist(), word_counts.tolist(),
+                                                           confidence.tolist(), kept):
+            self.speaker_activity.record(speaker_id, count, confidence_sum, accepted=keep, rejected=rejected)
+    
+    def check_voiceprints(self, prints):
+        """Voiceprint check of each bound lock's words in this utterance; returns the IDs that did not match.
+        
+        Rejects words under a locked ID whose voice is not the user's (e.g. a
+        TV voice merged into the user's ID), refines voiceprints on confident
+        matches, and enrolls locks that have no voiceprint yet.
+        """
+        tracker = self.voiceprints
+        mismatched = []
+        enrolled = False
+        for lock in self.speaker_locks:
+            current = prints.get(lock.speaker_id)
+            if current is None:
+                continue
+            if lock.voiceprint is None:
+                lock.enroll(*current)
+                enrolled = True
+                self.log_to_terminal(f"🧬 STAGE 5 VOICEPRINT: Enrolled Speaker {lock.speaker_id} as {lock.name} ({current[1]:.1f}s of voice)")
+                continue
+            similarity = tracker.similarity(current[0], lock.voiceprint)
+            if similarity < tracker.reject_threshold:
+                self.log_to_terminal(f"🚫 STAGE 5 FILTERED: Speaker {lock.speaker_id} does not match {lock.name}'s voiceprint "
+                                     f"(similarity {similarity:.2f})")
+                mismatched.append(lock.speaker_id)
+            elif similarity >= tracker.adapt_threshold:
+                lock.enroll(*current)
+        if enrolled:
+            self.save_voice_profiles()
+        return mismatched
+    
+    def count_stage5(self, speaker_ids, word_counts, kept):
+        """Per-speaker Stage 5 word counters: locked users by lock name, others by speaker ID"""
+        counters = self.tv_filter.filter_stats['stage5_voice_lock']
+        for speaker_id, count, keep in zip(speaker_ids.tolist(), word_counts.tolist(), kept.tolist()):
+            lock = self.speaker_locks.lock_of(speaker_id)
+            counts = counters.setdefault(lock.name if lock else f"speaker {speaker_id}", {'accepted': 0, 'filtered': 0})
+            counts['accepted' if keep else 'filtered'] += count
+    
+    def load_voice_profiles(self):
+        """Pre-arm a Stage 5 lock for each voice profile, with its stored voiceprint if any"""
+        for name in self.voice_profiles:
+            voiceprint = self.voiceprint_store.get(name)
+            self.speaker_locks.add(name, voiceprint, profile=True)
+            if voiceprint is None:
+                self.log_to_terminal(f"🧬 No stored voiceprint for '{name}' - will enroll on lock")
+                continue
+            self._saved_voiceprints[name] = voiceprint, voiceprint.version
+            self.log_to_terminal(f"🧬 Voiceprint '{name}' loaded ({voiceprint.seconds:.0f}s of voice) - speaker lock pre-armed")
+    
+    def save_voice_profiles(self):
+        """Write each profile lock's voiceprint to the store if it changed since the last save"""
+        if self.voiceprint_store is None:
+            return
+        for lock in self.speaker_locks:
+            voiceprint = lock.voiceprint
+            if not lock.profile or voiceprint is None or self._saved_voiceprints.get(lock.name) == (voiceprint, voiceprint.version):
+                continue
+            try:
+                self.voiceprint_store.save(lock.name, voiceprint)
+                self._saved_voiceprints[lock.name] = voiceprint, voiceprint.version
+            except Exception as e:
+                self.log_to_terminal(f"❌ Error saving voiceprint: {e}")
+    
+    def reset_speaker_lock(self):
+        """Reset speaker lock to re-identify primary speaker"""
+        self.speaker_locks.reset()
+        self.voiceprints.new_session()
+        self.speaker_activity.reset()
+        self.filtered_count = 0
+        self.accepted_count = 0
+        
+        self.log_to_terminal("🔓 SPEAKER LOCK RESET - will re-identify on next speech")
+        self.update_status("🔓 Ready to lock onto voice", 'warning')
+        self.notify_speaker_lock()
+    
+    def show_filter_statistics(self):
+        """Display comprehensive filtering statistics in terminal"""
+        stats = self.tv_filter.get_filter_statistics()
+        stats += "\n\n" + self.speaker_activity.summary()
+        if self.incremental:
+            stats += "\n" + self.interim_filter.summary()
+        self.log_to_terminal("\n" + stats + "\n")
+    
+    def add_command(self, name, phrases, handler, early=False):
+        """Register a voice command: handler() runs when an accepted transcript contains one of phrases.
+        
+        With early=True (only for harmless, repeatable commands) it may already
+        run on a provisional interim accept, before Stages 1, 2 and 4 have seen
+        the utterance; otherwise it waits for the final result to be accepted.
+        """
+        self.commands.append((name, tuple(phrases), handler, early))
+    
+    def exit_command(self):
+        self.log_to_terminal("🛑 Exit command detected - stopping Voice Filter")
+        self.stop_filter()
+    
+    def run_commands(self, tokens, skip=(), early=False):
+        """Run the first command whose phrase occurs (whole words) in tokens; returns its name.
+        
+        With early=True (interim results) a command not registered as early is
+        left for the final result: nothing runs and None is returned.
+        """
+        for name, phrases, handler, runs_early in self.commands:
+            if any(tokens.contains(phrase) for phrase in phrases):
+                if early and not runs_early:
+                    return None
+                if name not in skip:
+                    handler()
+                return name
+        return None
+    
+    def process_interim(self, result, tokens=None, words=None):
+        """Provisional Stage 3 / Stage 5 decision on an interim result; early commands may fire"""
+        try:
+            if tokens is None:
+                tokens = TranscriptTokens.from_result(result)
+            if words is None:
+                words = WordArrays.from_result(result)
+            
+            interim = self.interim_filter
+            decision, changed = interim.update(getattr(result, 'start', None), tokens, words, self.speaker_locks)
+            if changed:
+                if decision.accepted:
+                    self.log_to_terminal(f"⏳ PROVISIONAL ACCEPT: '{decision.text}'")
+                else:
+                    reason = decision.reason if isinstance(decision.reason, str) else decision.reason.describe()
+                    self.log_to_terminal(f"⏳ PROVISIONAL REJECT: {reason}")
+            if self.on_provisional:
+                self.on_provisional(decision.text, decision.accepted)
+            
+            if decision.accepted:
+                command = self.run_commands(decision.tokens, skip=interim.fired_commands, early=True)
+                if command and command not in interim.fired_commands:
+                    interim.fired_commands.add(command)
+                    interim.stats['early_commands'] += 1
+                    self.log_to_terminal(f"⚡ Command '{command}' triggered from interim result")
+        except Exception as e:
+            self.log_to_terminal(f"❌ Error processing interim result: {e}")
+        
+    def process_transcript(self, result, tokens=None, words=None):
+        """Process the recognized text from Deepgram with 5-stage filtering"""
+        try:
+            # Extract text from Deepgram result
+            if result.is_final:
+                self.log_to_terminal(f"📝 Raw transcript received: '{result.channel.alternatives[0].transcript}'")
+                
+                # Apply the revolutionary 5-stage filtering system
+                # This integrates all TV noise filtering with voice locking
+                # Stage 1 reads the utterance's span of sent audio, with the pre-filter's per-frame features
+                audio = self.audio_history.span(getattr(result, 'start', None), getattr(result, 'duration', None)) if self.audio_history else None
+                filtered_transcript = self.apply_5_stage_filtering(result, audio, tokens, words)
+                accepted = bool(filtered_transcript and filtered_transcript.strip())
+                
+                # Confirm or revise the segment's provisional decision; skip commands it already ran
+                fired = ()
+                if self.incremental:
+                    decision, outcome, fired = self.interim_filter.settle(getattr(result, 'start', None), accepted)
+                    if outcome == REVISED:
+                        self.log_to_terminal(f"↩️ PROVISIONAL {'ACCEPT' if decision.accepted else 'REJECT'} REVISED by final result")
+                
+                if accepted:
+                    self.log_to_terminal(f"📝 Final filtered transcript: '{filtered_transcript}'")
+                    
+                    # Hand to the front end (transcription display, daemon output, ...)
+                    self.publish_transcript(filtered_transcript)
+                    
+                    # Voice commands match whole words in the accepted tokens
+                    tokens = self.accepted_tokens or TranscriptTokens.from_text(filtered_transcript)
+                    self.run_commands(tokens, skip=fired)
+                        
+                elif filtered_transcript is None:
+                    # This means the speech was filtered out by one of the 5 stages
+                    pass  # Already logged in filtering stages
+                    
+        except Exception as e:
+            self.log_to_terminal(f"❌ Error processing transcript: {e}")
+            print(f"Error processing transcript: {e}")
+    
+    def on_message(self, result, **kwargs):
+        """Handle Deepgram message events"""
+        try:
+            sentence = result.channel.alternatives[0].transcript
+            if len(sentence) == 0:
+                return
+            
+            self.process_transcript(result)
+        except Exception as e:
+            self.log_to_terminal(f"❌ Error in on_message: {e}")
+    
+    def on_raw_text(self, message):
+        """Fast path for websocket text: handles Results messages, returns False for anything else"""
+        if not is_results(message):
+            return False  # Open/Metadata/SpeechStarted/errors go through the SDK
+        try:
+            if is_empty(message):
+                return True
+            if not (self.show_interim or self.incremental) and is_interim(message):
+                self.interim_skipped += 1
+                return True
+            
+            result = RawResult.from_json(message)
+            if result.is_final:
+                # Tokens and word columns straight from the decoded JSON, no SDK objects
+                self.process_transcript(result, result.tokens(), result.word_arrays())
+            else:
+                if self.show_interim:
+                    self.log_to_terminal(f"📝 Interim: '{result.transcript}'")
+                if self.incremental:
+                    self.process_interim(result, result.tokens(), result.word_arrays())
+        except Exception as e:
+            self.log_to_terminal(f"❌ Error in raw transcript handler: {e}")
+        return True
+    
+    def on_error(self, error, **kwargs):
+        """Handle Deepgram error events"""
+        self.log_to_terminal(f"🔴 Deepgram error: {error}")
+    
+    def on_close(self, close, **kwargs):
+        """Handle Deepgram connection close"""
+        self.log_to_terminal(f"🔌 Deepgram connection closed: {close}")
+    
+    async def start_audio_stream(self, capture=None, connection=None):
+        """Start the audio stream and Deepgram transcription
+        
+        `capture` and `connection` replace the microphone and the Deepgram
+        websocket (e.g. replay.FileAudioSource and replay.RecordedTranscriber);
+        by default a live AudioCapture and Deepgram connection are used.
+        """
+        # Deferred imports keep engine start-up fast on headless hosts
+        from deepgram import LiveTranscriptionEvents, LiveOptions
+        from embedded_config import EmbeddedConfig
+        
+        self.loop = asyncio.get_running_loop()
+        try:
+            self.log_to_terminal("🎯 Starting Voice Filter audio stream...")
+            
+            if connection is None and not self.deepgram:
+                self.init_deepgram()
+            
+            if connection is None and not self.deepgram:
+                self.log_to_terminal("❌ Deepgram client not initialized")
+                return
+            
+            if capture is None:
+                from audio_capture import AudioCapture
+                self.log_to_terminal("🎤 Initializing PyAudio...")
+                # Capture runs on PortAudio's callback thread into a bounded ring buffer
+                capture = AudioCapture(rate=16000, frames_per_buffer=1024)
+            self.capture = capture
+            self.capture.start(asyncio.get_running_loop())
+            self.log_to_terminal("✅ Audio stream initialized")
+            
+            # Configure Deepgram options
+            self.log_to_terminal("⚙️ Configuring Deepgram with speaker diarization...")
+            options = LiveOptions(
+                model="nova-3",  
+                language="en-US",
+                smart_format=True,
+                interim_results=True,
+                utterance_end_ms=1000,
+                vad_events=True,
+                endpointing=300,
+                punctuate=True,
+                diarize=True,                 # ← ENABLED for speaker diarization
+                encoding="linear16",
+                sample_rate=16000
+            )
+            self.log_to_terminal("✅ Deepgram configured: model=nova-3, diarize=True")
+            
+            # Create a websocket connection
+            self.log_to_terminal("🌐 Creating WebSocket connection...")
+            if connection is not None:
+                self.dg_connection = connection
+                if self.raw_results and hasattr(connection, 'on_text'):
+                    connection.on_text = self.on_raw_text
+            elif self.raw_results:
+                # Same websocket client, but Results messages skip the SDK's response objects
+                try:
+                    self.dg_connection = raw_listen_client(self.deepgram_config, self.on_raw_text)
+                except RuntimeError as e:
+                    self.log_to_terminal(f"⚠️ {e} - using the SDK's message parsing")
+                    self.raw_results = False
+                    self.dg_connection = self.deepgram.listen.websocket.v("1")
+            else:
+                self.dg_connection = self.deepgram.listen.websocket.v("1")
+            if self.raw_results:
+                skipping = not (self.show_interim or self.incremental)
+                self.log_to_terminal(f"⚡ Raw JSON fast path enabled{' (interim results skipped)' if skipping else ''}")
+            
+            # Send gate: Deepgram's VAD events plus local Stage 1 cues decide when to stream at all;
+            # it is the only component that idles the stream and sends KeepAlive/Finalize
+            frame_seconds = self.capture.frames_per_buffer / 16000
+            send_gate = SendGate(frame_seconds)
+            self.send_gate = send_gate
+            self.voice_budget = VoiceBudget(EmbeddedConfig.DAILY_VOICE_MINUTES)
+            
+            # Last minute of sent audio, so final results can be mapped back to their frames
+            self.audio_history = AudioHistory(seconds=60.0, frame_len=self.capture.frames_per_buffer, sample_rate=16000)
+            
+            # Diarization IDs restart with every connection; the enrolled voiceprints do not
+            self.voiceprints.new_session()
+            self.speaker_activity.reset()
+            
+            # Store reference to access VoiceFilter instance from event handlers
+            voice_filter = self
+            
+            # Define event handlers
+            def on_open(self, open, **kwargs):
+                voice_filter.log_to_terminal("🟢 Voice Filter connection opened!")
+                voice_filter.update_status("🟢 Connected & Listening", 'success')
+
+            def on_message(self, result, **kwargs):
+                try:
+                    sentence = result.channel.alternatives[0].transcript
+                    if len(sentence) == 0:
+                        return
+                    
+                    if result.is_final:
+                        voice_filter.log_to_terminal(f"📝 Raw transcript received: '{sentence}'")
+                        voice_filter.process_transcript(result)
+                    else:
+                        voice_filter.log_to_terminal(f"📝 Interim: '{sentence}'")
+                        if voice_filter.incremental:
+                            voice_filter.process_interim(result)
+                except Exception as e:
+                    voice_filter.log_to_terminal(f"❌ Error in transcript handler: {e}")
+
+            def on_speech_started(self, speech_started, **kwargs):
+                send_gate.on_speech_started()
+
+            def on_utterance_end(self, utterance_end, **kwargs):
+                send_gate.on_utterance_end()
+
+            def on_error(self, error, **kwargs):
+                voice_filter.log_to_terminal(f"🔴 Deepgram error: {error}")
+                voice_filter.update_status("🔴 Connection Error", 'danger')
+
+            def on_close(self, close, **kwargs):
+                voice_filter.log_to_terminal("🔌 Deepgram connection closed")
+                voice_filter.update_status("🔌 Disconnected", 'muted')
+            
+            # Register event handlers
+            self.dg_connection.on(LiveTranscriptionEvents.Open, on_open)
+            self.dg_connection.on(LiveTranscriptionEvents.Transcript, on_message)
+            self.dg_connection.on(LiveTranscriptionEvents.SpeechStarted, on_speech_started)
+            self.dg_connection.on(LiveTranscriptionEvents.UtteranceEnd, on_utterance_end)
+            self.dg_connection.on(LiveTranscriptionEvents.Error, on_error)
+            self.dg_connection.on(LiveTranscriptionEvents.Close, on_close)
+            
+            self.log_to_terminal("✅ Event handlers registered")
+            
+            # Start Deepgram connection
+            self.log_to_terminal("🚀 Starting Deepgram connection...")
+            # The SDK's start() blocks on the websocket handshake; keep it off the (possibly shared) loop
+            start_result = await self.loop.run_in_executor(None, self.dg_connection.start, options)
+            
+            if not start_result:
+                self.log_to_terminal("❌ Failed to start Deepgram connection")
+                return
+            
+            self.log_to_terminal("✅ Voice Filter started successfully!")
+            self.log_to_terminal("=" * 50)
+            self.log_to_terminal("🎤 VOICE FILTER - ACTIVE")
+            self.log_to_terminal("🔍 Listening for speakers...")
+            self.log_to_terminal("🔒 Will lock onto first speaker with 3+ words")
+            self.log_to_terminal("🗣️ Say 'exit filter' or 'stop filter' to stop")
+            self.log_to_terminal("=" * 50)
+            
+            # Give the connection a moment to fully establish
+            if connection is None:
+                await asyncio.sleep(0.5)
+            
+            self.is_running = True
+            
+            # Stage 1 analyzer with cached FFT plan and scratch buffers for this stream,
+            # reading a rolling Hann-windowed STFT (75% overlap), behind a streaming
+            # gate that sees every frame
+            stft = StreamingSTFT(n_fft=1024, hop=256, sample_rate=16000)
+            stage1 = Stage1Analyzer(self.tv_filter, frame_len=1024, sample_rate=16000, stft=stft)
+            stage1_gate = Stage1Gate(stage1)
+            
+            # Sender thread paced by capture timestamps; coalesces frames when the socket backs up
+            self.sender = AudioSender(self.dg_connection.send, max_coalesce_frames=8,
+                                      on_error=lambda error: self.log_to_terminal(f"❌ Audio send failed: {error} - further failures are only counted"))
+            self.sender_task = asyncio.create_task(self.sender.run())
+            
+            # Pick up edited phrase dictionaries without restarting the session
+            if self.watch_dictionary_file:
+                self.dictionary_task = asyncio.create_task(self.watch_dictionary())
+            
+            # Audio streaming loop
+            loop_count = 0
+            while self.is_running:
+                try:
+                    # Wait for the next captured frame without blocking the event loop
+                    frame = await self.capture.read()
+                    if frame is None:
+                        break
+                    loop_count += 1
+                    
+                    # STAGE 1 ANALYSIS: every captured frame, off the event loop when a DSP pool is shared
+                    if self.dsp_pool is not None:
+                        code = await self.loop.run_in_executor(self.dsp_pool, stage1_gate.analyze, frame)
+                    else:
+                        code = stage1_gate.analyze(frame)
+                    self.audio_history.record_features(frame.index, code, stage1.energy, stage1.zcr)
+                    
+                    # SEND GATE on ungated audio: idle through silence and TV, resume on voice with pre-roll.
+                    # What it lets through goes to the STAGE 1 PRE-FILTER, which holds back runs of TV-like frames
+                    frames_to_send = send_gate.push([frame], code == STAGE1_PASSED, stage1_gate.release)
+                    if send_gate.changed:
+                        if send_gate.streaming:
+                            self.log_to_terminal(f"🎙️ SEND GATE: Voice detected - streaming resumed ({len(frames_to_send)} frames pre-roll)")
+                        else:
+                            self.log_to_terminal(f"💤 SEND GATE: {send_gate.quiet_seconds:.1f}s quiet"
+                                                 f"{' after UtteranceEnd' if send_gate.utterance_ended else ''} - idling on KeepAlive")
+                    if stage1_gate.changed:
+                        if stage1_gate.gated:
+                            reason = stage1.verdict_names[stage1_gate.last_code].replace('filtered_', '').replace('_', ' ').title()
+                            self.log_to_terminal(f"🚫 STAGE 1 PRE-FILTER: Gate closed ({reason})")
+                        else:
+                            self.log_to_terminal(f"🎙️ STAGE 1 PRE-FILTER: Speech onset - gate reopened ({len(frames_to_send)} frames pre-roll)")
+                    
+                    # Send to Deepgram (will go through Stages 2-5 in process_transcript)
+                    if self.dg_connection:
+                        self.audio_history.record_sent(frames_to_send)
+                        self.sender.submit(frames_to_send)
+                        if send_gate.control:
+                            self.sender.submit_control(send_gate.control)
+                        if self.voice_budget.record(len(frames_to_send) * frame_seconds,
+                                                    0.0 if send_gate.streaming else frame_seconds):
+                            self.log_to_terminal(f"⚠️ Daily voice budget of {self.voice_budget.daily_minutes} minutes reached")
+                            self.update_status("⚠️ Daily voice minutes used up", 'warning')
+                        
+                        # Debug every 500 loops (roughly every 30 seconds)
+                        if loop_count % 500 == 0:
+                            self.log_to_terminal(f"🔄 Audio streaming active (loop {loop_count}) - Stage 1 gate {'closed' if stage1_gate.gated else 'open'}, {stage1_gate.frames_dropped} frames filtered")
+                            capture_stats = self.capture.get_stats()
+                            self.log_to_terminal(f"🎤 Capture: {capture_stats['frames_captured']} frames | dropped {capture_stats['ring_overflows']} | "
+                                                 f"overflows {capture_stats['input_overflows']} | underflows {capture_stats['input_underflows']} | "
+                                                 f"max backlog {capture_stats['max_backlog']}")
+                            self.log_to_terminal(f"{self.voice_budget.summary()} | {send_gate.keepalives} KeepAlives, {send_gate.resumes} resumes")
+                            latency = self.sender.latency_stats()
+                            if latency:
+                                self.log_to_terminal(f"⏱️ Capture→send latency: p50 {latency['p50_ms']:.1f} ms | p99 {latency['p99_ms']:.1f} ms | "
+                                                     f"max {latency['max_ms']:.1f} ms | coalesced sends {self.sender.coalesced_sends}")
+                    
+                except Exception as e:
+                    self.log_to_terminal(f"❌ Error in audio loop: {e}")
+                    await asyncio.sleep(0.1)  # Brief pause before retrying
+            
+        except Exception as e:
+            self.log_to_terminal(f"❌ Error starting audio stream: {e}")
+            print(f"❌ Error starting audio stream: {e}")
+            import traceback
+            print(f"🔍 Full traceback: {traceback.format_exc()}")
+        finally:
+            await self.cleanup()
+    
+    async def cleanup(self):
+        """Clean up resources"""
+        self.log_to_terminal("🛑 Stopping Voice Filter...")
+        self.is_running = False
+        
+        if self.dictionary_task:
+            self.dictionary_task.cancel()
+        
+        # Flush queued audio before closing the connection
+        if self.sender_task:
+            self.sender.stop()
+            try:
+                await self.sender_task
+            except Exception as e:
+                self.log_to_terminal(f"❌ Error flushing audio sender: {e}")
+            
+        if self.dg_connection:
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.dg_connection.finish)
+                self.log_to_terminal("✅ Deepgram connection finished")
+            except Exception as e:
+                self.log_to_terminal(f"❌ Error finishing Deepgram connection: {e}")
+            
+        if self.capture:
+            try:
+                self.capture.stop()
+                self.log_to_terminal("✅ Audio stream closed")
+            except Exception as e:
+                self.log_to_terminal(f"❌ Error closing audio stream: {e}")
+        
+        if self.voice_budget:
+            self.log_to_terminal(self.voice_budget.summary())
+        
+        # Keep what the voiceprints learned this session for the next start
+        self.save_voice_profiles()
+        
+        # End any transcripts() iterators
+        for transcript_queue in self._transcript_queues:
+            transcript_queue.put_nowait(None)
+        
+        self.log_to_terminal("✅ Voice Filter cleanup completed")
+        self.update_status("🔴 Stopped", 'muted')
+    
+    def stop_filter(self):
+        """Stop the voice filter"""
+        self.log_to_terminal("🛑 Voice Filter termination requested...")
+        self.is_running = False
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Voice Filter - Multi-stream server
+Runs many independent filter sessions on one asyncio loop, for audio sources
+such as room devices that stream PCM over a local socket. Each connection is
+one session with its own VoiceFilterEngine (TV filter and its statistics,
+speaker locks, voiceprints) and its own Deepgram websocket; Stage 1 DSP for
+all sessions runs on one shared thread pool, and they all filter with one
+phrase dictionary that the server reloads when its file changes.
+
+Protocol, per connection:
+    client -> server  one JSON header line, e.g. {"session": "kitchen", "voice_profile": "alice"},
+                      then raw 16 kHz mono int16 PCM until the client shuts down its write side
+    server -> client  JSON lines: {"session", "time", "transcript"} per accepted transcript,
+                      then {"session", "stats"} when the session ends (or {"error"} if refused)
+
+    python filter_server.py [--host 127.0.0.1] [--port 8765 | --unix PATH] [--dsp-workers N]
+                            [--max-sessions N] [--deepgram-url URL] [--dictionary PATH] [--raw-json]
+                            [--voiceprint-dir DIR] [--quiet]
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import signal
+import ssl
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import certifi
+
+from audio_capture import CapturedFrame
+from filter_engine import VoiceFilterEngine, print_log
+from phrase_dictionary import PhraseDictionary, file_stamp
+from voiceprint import VoiceprintExtractor
+from voiceprint_store import VoiceprintStore
+
+# Header fields a client may set for its own session
+SESSION_OPTIONS = ('voice_profile', 'max_speakers')
+MAX_SPEAKERS_LIMIT = 16
+
+def parse_header(line):
+    """A client's header line as a dict with validated session options; raises ValueError"""
+    header = json.loads(line.strip() or b"{}")
+    if not isinstance(header, dict):
+        raise ValueError("header must be a JSON object")
+    voice_profile = header.get('voice_profile')
+    if voice_profile is not None and not (isinstance(voice_profile, str) or
+                                          (isinstance(voice_profile, list) and all(isinstance(name, str) for name in voice_profile))):
+        raise ValueError("voice_profile must be a name, a comma-separated string or a list of names")
+    max_speakers = header.get('max_speakers')
+    if max_speakers is not None:
+        if isinstance(max_speakers, bool) or not isinstance(max_speakers, int):
+            raise ValueError("max_speakers must be an integer")
+        if not 1 <= max_speakers <= MAX_SPEAKERS_LIMIT:
+            raise ValueError(f"max_speakers must be between 1 and {MAX_SPEAKERS_LIMIT}")
+    return header
+
+class SocketAudioSource:
+    """Drop-in for AudioCapture fed with PCM bytes arriving on a socket.
+
+    feed() cuts the byte stream into frames_per_buffer-sample frames, stamped
+    with their arrival time and their stream time (samples received so far),
+    into a bounded ring like AudioCapture's: if the session falls behind, the
+    oldest frame is dropped and counted. Everything runs on the event loop.
+    """
+
+    def __init__(self, rate=16000, frames_per_buffer=1024, capacity=64):
+        self.rate = rate
+        self.frames_per_buffer = frames_per_buffer
+        self.capacity = capacity
+        self.frame_bytes = frames_per_buffer * 2
+        self.is_running = False
+        self.ended = False  # no more audio will arrive; read() drains the ring, then returns None
+
+        self._buffer = bytearray()
+        self._frames = deque()
+        self._frame_ready = None
+
+        # Counters
+        self.bytes_received = 0
+        self.frames_captured = 0
+        self.ring_overflows = 0
+        self.max_backlog = 0
+
+    def start(self, loop=None):
+        if self._frame_ready is None:
+            self._frame_ready = asyncio.Event()
+        self.is_running = True
+
+    def feed(self, data):
+        """Append received PCM; whole frames go into the ring"""
+        if self._frame_ready is None:
+            self._frame_ready = asyncio.Event()
+        self.bytes_received += len(data)
+        self._buffer += data
+        arrived_at = time.monotonic()
+        while len(self._buffer) >= self.frame_bytes:
+            frame = CapturedFrame(bytes(self._buffer[:self.frame_bytes]), self.frames_captured, arrived_at,
+                                  self.frames_captured * self.frames_per_buffer / self.rate)
+            del self._buffer[:self.frame_bytes]
+            self.frames_captured += 1
+            if len(self._frames) >= self.capacity:
+                self._frames.popleft()
+                self.ring_overflows += 1
+            self._frames.append(frame)
+        self.max_backlog = max(self.max_backlog, len(self._frames))
+        if self._frames:
+            self._frame_ready.set()
+
+    def end(self):
+        """The client finished sending; a partial last frame is discarded"""
+        self.ended = True
+        if self._frame_ready:
+            self._frame_ready.set()
+
+    async def read(self):
+        """Wait for the next frame; returns None once the source has stopped or ended and drained"""
+        while not self._frames:
+            if not self.is_running or self.ended:
+                return None
+            self._frame_ready.clear()
+            await self._frame_ready.wait()
+        return self._frames.popleft()
+
+    def backlog(self):
+        return len(self._frames)
+
+    def get_stats(self):
+        return {
+            'frames_captured': self.frames_captured,
+            'ring_overflows': self.ring_overflows,
+            'input_overflows': 0,
+            'input_underflows': 0,
+            'max_backlog': self.max_backlog,
+        }
+
+    def stop(self):
+        self.is_running = False
+        if self._frame_ready:
+            self._frame_ready.set()
+
+class FilterSession:
+    """One connection: its engine, its audio source and the stream its results go back on"""
+
+    def __init__(self, name, writer, loop):
+        self.name = name
+        self.writer = writer
+        self.loop = loop
+        self.source = SocketAudioSource()
+        self.engine = None
+        self.transcripts = 0
+        self.started_at = time.monotonic()
+
+    def send(self, message):
+        """Queue one JSON line to the client (call on the event loop)"""
+        if not self.writer.is_closing():
+            self.writer.write(json.dumps(message).encode() + b"\n")
+
+    def emit_transcript(self, text):
+        """on_transcript callback; may run on the Deepgram listener thread"""
+        self.transcripts += 1
+        message = {"session": self.name, "time": datetime.datetime.now().isoformat(), "transcript": text}
+        self.loop.call_soon_threadsafe(self.send, message)
+
+    def stats(self):
+        filter_stats = self.engine.tv_filter.filter_stats
+        return {
+            'seconds': round(time.monotonic() - self.started_at, 3),
+            'audio_seconds': self.source.frames_captured * self.source.frames_per_buffer / self.source.rate,
+            'transcripts': self.transcripts,
+            'accepted': self.engine.accepted_count,
+            'filtered': self.engine.filtered_count,
+            'total_processed': filter_stats['total_processed'],
+            'passed_all_stages': filter_stats['passed_all_stages'],
+            'locked_speakers': self.engine.speaker_locks.bound_ids(),
+            'ring_overflows': self.source.ring_overflows,
+        }
+
+class SessionManager:
+    """Runs one VoiceFilterEngine per connection on the current event loop.
+
+    Sessions share only the Stage 1 DSP thread pool (each session's analyzer
+    and gate are its own and are called one frame at a time, so threads
+    suffice and nothing is pickled), an SSL context, the voiceprint store
+    (one instance, so sessions saving profiles merge into the same files) and
+    the phrase dictionary: loaded and compiled once, watched by one poller,
+    and swapped into every session's TV filter when it changes.
+    Engine options come from the server's command line plus the
+    SESSION_OPTIONS a client sends in its header.
+    """
+
+    def __init__(self, dsp_workers=4, max_sessions=64, engine_options=None, log=None):
+        # The engine defers the SDK import to session start; pay it once here, not on the shared loop
+        import deepgram  # noqa: F401
+        self.ssl_context = ssl.create_default_context(cafile=certifi.where())
+        self.max_sessions = max_sessions
+        self.engine_options = dict(engine_options or {})
+        self.log = log or print_log
+        # Compiled here, before serving, rather than on the loop for every connection
+        self.dictionary = PhraseDictionary.load(self.engine_options.pop('dictionary_path', None))
+        self._dictionary_stamp = file_stamp(self.dictionary.path)
+        self.dsp_pool = ThreadPoolExecutor(max_workers=dsp_workers, thread_name_prefix="stage1-dsp")
+        self.sessions = {}
+        self.sessions_started = 0
+        self.sessions_refused = 0
+        self.voiceprint_store = None  # opened for the first session with a voice profile
+        self.server = None
+        self._stopping = None
+
+    def session_name(self, requested):
+        """The requested name, made unique among running sessions"""
+        name = str(requested or f"session-{self.sessions_started + 1}")
+        suffix = 2
+        unique = name
+        while unique in self.sessions:
+            unique = f"{name}#{suffix}"
+            suffix += 1
+        return unique
+
+    def make_engine(self, session, header):
+        options = dict(self.engine_options)
+        if header.get('voice_profile'):
+            options['voice_profile'] = header['voice_profile']
+            if self.voiceprint_store is None:
+                self.voiceprint_store = VoiceprintStore(options.get('voiceprint_dir'), VoiceprintExtractor().signature)
+            options['voiceprint_store'] = self.voiceprint_store
+        if header.get('max_speakers') is not None:
+            options['max_locked_speakers'] = header['max_speakers']
+        engine = VoiceFilterEngine(
+            on_log=lambda message: self.log(f"[{session.name}] {message}"),
+            on_status=lambda message, level=None: self.log(f"[{session.name}] {message}"),
+            on_transcript=session.emit_transcript,
+            dsp_pool=self.dsp_pool,
+            ssl_context=self.ssl_context,
+            dictionary=self.dictionary,
+            **options,
+        )
+        # Interim results are never shown by the server; the raw fast path can skip them unparsed
+        engine.show_interim = False
+        return engine
+
+    async def handle_client(self, reader, writer):
+        """Serve one connection as a session until the client stops sending or the engine stops"""
+        loop = asyncio.get_running_loop()
+        try:
+            header = parse_header(await reader.readline())
+        except ValueError as e:
+            writer.write(json.dumps({"error": f"bad header: {e}"}).encode() + b"\n")
+            await self.close_writer(writer)
+            return
+        if len(self.sessions) >= self.max_sessions:
+            self.sessions_refused += 1
+            writer.write(json.dumps({"error": f"server full ({self.max_sessions} sessions)"}).encode() + b"\n")
+            await self.close_writer(writer)
+            return
+
+        session = FilterSession(self.session_name(header.get('session')), writer, loop)
+        session.engine = self.make_engine(session, {key: header.get(key) for key in SESSION_OPTIONS})
+        self.sessions[session.name] = session
+        self.sessions_started += 1
+        self.log(f"🔗 Session '{session.name}' connected ({len(self.sessions)} active)")
+
+        session.source.start(loop)
+        engine_task = asyncio.create_task(session.engine.start_audio_stream(capture=session.source))
+        # An engine that stops on its own (voice command, failed connection) ends the read loop too
+        engine_task.add_done_callback(lambda task: reader.feed_eof())
+        try:
+            while not engine_task.done():
+                data = await reader.read(65536)
+                if not data:
+                    break
+                session.source.feed(data)
+        except ConnectionError as e:
+            self.log(f"[{session.name}] ❌ Connection lost: {e!r}")
+            session.engine.stop_filter()
+        finally:
+            session.source.end()
+            await engine_task
+            stats = session.stats()
+            session.send({"session": session.name, "stats": stats})
+            await self.close_writer(writer)
+            del self.sessions[session.name]
+            self.log(f"🔌 Session '{session.name}' closed: {stats['accepted']} accepted, {stats['filtered']} filtered, "
+                     f"{stats['audio_seconds']:.1f}s audio ({len(self.sessions)} active)")
+
+    @staticmethod
+    async def close_writer(writer):
+        try:
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    def stop_all(self):
+        """Ask every session to stop; each drains, finishes its Deepgram websocket and reports"""
+        for session in list(self.sessions.values()):
+            session.engine.stop_filter()
+            session.source.stop()
+
+    def use_dictionary(self, dictionary):
+        """Make a loaded PhraseDictionary current for new sessions and every running one"""
+        self.dictionary = dictionary
+        for session in self.sessions.values():
+            session.engine.tv_filter.use_dictionary(dictionary)
+        self.log(f"📚 Phrase dictionary v{dictionary.version} loaded: {dictionary.phrase_count} phrases "
+                 f"({len(self.sessions)} active sessions)")
+
+    async def watch_dictionary(self, interval=2.0):
+        """Poll the dictionary file and swap it into all sessions whenever it changes"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            stamp = file_stamp(self.dictionary.path)
+            if stamp is None or stamp == self._dictionary_stamp:
+                continue
+            self._dictionary_stamp = stamp  # a broken file is reported once, not every tick
+            try:
+                # Compile off the event loop so audio keeps flowing; swap on it, where sessions come and go
+                dictionary = await loop.run_in_executor(None, PhraseDictionary.load, self.dictionary.path)
+            except Exception as e:
+                self.log(f"❌ Phrase dictionary reload failed, keeping v{self.dictionary.version}: {e}")
+                continue
+            self.use_dictionary(dictionary)
+
+    def summary(self):
+        lines = [f"🛰️ {len(self.sessions)} active sessions, {self.sessions_started} started, {self.sessions_refused} refused"]
+        for name, session in sorted(self.sessions.items()):
+            stats = session.stats()
+            lines.append(f"{name}: {stats['audio_seconds']:.0f}s audio, {stats['accepted']} accepted, "
+                         f"{stats['filtered']} filtered, locked {stats['locked_speakers'] or '-'}, "
+                         f"backlog {session.source.backlog()}, dropped {stats['ring_overflows']}")
+        return "\n".join(lines)
+
+    async def serve(self, host="127.0.0.1", port=8765, unix_path=None, report_interval=60.0):
+        """Accept sessions until stop() is called, logging a summary every report_interval seconds"""
+        self._stopping = asyncio.Event()
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+            self.log(f"🛰️ Voice Filter server listening on {unix_path}")
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+            bound = ", ".join(str(sock.getsockname()[:2]) for sock in server.sockets)
+            self.log(f"🛰️ Voice Filter server listening on {bound}")
+        self.server = server
+        watcher = asyncio.create_task(self.watch_dictionary())
+        async with server:
+            while not self._stopping.is_set():
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), report_interval)
+                except asyncio.TimeoutError:
+                    if self.sessions:
+                        self.log(self.summary())
+            server.close()
+            watcher.cancel()
+            await self.shutdown()
+
+    def stop(self):
+        """Stop accepting connections and end the running sessions"""
+        self.stop_all()
+        if self._stopping:
+            self._stopping.set()
+
+    async def shutdown(self):
+        """Wait for the sessions to finish, then release the DSP pool"""
+        self.stop_all()
+        while self.sessions:
+            await asyncio.sleep(0.1)
+        self.dsp_pool.shutdown(wait=False)
+        self.log("🛑 Voice Filter server stopped")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Voice Filter server: many PCM streams, one event loop")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--dsp-workers", type=int, default=4, help="threads for Stage 1 DSP, shared by all sessions")
+    parser.add_argument("--max-sessions", type=int, default=64, help="refuse connections beyond this many sessions")
+    parser.add_argument("--deepgram-url", help="Deepgram endpoint (default: the SDK's; http:// maps to ws://)")
+    parser.add_argument("--dictionary", help="Stage 3 phrase dictionary (default: dictionaries/tv_phrases.json)")
+    parser.add_argument("--raw-json", action="store_true",
+                        help="decode transcript messages straight from the websocket JSON (faster at high message rates)")
+    parser.add_argument("--voiceprint-dir", help="voiceprint store for sessions that send a voice_profile")
+    parser.add_argument("--report-interval", type=float, default=60.0, help="seconds between session summaries")
+    parser.add_argument("--quiet", action="store_true", help="suppress activity logs on stderr")
+    return parser.parse_args()
+
+def main():
+    # Imported here to keep the daemon's CLI helpers out of library use of this module
+    from voice_filter_daemon import make_log_sink
+
+    args = parse_args()
+    manager = SessionManager(
+        dsp_workers=args.dsp_workers,
+        max_sessions=args.max_sessions,
+        engine_options={
+            'dictionary_path': args.dictionary,
+            'raw_results': args.raw_json,
+            'voiceprint_dir': args.voiceprint_dir,
+            'deepgram_url': args.deepgram_url,
+        },
+        log=make_log_sink(args.quiet),
+    )
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, manager.stop)
+            except NotImplementedError:
+                pass  # Windows: fall back to KeyboardInterrupt
+        await manager.serve(args.host, args.port, args.unix, args.report_interval)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
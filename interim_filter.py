@@ -0,0 +1,102 @@
+from collections import namedtuple
+
+import numpy as np
+
+from stage_pipeline import as_verdict
+
+# What the final result did to a segment's last provisional decision
+CONFIRMED = 'confirmed'
+REVISED = 'revised'
+
+class Provisional(namedtuple('Provisional', ['segment', 'accepted', 'reason', 'tokens'])):
+    """Early decision on an interim hypothesis.
+
+    segment  - stream start time shared by a segment's interim and final results
+    accepted - whether the final is expected to be accepted
+    reason   - the Stage 3 Verdict, 'filtered_voice_lock' or None when accepted
+    tokens   - TranscriptTokens of the text that would be accepted (Stage 5 applied)
+    """
+
+    __slots__ = ()
+
+    @property
+    def text(self):
+        return ' '.join(self.tokens.word_texts) if self.tokens.word_texts is not None else self.tokens.text
+
+class InterimFilter:
+    """Stage 3 phrase checks and Stage 5 speaker checks on interim hypotheses.
+
+    Deepgram re-sends a growing hypothesis for the current segment (same
+    `start`) until it finalizes it. Each interim gets a provisional decision
+    without touching filter statistics or the speaker lock; the final result
+    then confirms or revises the segment's last one. Only the cheap checks
+    whose answer rarely changes as words arrive run here - Stages 2 and 4
+    depend on the finished word list and wait for the final. While locks are
+    pre-armed with voiceprints but none is bound, interims are rejected: the
+    final result, with its audio, decides who the speaker is.
+    """
+
+    def __init__(self, tv_filter):
+        self.tv_filter = tv_filter
+        self.current = None          # last Provisional for the open segment
+        self.fired_commands = set()  # commands already run early for the open segment
+        self.stats = {
+            'interims': 0,
+            'provisional_accepts': 0,
+            'provisional_rejects': 0,
+            CONFIRMED: 0,
+            REVISED: 0,
+            'abandoned': 0,
+            'early_commands': 0,
+        }
+
+    def update(self, segment, tokens, words, speaker_locks=None):
+        """Provisional decision for an interim; returns (decision, changed since the last interim)"""
+        if self.current is not None and self.current.segment != segment:
+            self.stats['abandoned'] += 1  # finalized empty or dropped
+            self.fired_commands = set()
+        previous = self.current if self.current is not None and self.current.segment == segment else None
+        self.stats['interims'] += 1
+
+        outcome = self.tv_filter.stage3_phrase_code(tokens)
+        if outcome:
+            decision = Provisional(segment, False, as_verdict(self.tv_filter.stage3, outcome), tokens)
+        elif speaker_locks is not None and speaker_locks.any_bound and len(words):
+            keep = speaker_locks.mask(words.speaker)
+            if keep.any():
+                decision = Provisional(segment, True, None, tokens.select_words(np.flatnonzero(keep).tolist()))
+            else:
+                decision = Provisional(segment, False, 'filtered_voice_lock', tokens)
+        elif speaker_locks is not None and speaker_locks.armed:
+            # Pre-armed voiceprints that no speaker has matched yet: only the final can judge by voice
+            decision = Provisional(segment, False, 'filtered_voice_lock', tokens)
+        else:
+            decision = Provisional(segment, True, None, tokens)
+
+        self.current = decision
+        changed = previous is None or previous.accepted != decision.accepted
+        if changed:
+            self.stats['provisional_accepts' if decision.accepted else 'provisional_rejects'] += 1
+        return decision, changed
+
+    def settle(self, segment, accepted):
+        """Close a segment with its final outcome.
+
+        Returns (last Provisional, CONFIRMED or REVISED, commands already run early),
+        or (None, None, empty set) when no interim of this segment was seen.
+        """
+        decision, fired = self.current, self.fired_commands
+        self.current, self.fired_commands = None, set()
+        if decision is None or decision.segment != segment:
+            if decision is not None:
+                self.stats['abandoned'] += 1
+            return None, None, set()
+        outcome = CONFIRMED if decision.accepted == accepted else REVISED
+        self.stats[outcome] += 1
+        return decision, outcome, fired
+
+    def summary(self):
+        stats = self.stats
+        return (f"⏳ Interim filtering: {stats['interims']} hypotheses | {stats['provisional_accepts']} provisional accepts, "
+                f"{stats['provisional_rejects']} rejects | {stats[CONFIRMED]} confirmed, {stats[REVISED]} revised | "
+                f"{stats['early_commands']} early commands")
@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from phrase_matcher import PhraseMatcher
+
+# Bump DICTIONARY_FORMAT for incompatible file changes
+DICTIONARY_FORMAT = 1
+
+DEFAULT_DICTIONARY_PATH = Path(__file__).resolve().parent / "dictionaries" / "tv_phrases.json"
+
+# Categories the built-in Stage 3 checks read; files may add their own
+CATEGORIES = ('commercial', 'news', 'show', 'disfluency', 'complex', 'commercial_indicator')
+
+class PhraseDictionary:
+    """Stage 3 phrase lists loaded from a versioned data file, with their compiled matcher.
+
+    The matcher is rebuilt on every load: compiling even 10k phrases takes
+    tens of milliseconds, so nothing is cached on disk.
+    """
+
+    def __init__(self, phrases, version=None, path=None, digest=None, matcher=None):
+        self.phrases = {name: list(phrases.get(name, ())) for name in CATEGORIES}
+        self.phrases.update({name: list(items) for name, items in phrases.items() if name not in self.phrases})
+        self.version = version
+        self.path = path
+        self.digest = digest
+        self.matcher = matcher or PhraseMatcher(self.phrases)
+
+    @classmethod
+    def load(cls, path=None):
+        """Read and validate a dictionary file and compile its matcher"""
+        path = Path(path or DEFAULT_DICTIONARY_PATH)
+        raw = path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        data = json.loads(raw.decode('utf-8'))
+        if data.get('format', DICTIONARY_FORMAT) != DICTIONARY_FORMAT:
+            raise ValueError(f"{path}: unsupported dictionary format {data.get('format')!r}")
+        phrases = data.get('phrases')
+        if not isinstance(phrases, dict) or not all(isinstance(items, list) for items in phrases.values()):
+            raise ValueError(f"{path}: 'phrases' must map category names to lists of phrases")
+
+        return cls(phrases, data.get('version'), path, digest)
+
+    @property
+    def phrase_count(self):
+        return sum(len(items) for items in self.phrases.values())
+
+def file_stamp(path):
+    """Cheap change detector for a dictionary file: (mtime_ns, size), or None if missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
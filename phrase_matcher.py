@@ -0,0 +1,116 @@
+import re
+
+from transcript_tokens import tokenize
+
+# Up to this many phrases, match_text() looks each one up with `in` instead of
+# tokenizing the text (see benchmarks/bench_phrase_matcher.py)
+SMALL_DICTIONARY_PHRASES = 64
+
+def whole_word_pattern(phrase):
+    """Regex for phrase as whole tokens: word ends may not run into other word characters"""
+    head = r"(?<![\w'])" if re.match(r"[\w']", phrase) else ""
+    tail = r"(?![\w'])" if re.match(r"[\w']", phrase[-1]) else ""
+    return re.compile(head + re.escape(phrase) + tail)
+
+class PhraseMatcher:
+    """All-categories phrase matcher compiled once from named phrase lists.
+
+    An Aho-Corasick automaton over word tokens rather than characters, so a
+    phrase only matches on word boundaries ('so' does not hit inside 'also')
+    and one pass over the tokens finds every occurrence of every phrase,
+    including overlapping ones. Each token costs one dict lookup per state
+    transition, independent of how many phrases are loaded.
+
+    Matching is on whole tokens, not substrings of the transcript. For text
+    that has not been tokenized yet, match_text() keeps small dictionaries
+    (the stock one included) as cheap as the plain `in` loops they replaced.
+    """
+
+    def __init__(self, categories):
+        # categories: {name: [phrase, ...]}; a phrase's index is its position in its list
+        self.categories = {name: list(phrases) for name, phrases in categories.items()}
+
+        self._goto = [{}]     # state -> {token: next state}
+        self._fail = [0]
+        self._output = [()]   # state -> ((category, index, length), ...)
+        self._build()
+
+        # Small dictionaries: (category, index, phrase, whole-word pattern) for match_text()
+        self._scan = None
+        if sum(map(len, self.categories.values())) <= SMALL_DICTIONARY_PHRASES:
+            self._scan = [(name, index, phrase, whole_word_pattern(phrase))
+                          for name, phrases in self.categories.items()
+                          for index, phrase in enumerate(p.lower().strip() for p in phrases) if phrase]
+
+    def _build(self):
+        goto, output = self._goto, self._output
+        for name, phrases in self.categories.items():
+            for index, phrase in enumerate(phrases):
+                tokens = tokenize(phrase.lower())
+                if not tokens:
+                    continue
+                state = 0
+                for token in tokens:
+                    following = goto[state].get(token)
+                    if following is None:
+                        following = len(goto)
+                        goto[state][token] = following
+                        goto.append({})
+                        self._fail.append(0)
+                        output.append(())
+                    state = following
+                output[state] += ((name, index, len(tokens)),)
+
+        # Breadth-first failure links; each state inherits its fallback's outputs
+        queue = list(goto[0].values())
+        for state in queue:
+            for token, following in goto[state].items():
+                fallback = self._fail[state]
+                while fallback and token not in goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[following] = goto[fallback].get(token, 0)
+                output[following] += output[self._fail[following]]
+                queue.append(following)
+
+    @property
+    def states(self):
+        return len(self._goto)
+
+    def find(self, tokens):
+        """Every match as (category, phrase index, first token, end token)"""
+        goto, fail, output = self._goto, self._fail, self._output
+        matches = []
+        state = 0
+        for position, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if output[state]:
+                end = position + 1
+                for name, index, length in output[state]:
+                    matches.append((name, index, end - length, end))
+        return matches
+
+    def match_text(self, text):
+        """match() on lowercased text that has not been tokenized yet"""
+        if self._scan is None:
+            return self.match(tokenize(text))
+        # Substring test first; the whole-word check only runs on the rare hits
+        found = {}
+        for name, index, phrase, pattern in self._scan:
+            if phrase in text and pattern.search(text):
+                found.setdefault(name, set()).add(index)
+        return found
+
+    def match(self, tokens):
+        """Matched phrase indices per category: {category: {index, ...}}"""
+        found = {}
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for token in tokens:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for name, index, _ in output[state]:
+                found.setdefault(name, set()).add(index)
+        return found
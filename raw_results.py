@@ -0,0 +1,118 @@
+import json
+from types import SimpleNamespace
+
+from transcript_tokens import TranscriptTokens
+from word_arrays import WordArrays
+
+try:
+    import orjson  # optional: several times faster than the json module on Deepgram messages
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+# raw_listen_client overrides the SDK's private ListenWebSocketClient._process_text,
+# so it is only used with the release it was written against (see requirements.txt)
+RAW_CLIENT_SDK_VERSION = "4.1.0"
+
+# Cheap pre-parse checks on the raw message text: look at the value after the
+# first occurrence of a key. Quotes inside JSON string values are always
+# escaped, so a transcript cannot fake these keys; the first "transcript" key
+# is the top alternative's.
+def _value_after(text, key, width=12):
+    at = text.find(key)
+    if at < 0:
+        return None
+    return text[at + len(key):at + len(key) + width].lstrip(' \t\r\n:')
+
+def is_results(text):
+    value = _value_after(text, '"type"')
+    return value is not None and value.startswith('"Results"')
+
+def is_interim(text):
+    value = _value_after(text, '"is_final"')
+    return value is not None and value.startswith('false')
+
+def is_empty(text):
+    value = _value_after(text, '"transcript"')
+    return value is not None and value.startswith('""')
+
+class RawResult:
+    """A Deepgram Results message decoded straight from websocket JSON.
+
+    Carries what the engine reads (is_final, timing, the first alternative's
+    transcript and confidence) plus the word dicts, from which the shared
+    TranscriptTokens and WordArrays are built without any SDK objects.
+    `result.channel.alternatives[0]` still works for custom 'result' stages;
+    its `words` are converted to attribute objects only if someone reads them.
+    """
+
+    __slots__ = ('message', 'is_final', 'speech_final', 'start', 'duration',
+                 'transcript', 'confidence', 'word_dicts', '_channel')
+
+    def __init__(self, message):
+        alternative = message['channel']['alternatives'][0]
+        self.message = message
+        self.is_final = message.get('is_final', False)
+        self.speech_final = message.get('speech_final', False)
+        self.start = message.get('start', 0.0)
+        self.duration = message.get('duration', 0.0)
+        self.transcript = alternative.get('transcript', '')
+        self.confidence = alternative.get('confidence')
+        self.word_dicts = alternative.get('words') or []
+        self._channel = None
+
+    @classmethod
+    def from_json(cls, text):
+        return cls(loads(text))
+
+    def tokens(self):
+        return TranscriptTokens.from_word_texts([word.get('word', '') for word in self.word_dicts], self.transcript)
+
+    def word_arrays(self):
+        return WordArrays.from_dicts(self.word_dicts, self.confidence)
+
+    @property
+    def channel(self):
+        """SDK-shaped view of the message's channel, built on first access"""
+        if self._channel is None:
+            alternative = _LazyAlternative(self.transcript, self.confidence, self.word_dicts)
+            self._channel = SimpleNamespace(alternatives=[alternative])
+        return self._channel
+
+class _LazyAlternative:
+    __slots__ = ('transcript', 'confidence', '_word_dicts', '_words')
+
+    def __init__(self, transcript, confidence, word_dicts):
+        self.transcript = transcript
+        self.confidence = confidence
+        self._word_dicts = word_dicts
+        self._words = None
+
+    @property
+    def words(self):
+        if self._words is None:
+            self._words = [SimpleNamespace(**word) for word in self._word_dicts]
+        return self._words
+
+def raw_listen_client(config, on_text):
+    """Deepgram live client whose text messages go to on_text(message) first.
+
+    on_text returns True when it has handled a message itself; anything it
+    declines (Metadata, SpeechStarted, errors, ...) takes the SDK's normal
+    parse-and-dispatch path, so the usual `.on(...)` handlers still fire.
+    Raises RuntimeError on any deepgram-sdk other than RAW_CLIENT_SDK_VERSION.
+    """
+    # Deferred like the engine's other SDK imports
+    import deepgram
+    from deepgram import ListenWebSocketClient
+
+    version = str(getattr(deepgram, '__version__', '')).lstrip('v')
+    if version != RAW_CLIENT_SDK_VERSION or not callable(getattr(ListenWebSocketClient, '_process_text', None)):
+        raise RuntimeError(f"raw JSON fast path needs deepgram-sdk {RAW_CLIENT_SDK_VERSION}, found {version or 'unknown'}")
+
+    class RawListenWebSocketClient(ListenWebSocketClient):
+        def _process_text(self, message):
+            if not on_text(message):
+                super()._process_text(message)
+
+    return RawListenWebSocketClient(config)
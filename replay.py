@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Voice Filter - Offline replay
+Streams a WAV or raw PCM recording through the same path as the live app
+(Stage 1 gate → send → Stages 2-5) with no microphone and no network.
+Transcripts come from recorded Deepgram responses, delivered as the replayed
+audio reaches their timestamps.
+
+    python replay.py recording.wav --responses recording.jsonl [--realtime] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+
+from audio_capture import CapturedFrame
+
+def load_pcm(path, sample_rate=16000):
+    """Load a recording as 16 kHz-style mono int16 samples.
+
+    WAV files are downmixed and linearly resampled to `sample_rate` if needed;
+    any other extension is read as raw little-endian int16 mono at `sample_rate`.
+    """
+    if str(path).lower().endswith('.wav'):
+        with wave.open(str(path), 'rb') as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"{path}: only 16-bit PCM WAV is supported")
+            channels = wav.getnchannels()
+            file_rate = wav.getframerate()
+            samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2')
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1)
+        if file_rate != sample_rate:
+            duration = len(samples) / file_rate
+            target = np.arange(int(duration * sample_rate)) / sample_rate
+            samples = np.interp(target, np.arange(len(samples)) / file_rate, samples)
+        return np.asarray(samples).astype(np.int16)
+    return np.fromfile(str(path), dtype='<i2')
+
+class FileAudioSource:
+    """Drop-in for AudioCapture that reads frames from a recording.
+
+    As fast as possible by default; with realtime=True each frame is held
+    until its stream time, like a microphone would deliver it.
+    """
+
+    def __init__(self, samples, rate=16000, frames_per_buffer=1024, realtime=False):
+        self.samples = samples
+        self.rate = rate
+        self.frames_per_buffer = frames_per_buffer
+        self.realtime = realtime
+        self.is_running = False
+        self.frames_captured = 0
+        self._clock_start = None
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        return cls(load_pcm(path, kwargs.get('rate', 16000)), **kwargs)
+
+    @property
+    def duration(self):
+        """Recording length in seconds"""
+        return len(self.samples) / self.rate
+
+    @property
+    def position(self):
+        """Stream time reached so far, in seconds"""
+        return min(self.frames_captured * self.frames_per_buffer, len(self.samples)) / self.rate
+
+    def start(self, loop=None):
+        self.is_running = True
+        self._clock_start = time.monotonic()
+
+    async def read(self):
+        """Next frame of the recording, or None at the end"""
+        start = self.frames_captured * self.frames_per_buffer
+        if not self.is_running or start + self.frames_per_buffer > len(self.samples):
+            self.is_running = False
+            return None
+
+        stream_time = start / self.rate
+        if self.realtime:
+            delay = self._clock_start + stream_time + self.frames_per_buffer / self.rate - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        else:
+            await asyncio.sleep(0)  # let the sender and other tasks run
+
+        data = self.samples[start:start + self.frames_per_buffer].tobytes()
+        frame = CapturedFrame(data, self.frames_captured, time.monotonic(), stream_time)
+        self.frames_captured += 1
+        return frame
+
+    def backlog(self):
+        return 0
+
+    def get_stats(self):
+        return {
+            'frames_captured': self.frames_captured,
+            'ring_overflows': 0,
+            'input_overflows': 0,
+            'input_underflows': 0,
+            'max_backlog': 0,
+        }
+
+    def stop(self):
+        self.is_running = False
+
+def to_namespace(value):
+    """Recursively turn decoded JSON into attribute-access objects shaped like SDK responses"""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: to_namespace(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [to_namespace(item) for item in value]
+    return value
+
+def load_responses(path):
+    """Recorded Deepgram messages from a JSON array or a JSON-lines file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read().strip()
+    if not text:
+        return []
+    if text.startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def message_time(message):
+    """Stream time at which Deepgram would have sent this message"""
+    kind = message.get('type')
+    if kind == 'Results':
+        return message.get('start', 0.0) + message.get('duration', 0.0)
+    if kind == 'SpeechStarted':
+        return message.get('timestamp', 0.0)
+    if kind == 'UtteranceEnd':
+        return message.get('last_word_end', 0.0)
+    return 0.0
+
+class RecordedTranscriber:
+    """Local stand-in for the Deepgram live websocket.
+
+    Implements the parts of the SDK connection the engine uses (on, start,
+    send, finish). Recorded messages are emitted once `clock()` - the replayed
+    stream time - reaches their timestamp, from whichever thread is sending,
+    just as the SDK emits from its listener thread. If `on_text` is set, each
+    message is first offered to it as JSON text, like the engine's raw fast path
+    sees the websocket; messages it declines go to the event handlers.
+    """
+
+    # Event names match deepgram.LiveTranscriptionEvents values
+    EVENT_TYPES = {'Results', 'SpeechStarted', 'UtteranceEnd', 'Metadata'}
+
+    def __init__(self, messages, clock):
+        self.messages = sorted(messages, key=message_time)
+        self.clock = clock
+        self.handlers = {}
+        self.on_text = None
+        self.bytes_received = 0
+        self.sends = 0
+        self.control_messages = 0
+        self.emitted = 0
+        self._next = 0
+
+    @classmethod
+    def from_file(cls, path, clock):
+        return cls(load_responses(path), clock)
+
+    def on(self, event, handler):
+        self.handlers.setdefault(str(getattr(event, 'value', event)), []).append(handler)
+
+    def _emit(self, event, **kwargs):
+        for handler in self.handlers.get(event, []):
+            handler(self, **kwargs)
+
+    def start(self, options=None):
+        self._emit('Open', open=SimpleNamespace(type='Open'))
+        return True
+
+    def send(self, data):
+        if isinstance(data, str):  # KeepAlive / Finalize
+            self.control_messages += 1
+        else:
+            self.bytes_received += len(data)
+            self.sends += 1
+        self._deliver_until(self.clock())
+        return True
+
+    def finish(self):
+        self._deliver_until(float('inf'))
+        self._emit('Close', close=SimpleNamespace(type='Close'))
+        return True
+
+    def _deliver_until(self, stream_time):
+        while self._next < len(self.messages) and message_time(self.messages[self._next]) <= stream_time:
+            message = self.messages[self._next]
+            self._next += 1
+            kind = message.get('type')
+            if kind not in self.EVENT_TYPES:
+                continue
+            self.emitted += 1
+            if self.on_text and self.on_text(json.dumps(message)):
+                continue
+            if kind == 'Results':
+                self._emit('Results', result=to_namespace(message))
+            elif kind == 'SpeechStarted':
+                self._emit(kind, speech_started=to_namespace(message))
+            elif kind == 'UtteranceEnd':
+                self._emit(kind, utterance_end=to_namespace(message))
+            else:
+                self._emit(kind, metadata=to_namespace(message))
+
+async def replay(engine, audio_path, responses_path=None, realtime=False):
+    """Run one recording through the engine; returns a summary dict"""
+    source = FileAudioSource.from_file(audio_path, realtime=realtime)
+    messages = load_responses(responses_path) if responses_path else []
+    transcriber = RecordedTranscriber(messages, clock=lambda: source.position)
+
+    accepted = []
+    previous = engine.on_transcript
+    def collect(text):
+        accepted.append(text)
+        if previous:
+            previous(text)
+    engine.on_transcript = collect
+
+    started = time.perf_counter()
+    await engine.start_audio_stream(capture=source, connection=transcriber)
+    elapsed = time.perf_counter() - started
+
+    sender = engine.sender
+    return {
+        'audio_seconds': source.duration,
+        'wall_seconds': elapsed,
+        'speed': source.duration / elapsed if elapsed > 0 else float('inf'),
+        'frames_read': source.frames_captured,
+        'frames_sent': sender.frames_sent if sender else 0,
+        'audio_seconds_sent': transcriber.bytes_received / 2 / source.rate,
+        'messages_delivered': transcriber.emitted,
+        'control_messages_sent': transcriber.control_messages,
+        'interim_skipped': engine.interim_skipped,
+        'accepted_transcripts': accepted,
+        'filter_stats': dict(engine.tv_filter.filter_stats),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recording through the 5-stage Voice Filter")
+    parser.add_argument("audio", help="16-bit WAV file, or raw int16 mono PCM at 16 kHz")
+    parser.add_argument("--responses", help="recorded Deepgram messages (JSON array or JSON lines)")
+    parser.add_argument("--realtime", action="store_true", help="pace the replay at 1x instead of full speed")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    parser.add_argument("--verbose", action="store_true", help="print engine activity logs")
+    parser.add_argument("--raw-json", action="store_true", help="decode transcript messages on the raw JSON fast path")
+    parser.add_argument("--voice-profile", help="pre-arm the speaker lock from this stored voiceprint (and update it)")
+    parser.add_argument("--voiceprint-dir", help="voiceprint store (default: ~/.local/share/voice_filter/voiceprints)")
+    args = parser.parse_args()
+
+    from filter_engine import VoiceFilterEngine
+    engine = VoiceFilterEngine(on_log=None if args.verbose else (lambda message: None), raw_results=args.raw_json,
+                               voice_profile=args.voice_profile, voiceprint_dir=args.voiceprint_dir)
+    engine.show_interim = args.verbose
+    summary = asyncio.run(replay(engine, args.audio, args.responses, args.realtime))
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"🎬 Replayed {summary['audio_seconds']:.1f}s of audio in {summary['wall_seconds']:.2f}s ({summary['speed']:.0f}x real time)")
+        print(f"📤 Sent {summary['audio_seconds_sent']:.1f}s of audio ({summary['frames_sent']}/{summary['frames_read']} frames)")
+        print(f"📝 {summary['messages_delivered']} recorded messages → {len(summary['accepted_transcripts'])} accepted transcripts")
+        for text in summary['accepted_transcripts']:
+            print(f"   ✅ {text}")
+        print()
+        print(engine.tv_filter.get_filter_statistics())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
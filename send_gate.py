@@ -0,0 +1,145 @@
+import datetime
+import json
+from collections import deque
+
+# Control messages for the Deepgram live websocket
+KEEPALIVE_MESSAGE = json.dumps({"type": "KeepAlive"})
+FINALIZE_MESSAGE = json.dumps({"type": "Finalize"})
+
+class SendGate:
+    """Decides, frame by frame, whether audio is streamed to Deepgram at all.
+
+    The one place that stops and resumes streaming. It sees every captured
+    frame, before the Stage 1 TV gate: while streaming, it counts quiet ticks
+    (the frame did not pass Stage 1 on its own - silence or TV). Once quiet
+    for `idle_after` seconds and Deepgram has reported UtteranceEnd - or after
+    `max_quiet` seconds regardless, flushing with Finalize - it stops sending
+    audio. Whenever nothing has been sent for `keepalive_interval` seconds
+    (idle here or held back by the TV gate downstream) it emits a KeepAlive so
+    the connection stays open. A SpeechStarted event restarts the quiet count.
+    While idle the newest `preroll_frames` frames are held, and `onset_frames`
+    voiced ticks resume streaming with that pre-roll first.
+    """
+
+    def __init__(self, frame_seconds, idle_after=1.5, max_quiet=4.0, onset_frames=2,
+                 preroll_frames=8, keepalive_interval=5.0):
+        self.frame_seconds = frame_seconds
+        self.idle_after = idle_after
+        self.max_quiet = max_quiet
+        self.onset_frames = onset_frames
+        self.keepalive_interval = keepalive_interval
+
+        self.streaming = True
+        self.changed = False       # True on the tick where streaming stopped or resumed
+        self.control = None        # control message to send this tick (KeepAlive/Finalize), if any
+        self.utterance_ended = False
+        self._quiet_ticks = 0
+        self._onset_run = 0
+        self._since_send = 0.0
+        self._held = deque(maxlen=preroll_frames)
+
+        # Counters
+        self.ticks = 0
+        self.idle_ticks = 0
+        self.keepalives = 0
+        self.resumes = 0
+
+    @property
+    def quiet_seconds(self):
+        return self._quiet_ticks * self.frame_seconds
+
+    def on_speech_started(self):
+        """Deepgram's VAD heard speech: keep streaming"""
+        self.utterance_ended = False
+        self._quiet_ticks = 0
+
+    def on_utterance_end(self):
+        """Deepgram closed the utterance: idling is safe once it is quiet locally"""
+        self.utterance_ended = True
+
+    def push(self, frames, voiced, downstream=None):
+        """Frames captured this tick -> frames to send now.
+
+        `voiced` is the local Stage 1 speech cue for the newest frame. Frames
+        this gate lets through are passed to `downstream` (the Stage 1 TV
+        gate's release) and whatever it returns is sent. Sets `control` when a
+        KeepAlive or Finalize should go out.
+        """
+        self.ticks += 1
+        self.changed = False
+        self.control = None
+        released = self._gate(frames, voiced)
+        if released and downstream is not None:
+            released = downstream(released)
+
+        # Whatever held audio back (this gate or Stage 1), keep the socket alive
+        if released or self.control:
+            self._since_send = 0.0
+        else:
+            self._since_send += self.frame_seconds
+            if self._since_send >= self.keepalive_interval:
+                self._since_send = 0.0
+                self.control = KEEPALIVE_MESSAGE
+                self.keepalives += 1
+        return released
+
+    def _gate(self, frames, voiced):
+        if self.streaming:
+            self._quiet_ticks = 0 if voiced else self._quiet_ticks + 1
+            quiet = self.quiet_seconds
+            if quiet < self.max_quiet and not (self.utterance_ended and quiet >= self.idle_after):
+                return frames
+
+            # Go idle; flush Deepgram unless it already closed the utterance
+            self.streaming = False
+            self.changed = True
+            self._onset_run = 0
+            if not self.utterance_ended:
+                self.control = FINALIZE_MESSAGE
+            self._held.clear()
+            self._held.extend(frames)
+            return []
+
+        # Idle: hold pre-roll and watch for voice
+        self.idle_ticks += 1
+        self._held.extend(frames)
+        self._onset_run = self._onset_run + 1 if voiced else 0
+        if self._onset_run < self.onset_frames:
+            return []
+
+        self.streaming = True
+        self.changed = True
+        self.utterance_ended = False
+        self._quiet_ticks = 0
+        self.resumes += 1
+        released = list(self._held)
+        self._held.clear()
+        return released
+
+class VoiceBudget:
+    """Audio minutes streamed today against a daily allowance (EmbeddedConfig.DAILY_VOICE_MINUTES)"""
+
+    def __init__(self, daily_minutes):
+        self.daily_minutes = daily_minutes
+        self.day = datetime.date.today()
+        self.seconds_sent = 0.0
+        self.seconds_idle = 0.0
+        self.exhausted = False
+
+    def record(self, seconds_sent, seconds_idle=0.0):
+        """Account for one tick; returns True on the tick the allowance runs out"""
+        today = datetime.date.today()
+        if today != self.day:
+            self.day = today
+            self.seconds_sent = self.seconds_idle = 0.0
+            self.exhausted = False
+        self.seconds_sent += seconds_sent
+        self.seconds_idle += seconds_idle
+        if not self.exhausted and self.seconds_sent >= self.daily_minutes * 60:
+            self.exhausted = True
+            return True
+        return False
+
+    def summary(self):
+        return (f"💰 Streamed {self.seconds_sent / 60:.1f} of {self.daily_minutes} daily minutes | "
+                f"{self.seconds_idle / 60:.1f} min idle on KeepAlive")
@@ -0,0 +1,90 @@
+from collections import namedtuple
+
+class SpeakerStats(namedtuple('SpeakerStats', ['utterances', 'words', 'confidence', 'acceptance', 'tv_rate'])):
+    """Decayed view of one speaker's recent utterances.
+
+    utterances - decayed number of final results the speaker appeared in
+    words      - decayed word count
+    confidence - mean word confidence
+    acceptance - share of those results in which Stage 5 kept the speaker's words
+    tv_rate    - share of those results rejected by Stages 1-4 (TV-like)
+    """
+
+    __slots__ = ()
+
+class SpeakerActivity:
+    """Exponentially decayed per-speaker counters over roughly the last `window` utterances.
+
+    Each final result ticks the clock once. A speaker's counters are stored
+    as of the tick they were last touched and decayed by
+    (1 - 1/window) ** elapsed ticks when next read or updated, so an
+    utterance costs O(speakers in it) however long the session runs.
+    Speakers whose presence has decayed below `forget_below` are dropped.
+    """
+
+    def __init__(self, window=20, forget_below=0.05):
+        self.window = window
+        self.decay = 1.0 - 1.0 / window
+        self.forget_below = forget_below
+        self.clock = 0
+        self._counters = {}  # speaker ID -> [tick, utterances, words, confidence sum, accepted, rejected]
+
+    def tick(self):
+        self.clock += 1
+
+    def reset(self):
+        self.clock = 0
+        self._counters = {}
+
+    def _current(self, speaker_id):
+        entry = self._counters.get(speaker_id)
+        if entry is not None and entry[0] != self.clock:
+            factor = self.decay ** (self.clock - entry[0])
+            entry[0] = self.clock
+            for i in range(1, 6):
+                entry[i] *= factor
+        return entry
+
+    def record(self, speaker_id, words, confidence_sum, accepted=False, rejected=False):
+        """Count one utterance of a speaker (call after tick() for that utterance)"""
+        entry = self._current(speaker_id)
+        if entry is None:
+            entry = self._counters[speaker_id] = [self.clock, 0.0, 0.0, 0.0, 0.0, 0.0]
+        entry[1] += 1.0
+        entry[2] += words
+        entry[3] += confidence_sum
+        entry[4] += accepted
+        entry[5] += rejected
+
+    def stats(self, speaker_id):
+        """SpeakerStats of one speaker, or None if not heard recently"""
+        entry = self._current(speaker_id)
+        if entry is None or entry[1] <= 0:
+            return None
+        _, utterances, words, confidence_sum, accepted, rejected = entry
+        return SpeakerStats(utterances, words, confidence_sum / words if words else 0.0,
+                            accepted / utterances, rejected / utterances)
+
+    def looks_tv(self, speaker_id, tv_rate, min_utterances):
+        """Whether enough of a speaker's recent utterances failed Stages 1-4"""
+        stats = self.stats(speaker_id)
+        return stats is not None and stats.utterances >= min_utterances and stats.tv_rate >= tv_rate
+
+    def active(self):
+        """{speaker ID: SpeakerStats} of speakers heard recently; forgets the rest"""
+        speakers = {}
+        for speaker_id in list(self._counters):
+            stats = self.stats(speaker_id)
+            if stats is None or stats.utterances < self.forget_below:
+                del self._counters[speaker_id]
+            else:
+                speakers[speaker_id] = stats
+        return speakers
+
+    def summary(self):
+        lines = [f"🗣️ Recent speakers (last ~{self.window} utterances):"]
+        for speaker_id, stats in sorted(self.active().items()):
+            lines.append(f"Speaker {speaker_id}: {stats.utterances:.1f} utterances, {stats.words:.0f} words, "
+                         f"confidence {stats.confidence:.2f}, {stats.acceptance*100:.0f}% accepted, "
+                         f"{stats.tv_rate*100:.0f}% TV-like")
+        return "\n".join(lines)
@@ -0,0 +1,116 @@
+import numpy as np
+
+from voiceprint import Voiceprint
+
+class SpeakerLock:
+    """One locked Stage 5 user: the diarization ID they have now, their voiceprint and idle count"""
+
+    __slots__ = ('name', 'speaker_id', 'voiceprint', 'profile', 'idle')
+
+    def __init__(self, name, voiceprint=None, profile=False):
+        self.name = name              # voice profile name, or 'user N' for locks taken by word count
+        self.speaker_id = None        # diarization speaker ID currently bound, if any
+        self.voiceprint = voiceprint  # enrolled Voiceprint, if any
+        self.profile = profile        # True when the voiceprint is kept in the VoiceprintStore
+        self.idle = 0                 # utterances since this user was last heard
+
+    def enroll(self, vector, seconds):
+        if self.voiceprint is None:
+            self.voiceprint = Voiceprint(len(vector))
+        self.voiceprint.add(vector, seconds)
+
+class SpeakerLocks:
+    """Stage 5 allowlist of locked users.
+
+    Each lock is bound to at most one diarization speaker ID at a time. A
+    boolean table indexed by speaker ID marks the bound ones, so a result's
+    speaker column becomes its keep-mask in one NumPy indexing operation.
+    A lock with a voiceprint that has not been heard for `idle_release`
+    utterances gives up its ID (Deepgram may reuse it for someone else) and
+    is matched by voice again; locks without a voiceprint keep their ID.
+    """
+
+    def __init__(self, max_locks=1, idle_release=30):
+        self.max_locks = max_locks
+        self.idle_release = idle_release
+        self.locks = []
+        self._by_id = {}                              # bound speaker ID -> SpeakerLock
+        self._allowed = np.zeros(16, dtype=bool)      # speaker ID -> bound to some lock
+
+    def __iter__(self):
+        return iter(self.locks)
+
+    def __len__(self):
+        return len(self.locks)
+
+    @property
+    def has_room(self):
+        return len(self.locks) < self.max_locks
+
+    @property
+    def any_bound(self):
+        return bool(self._by_id)
+
+    @property
+    def armed(self):
+        """Whether any lock has a voiceprint to match speakers against"""
+        return any(lock.voiceprint is not None for lock in self.locks)
+
+    def bound_ids(self):
+        """Bound speaker IDs in lock order"""
+        return [lock.speaker_id for lock in self.locks if lock.speaker_id is not None]
+
+    def add(self, name, voiceprint=None, profile=False):
+        lock = SpeakerLock(name, voiceprint, profile)
+        self.locks.append(lock)
+        return lock
+
+    def lock_of(self, speaker_id):
+        return self._by_id.get(speaker_id)
+
+    def bind(self, lock, speaker_id):
+        """Bind a lock to a speaker ID, taking the ID from any other lock that had it"""
+        self.unbind(lock)
+        other = self._by_id.get(speaker_id)
+        if other is not None:
+            self.unbind(other)
+        if speaker_id >= len(self._allowed):
+            grown = np.zeros(max(2 * len(self._allowed), speaker_id + 1), dtype=bool)
+            grown[:len(self._allowed)] = self._allowed
+            self._allowed = grown
+        lock.speaker_id = speaker_id
+        lock.idle = 0
+        self._by_id[speaker_id] = lock
+        self._allowed[speaker_id] = True
+
+    def unbind(self, lock):
+        if lock.speaker_id is not None:
+            del self._by_id[lock.speaker_id]
+            self._allowed[lock.speaker_id] = False
+            lock.speaker_id = None
+
+    def mask(self, speaker):
+        """Per-word keep-mask for a speaker ID column"""
+        allowed = self._allowed
+        if not len(speaker) or speaker.max() < len(allowed):
+            return allowed[speaker]
+        return (speaker < len(allowed)) & allowed[np.minimum(speaker, len(allowed) - 1)]
+
+    def heard(self, speakers):
+        """Age the bound locks by one utterance; returns [(lock, released ID)] for locks that went idle"""
+        released = []
+        for lock in self.locks:
+            if lock.speaker_id is None:
+                continue
+            lock.idle = 0 if lock.speaker_id in speakers else lock.idle + 1
+            if lock.voiceprint is not None and self.idle_release and lock.idle >= self.idle_release:
+                speaker_id = lock.speaker_id
+                self.unbind(lock)
+                released.append((lock, speaker_id))
+        return released
+
+    def reset(self):
+        """Drop every lock and voiceprint, keeping empty slots for the voice profiles"""
+        self.locks = [SpeakerLock(lock.name, profile=True) for lock in self.locks if lock.profile]
+        self._by_id = {}
+        self._allowed[:] = False
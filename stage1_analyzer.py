@@ -0,0 +1,409 @@
+from collections import deque
+
+import numpy as np
+
+from stage_pipeline import verdict_code
+from tv_noise_filter import (
+    STAGE1_PASSED, STAGE1_LOW_ENERGY, STAGE1_MONOTONOUS,
+    STAGE1_HIGH_FREQUENCY_NOISE, STAGE1_FIRST_BAND
+)
+
+def band_bin_codes(tv_frequency_ranges, bin_freqs):
+    """Per-bin Stage 1 band verdict codes plus a boolean mask per TV band"""
+    band_masks = {}
+    bin_codes = np.full(len(bin_freqs), STAGE1_PASSED, dtype=np.int8)
+    for band_index, (tv_type, (low, high)) in enumerate(tv_frequency_ranges.items()):
+        mask = (low <= bin_freqs) & (bin_freqs <= high)
+        band_masks[tv_type] = mask
+        # First matching band wins, like the loop in stage1_frequency_analysis
+        bin_codes[mask & (bin_codes == STAGE1_PASSED)] = STAGE1_FIRST_BAND + band_index
+    return bin_codes, band_masks
+
+class StreamingSTFT:
+    """Streaming Hann-windowed STFT with a rolling spectrogram.
+
+    Samples from successive audio_stream.read calls are appended to a
+    carry-over buffer; a column is produced every `hop` samples once
+    `n_fft` samples are available. The last `history` columns are kept
+    in a ring, along with each column's peak bin and peak dominance.
+    """
+
+    def __init__(self, n_fft=1024, hop=256, sample_rate=16000, history=32, peak_guard_bins=2):
+        self.n_fft = n_fft
+        self.hop = hop
+        self.sample_rate = sample_rate
+        self.history = history
+        # Bins either side of a peak that belong to its Hann main lobe
+        self.peak_guard_bins = peak_guard_bins
+
+        self.n_bins = n_fft // 2
+        self.bin_freqs = np.fft.rfftfreq(n_fft, 1/sample_rate)[:self.n_bins]
+        self.window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)
+
+        # Rolling spectrogram (magnitude) and per-column peak summary; slot self._pos is next
+        self.spectrogram = np.zeros((history, self.n_bins), dtype=np.float32)
+        self.peak_bins = np.full(history, -1, dtype=np.intp)
+        self.peak_ratios = np.zeros(history, dtype=np.float32)
+        self.columns = 0
+        self._pos = 0
+
+        # Carry-over buffer between reads and per-column scratch, float64 like the window so
+        # the windowing multiply needs no casting buffer
+        self._buffer = np.zeros(2 * n_fft, dtype=np.float64)
+        self._fill = 0
+        # float64 in, complex128 out: pocketfft computes in double, so float32 buffers make rfft allocate copies
+        self._windowed = np.zeros(n_fft, dtype=np.float64)
+        self._spectrum = np.zeros(n_fft // 2 + 1, dtype=np.complex128)
+        self._power = np.zeros(n_fft // 2 + 1, dtype=np.float64)
+        try:
+            np.fft.rfft(self._windowed, out=self._spectrum)
+            self._rfft_in_place = True
+        except TypeError:
+            self._rfft_in_place = False
+
+    def push(self, samples):
+        """Append samples and compute any complete columns; returns the number of new columns"""
+        count = len(samples)
+        if self._fill + count > len(self._buffer):
+            grown = np.zeros(self._fill + count + self.n_fft, dtype=np.float64)
+            grown[:self._fill] = self._buffer[:self._fill]
+            self._buffer = grown
+        self._buffer[self._fill:self._fill + count] = samples
+        self._fill += count
+
+        start = 0
+        new_columns = 0
+        while self._fill - start >= self.n_fft:
+            self._compute_column(self._buffer[start:start + self.n_fft])
+            start += self.hop
+            new_columns += 1
+
+        # Keep the unconsumed tail (the overlap) for the next read
+        if start:
+            remaining = self._fill - start
+            self._buffer[:remaining] = self._buffer[start:self._fill]
+            self._fill = remaining
+        return new_columns
+
+    def _compute_column(self, frame):
+        """Window one frame, store its magnitude spectrum and peak summary"""
+        np.multiply(frame, self.window, out=self._windowed)
+        if self._rfft_in_place:
+            np.fft.rfft(self._windowed, out=self._spectrum)
+            np.abs(self._spectrum, out=self._power)
+        else:
+            np.abs(np.fft.rfft(self._windowed), out=self._power)
+
+        row = self.spectrogram[self._pos]
+        row[:] = self._power[:self.n_bins]
+
+        # Peak dominance against the strongest bin outside the peak's main lobe
+        peak = int(np.argmax(row))
+        top = row[peak]
+        low = max(peak - self.peak_guard_bins, 0)
+        high = min(peak + self.peak_guard_bins + 1, self.n_bins)
+        lobe = self._power[low:high]
+        lobe[:] = 0
+        runner_up = np.maximum.reduce(self._power[:self.n_bins])
+        self.peak_bins[self._pos] = peak
+        self.peak_ratios[self._pos] = top / runner_up if runner_up > 0 else np.inf
+
+        self._pos = (self._pos + 1) % self.history
+        self.columns += 1
+
+    def latest_column(self):
+        """Ring index of the most recent column, or -1 before the first one"""
+        if self.columns == 0:
+            return -1
+        return (self._pos - 1) % self.history
+
+    def sustained_peak(self, span=8, min_fraction=0.75, min_ratio=3.0):
+        """Bin of a dominant peak held across most of the last `span` columns, or -1.
+
+        A column counts when its peak lies within one bin of the latest peak
+        and dominates the rest of the spectrum by `min_ratio`.
+        """
+        span = min(span, self.history)
+        if self.columns < span:
+            return -1
+        latest = self.peak_bins[self.latest_column()]
+        recent = (self._pos - 1 - np.arange(span)) % self.history
+        held = (np.abs(self.peak_bins[recent] - latest) <= 1) & (self.peak_ratios[recent] > min_ratio)
+        if np.count_nonzero(held) >= min_fraction * span:
+            return int(latest)
+        return -1
+
+class Stage1Analyzer:
+    """Reusable Stage 1 analyzer for a fixed frame length and sample rate.
+
+    Built once per audio stream. The real-FFT frequency axis, the
+    tv_frequency_ranges band masks and every work buffer are allocated up
+    front, so analyze() allocates no arrays per frame in steady state; what
+    tracemalloc still sees (~1.4 KB per 1024-sample frame) is pocketfft's
+    internal scratch inside np.fft.rfft.
+    Verdicts and thresholds are those of AdvancedTVNoiseFilter.stage1_frequency_analysis.
+
+    With a StreamingSTFT attached, every frame feeds the rolling spectrogram
+    and the band checks use a windowed peak that is sustained over time
+    instead of one unwindowed single-frame FFT.
+    """
+
+    def __init__(self, tv_filter, frame_len=1024, sample_rate=16000, stft=None):
+        self.tv_filter = tv_filter
+        self.frame_len = frame_len
+        self.sample_rate = sample_rate
+        self.verdict_names = tv_filter.stage1_verdict_names()
+
+        # Cached frequency axis (positive bins only, as in the single-frame path)
+        self.n_bins = frame_len // 2
+        self.bin_freqs = np.fft.rfftfreq(frame_len, 1/sample_rate)[:self.n_bins]
+        self.bin_codes, self.band_masks = band_bin_codes(tv_filter.tv_frequency_ranges, self.bin_freqs)
+
+        # Optional rolling STFT: spectral checks then read "sustained" across time
+        self.stft = stft
+        if stft is not None:
+            self.stft_bin_codes, self.stft_band_masks = band_bin_codes(tv_filter.tv_frequency_ranges, stft.bin_freqs)
+
+        # Preallocated work buffers, plus views over them so slicing allocates nothing either
+        self._samples = np.zeros(frame_len, dtype=np.float32)
+        self._squared = np.zeros(frame_len, dtype=np.float32)
+        self._signs = np.zeros(frame_len, dtype=np.float32)
+        self._sign_changes = np.zeros(max(frame_len - 1, 0), dtype=bool)
+        self._signs_next = self._signs[1:]
+        self._signs_prev = self._signs[:-1]
+        # The FFT runs in double precision (as np.fft.fft does on the single-frame path);
+        # with float32 buffers rfft would allocate a float64 copy and a complex128 result every frame
+        self._fft_input = np.zeros(frame_len, dtype=np.float64)
+        self._spectrum = np.zeros(frame_len // 2 + 1, dtype=np.complex128)
+        self._power = np.zeros(frame_len // 2 + 1, dtype=np.float64)
+        self._positive_power = self._power[:self.n_bins]
+
+        # numpy < 2.0 has no out= on np.fft; fall back to allocating the spectrum
+        try:
+            np.fft.rfft(self._fft_input, out=self._spectrum)
+            self._rfft_in_place = True
+        except TypeError:
+            self._rfft_in_place = False
+
+        # Features of the most recent frame (None when an earlier check short-circuited)
+        self.energy = 0.0
+        self.zcr = 0.0
+        self.peak_freq = None
+        self.peak_ratio = None
+
+    def analyze(self, audio_data):
+        """Analyze one frame of int16 PCM bytes and return its STAGE1_* verdict code"""
+        try:
+            audio_array = np.frombuffer(audio_data, dtype=np.int16)
+            if len(audio_array) != self.frame_len:
+                # Odd-sized buffer (e.g. end of a file) - use the generic single-frame path
+                return verdict_code(self.tv_filter.stage1_frequency_code(audio_data))
+
+            samples = self._samples
+            np.copyto(samples, audio_array, casting='unsafe')
+            self.peak_freq = None
+            self.peak_ratio = None
+            if self.stft is not None:
+                self.stft.push(samples)
+
+            # Basic energy check
+            np.multiply(samples, samples, out=self._squared)
+            self.energy = float(np.add.reduce(self._squared)) / self.frame_len
+
+            # Zero-crossing rate analysis
+            np.sign(samples, out=self._signs)
+            np.not_equal(self._signs_next, self._signs_prev, out=self._sign_changes)
+            self.zcr = np.count_nonzero(self._sign_changes) / self.frame_len
+
+            if self.energy < self.tv_filter.noise_floor_threshold:
+                return STAGE1_LOW_ENERGY
+            if self.zcr < 0.005:
+                return STAGE1_MONOTONOUS
+            elif self.zcr > 0.35:
+                return STAGE1_HIGH_FREQUENCY_NOISE
+
+            if self.stft is not None:
+                return self._stft_verdict()
+
+            if self.n_bins == 0:
+                return STAGE1_PASSED
+
+            # Frequency analysis using the real FFT
+            np.copyto(self._fft_input, samples)
+            if self._rfft_in_place:
+                np.fft.rfft(self._fft_input, out=self._spectrum)
+                np.abs(self._spectrum, out=self._power)
+            else:
+                np.abs(np.fft.rfft(self._fft_input), out=self._power)
+
+            power = self._positive_power
+            peak = int(np.argmax(power))
+            self.peak_freq = float(self.bin_freqs[peak])
+
+            if self.n_bins < 10:
+                return STAGE1_PASSED
+
+            # Runner-up peak without sorting: blank the top bin, take the max, restore it
+            top = power[peak]
+            power[peak] = 0
+            runner_up = np.maximum.reduce(power)
+            power[peak] = top
+            self.peak_ratio = float(top / runner_up) if runner_up > 0 else float('inf')
+
+            # Sustained dominant peak inside a TV band (likely TV)
+            if top > runner_up * 3:
+                return int(self.bin_codes[peak])
+            return STAGE1_PASSED
+
+        except Exception as e:
+            print(f"Stage 1 error: {e}")
+            return STAGE1_PASSED  # Default to pass on error
+
+    def _stft_verdict(self):
+        """Band verdict from the rolling spectrogram: a TV band peak sustained across columns"""
+        latest = self.stft.latest_column()
+        if latest < 0:
+            return STAGE1_PASSED
+        peak = self.stft.peak_bins[latest]
+        self.peak_freq = float(self.stft.bin_freqs[peak])
+        self.peak_ratio = float(self.stft.peak_ratios[latest])
+
+        sustained = self.stft.sustained_peak()
+        if sustained >= 0:
+            return int(self.stft_bin_codes[sustained])
+        return STAGE1_PASSED
+
+class Stage1Gate:
+    """Streaming Stage 1 decision over every frame, with hysteresis.
+
+    Keeps a ring buffer of the last `window` frames' features. The gate closes
+    once `gate_after` of them failed Stage 1, and reopens on speech onset
+    (`onset_frames` consecutive passing frames). While closed, the newest
+    `preroll_frames` frames are held back and released with the onset, so the
+    start of speech is not clipped; older held frames are dropped.
+
+    Low-energy frames (ordinary silence) neither vote to close the gate nor
+    count towards an onset: pauses keep flowing to Deepgram for its
+    endpointing, and idling through silence is the send gate's job.
+
+    In the live loop every captured frame goes through analyze() first; the
+    send gate then decides what is streamed and hands those frames to
+    release(), which reuses the stored features instead of analyzing again.
+    """
+
+    def __init__(self, analyzer, window=8, gate_after=6, onset_frames=2, preroll_frames=4, analyzed=64):
+        self.analyzer = analyzer
+        self.window = window
+        self.gate_after = gate_after
+        self.onset_frames = onset_frames
+        self.preroll_frames = preroll_frames
+
+        # Feature ring buffer (index self._pos is the oldest slot)
+        self.codes = np.zeros(window, dtype=np.int8)
+        self.energy = np.zeros(window, dtype=np.float32)
+        self.zcr = np.zeros(window, dtype=np.float32)
+        self._filterable = np.zeros(window, dtype=bool)
+        self._pos = 0
+        self._filter_votes = 0
+
+        self.gated = False
+        self.changed = False  # True on the frame where the gate opened or closed
+        self.last_code = STAGE1_PASSED
+        self.frames_dropped = 0
+        self._onset_run = 0
+        self._held = deque()
+        self._held_codes = deque()
+
+        # Features from analyze(), by capture index; slot = index % analyzed
+        self._analyzed_index = np.full(analyzed, -1, dtype=np.int64)
+        self._analyzed_codes = np.zeros(analyzed, dtype=np.int8)
+        self._analyzed_energy = np.zeros(analyzed, dtype=np.float32)
+        self._analyzed_zcr = np.zeros(analyzed, dtype=np.float32)
+
+    def analyze(self, frame):
+        """Analyze one captured frame ahead of release() and return its STAGE1_* code"""
+        code = self.analyzer.analyze(frame.data)
+        self.changed = False
+        slot = frame.index % len(self._analyzed_index)
+        self._analyzed_index[slot] = frame.index
+        self._analyzed_codes[slot] = code
+        self._analyzed_energy[slot] = self.analyzer.energy
+        self._analyzed_zcr[slot] = self.analyzer.zcr
+        return code
+
+    def release(self, frames):
+        """push() each of `frames` in order; returns everything to send, `changed` covers them all"""
+        released = []
+        changed = False
+        for frame in frames:
+            released.extend(self.push(frame))
+            changed = changed or self.changed
+        self.changed = changed
+        return released
+
+    def push(self, frame):
+        """Analyze one frame and return the list of frames to send now (possibly empty).
+
+        `frame` is raw PCM bytes or a CapturedFrame; whatever is pushed is what
+        gets returned, so capture timestamps travel with held frames. Frames
+        already seen by analyze() reuse their stored features.
+        """
+        index = getattr(frame, 'index', None)
+        slot = index % len(self._analyzed_index) if index is not None else 0
+        if index is not None and self._analyzed_index[slot] == index:
+            code = int(self._analyzed_codes[slot])
+            energy, zcr = self._analyzed_energy[slot], self._analyzed_zcr[slot]
+        else:
+            code = self.analyzer.analyze(getattr(frame, 'data', frame))
+            energy, zcr = self.analyzer.energy, self.analyzer.zcr
+        self.last_code = code
+        self.changed = False
+
+        # O(1) ring update of the features and the running vote count
+        pos = self._pos
+        filterable = code != STAGE1_PASSED and code != STAGE1_LOW_ENERGY
+        self._filter_votes += int(filterable) - int(self._filterable[pos])
+        self._filterable[pos] = filterable
+        self.codes[pos] = code
+        self.energy[pos] = energy
+        self.zcr[pos] = zcr
+        self._pos = (pos + 1) % self.window
+
+        if not self.gated:
+            if self._filter_votes < self.gate_after:
+                return [frame]
+            self.gated = True
+            self.changed = True
+            self._onset_run = 0
+
+        # Gate closed: hold the frame as pre-roll and watch for speech onset
+        self._hold(frame, code)
+        self._onset_run = self._onset_run + 1 if code == STAGE1_PASSED else 0
+        if self._onset_run < self.onset_frames:
+            return []
+
+        # Speech onset: reopen, forget the old votes and release the pre-roll in order
+        self.gated = False
+        self.changed = True
+        self._filterable[:] = False
+        self._filter_votes = 0
+        released = list(self._held)
+        self._held.clear()
+        self._held_codes.clear()
+        return released
+
+    def _hold(self, frame, code):
+        """Keep a frame as pre-roll, dropping (and counting) the oldest held frame"""
+        self._held.append(frame)
+        self._held_codes.append(code)
+        if len(self._held) > self.preroll_frames:
+            self._held.popleft()
+            dropped_code = self._held_codes.popleft()
+            self.frames_dropped += 1
+            stats = self.analyzer.tv_filter.filter_stats
+            stats['stage1_frequency'] += 1
+            stats['total_processed'] += 1
+            # Frames that passed on their own were dropped only because the gate was closed
+            reason = self.analyzer.verdict_names[dropped_code] if dropped_code else 'filtered_gate_hold'
+            reasons = stats['reasons'].setdefault('stage1_frequency', {})
+            reasons[reason] = reasons.get(reason, 0) + 1
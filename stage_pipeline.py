@@ -0,0 +1,202 @@
+import math
+import time
+from collections import namedtuple
+
+# What a stage's check() can be called with: raw audio, the Deepgram result,
+# or a view derived from the result (see StagePipeline.input_builders)
+STAGE_INPUTS = ('audio', 'result', 'tokens', 'words')
+
+# Verdict code every stage returns when it lets the input through
+PASSED = 0
+
+class Verdict(namedtuple('Verdict', ['stage', 'code', 'score', 'detail'], defaults=(None, None))):
+    """A stage rejection: which FilterStage, its reason code, a numeric score and an optional detail.
+
+    Nothing is formatted until the verdict is logged: `reason` is a table
+    lookup and str()/describe() build text on demand.
+    """
+
+    __slots__ = ()
+
+    @property
+    def reason(self):
+        return self.stage.reason_names[self.code]
+
+    def __str__(self):
+        """Compact form, e.g. 'filtered_very_low_confidence_0.32' or 'filtered_news_phrase_stay_tuned'"""
+        if isinstance(self.detail, str):
+            return f"{self.reason}_{self.detail.replace(' ', '_')}"
+        if isinstance(self.score, int):
+            return f"{self.reason}_{self.score}"
+        if isinstance(self.score, float):
+            return f"{self.reason}_{self.score:.2f}"
+        return self.reason
+
+    def describe(self):
+        """Readable form for logs, e.g. 'News Phrase: stay tuned (score 1)'"""
+        text = self.reason.replace('filtered_', '').replace('_', ' ').title()
+        if self.detail is not None:
+            text += f": {self.detail}"
+        if self.score is not None:
+            text += f" (score {self.score:.3g})" if isinstance(self.score, float) else f" (score {self.score})"
+        return text
+
+def as_verdict(stage, outcome):
+    """Verdict for a check() outcome, or None if it passed"""
+    if not outcome:
+        return None
+    if isinstance(outcome, tuple):
+        return Verdict(stage, *outcome)
+    return Verdict(stage, outcome)
+
+def verdict_code(outcome):
+    """Reason code of a check() outcome (PASSED for a pass)"""
+    return outcome[0] if isinstance(outcome, tuple) else outcome
+
+def score_bucket(score):
+    """Histogram bucket for a score: rounded to two significant digits (~1-10% wide bins at any scale)"""
+    if not score or not math.isfinite(score):
+        return 0.0 if not score else score
+    step = 10.0 ** (math.floor(math.log10(abs(score))) - 1)
+    return round(round(score / step) * step, 12)
+
+class FilterStage:
+    """One filtering stage in a StagePipeline.
+
+    `check(value)` receives the declared input - raw PCM bytes or an
+    utterance's AudioSpan ('audio'), the Deepgram result ('result'), its TranscriptTokens ('tokens') or its
+    columnar WordArrays ('words') - and
+    returns PASSED (0) to let it through, or a reason code indexing
+    `reason_names`, optionally as `(code, score)` or `(code, score, detail)`.
+    The pipeline turns rejections into Verdicts and measures each stage's
+    cost and rejection rate as it runs.
+    """
+
+    __slots__ = ('name', 'check', 'input', 'reason_names', 'label', 'number',
+                 'enabled', 'calls', 'rejections', 'cost_ns')
+
+    def __init__(self, name, check, input='result', reason_names=None, label=None, number=None):
+        if input not in STAGE_INPUTS:
+            raise ValueError(f"stage input must be one of {STAGE_INPUTS}, not {input!r}")
+        self.name = name                  # also the filter_stats counter for rejections
+        self.check = check
+        self.input = input
+        self.reason_names = reason_names or [f"passed_{name}", f"filtered_{name}"]
+        self.label = label or name.replace('_', ' ').title()
+        self.number = number              # display number for the built-in stages 1-4
+        self.enabled = True
+        self.calls = 0
+        self.rejections = 0
+        self.cost_ns = 0.0                # moving average of check() time
+
+    @property
+    def rejection_rate(self):
+        """Observed share of inputs rejected (Laplace-smoothed so new stages get a fair start)"""
+        return (self.rejections + 1) / (self.calls + 2)
+
+    @property
+    def rank(self):
+        """Expected cost per rejection - lower runs earlier"""
+        return self.cost_ns / self.rejection_rate
+
+    def record(self, elapsed_ns, code):
+        self.calls += 1
+        if code:
+            self.rejections += 1
+        # Plain mean for the first calls, then an exponential moving average
+        weight = max(1.0 / self.calls, 0.05)
+        self.cost_ns += (elapsed_ns - self.cost_ns) * weight
+
+class StagePipeline:
+    """Registry of filtering stages, run in cost order with early exit.
+
+    With adaptive=True the stages are re-sorted every `reorder_interval` runs
+    so cheap stages that reject often run first; any rejection ends the run,
+    so the accept/reject decision does not depend on the order - only which
+    stage is credited with it. With adaptive=False stages run in registration
+    order, matching the original Stage 1 → 2 → 3 → 4 behaviour.
+    """
+
+    def __init__(self, adaptive=True, reorder_interval=64, input_builders=None):
+        self.adaptive = adaptive
+        self.reorder_interval = reorder_interval
+        # Derived inputs, built from the result on first use in a run: {name: builder(result)}
+        self.input_builders = dict(input_builders or {})
+        self.stages = []     # registration order
+        self.order = []      # execution order
+        self.runs = 0
+
+    def add_stage(self, stage, before=None):
+        """Register a stage (at the end, or ahead of the stage named `before`)"""
+        if self.get(stage.name):
+            raise ValueError(f"a stage named {stage.name!r} is already registered")
+        index = len(self.stages)
+        if before is not None:
+            index = self.stages.index(self.get(before))
+        self.stages.insert(index, stage)
+        self.order = list(self.stages)
+        return stage
+
+    def remove_stage(self, name):
+        stage = self.get(name)
+        if stage:
+            self.stages.remove(stage)
+            self.order = [s for s in self.order if s is not stage]
+        return stage
+
+    def get(self, name):
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        return None
+
+    def reorder(self):
+        """Sort by expected cost per rejection; registration order breaks ties"""
+        position = {id(stage): i for i, stage in enumerate(self.stages)}
+        self.order = sorted(self.stages, key=lambda s: (s.rank, position[id(s)]))
+
+    def run(self, audio_data=None, result=None, **inputs):
+        """Run the enabled stages; returns the rejecting Verdict, or None if everything passed.
+
+        Stages whose input is unavailable are skipped. Derived inputs
+        ('tokens', 'words') can be passed in; otherwise they are built from
+        the result on first use and shared by the stages that follow.
+        """
+        self.runs += 1
+        if self.adaptive and self.runs % self.reorder_interval == 0:
+            self.reorder()
+
+        clock = time.perf_counter_ns
+        for stage in self.order:
+            if not stage.enabled:
+                continue
+            if stage.input == 'audio':
+                value = audio_data
+            elif result is None:
+                continue
+            elif stage.input == 'result':
+                value = result
+            else:
+                value = inputs.get(stage.input)
+                if value is None:
+                    builder = self.input_builders.get(stage.input)
+                    if builder is not None:
+                        value = inputs[stage.input] = builder(result)
+            if value is None:
+                continue
+
+            start = clock()
+            try:
+                outcome = stage.check(value)
+            except Exception as e:
+                print(f"{stage.label} error: {e}")
+                outcome = PASSED
+            stage.record(clock() - start, outcome)
+            if outcome:
+                return as_verdict(stage, outcome)
+        return None
+
+    def summary(self):
+        """Execution order with measured cost and rejection rate, for statistics"""
+        return [(stage.name, stage.cost_ns / 1000, stage.rejections / stage.calls if stage.calls else 0.0)
+                for stage in self.order if stage.enabled]
@@ -0,0 +1,29 @@
+import os
+import sys
+
+# Modules live at the repository root, like the benchmarks import them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+FRAME_LEN = 1024
+SAMPLE_RATE = 16000
+
+@pytest.fixture(scope="session")
+def stage1_frames():
+    """(N, 1024) int16 frames covering every Stage 1 outcome: speech-like, tones in and out of the TV bands, noise, silence"""
+    rng = np.random.default_rng(7)
+    t = np.arange(FRAME_LEN) / SAMPLE_RATE
+    frames = []
+    for _ in range(120):  # speech-like: a drifting carrier with a syllable-rate envelope
+        carrier = np.sin(2 * np.pi * rng.uniform(150, 3000) * t)
+        envelope = 1 + 0.5 * np.sin(2 * np.pi * rng.uniform(3, 8) * t)
+        frames.append(4000 * carrier * envelope + rng.normal(0, 400, FRAME_LEN))
+    for freq in np.linspace(45, 7000, 120):  # steady tones, some in each TV band
+        frames.append(8000 * np.sin(2 * np.pi * freq * t) + rng.normal(0, 50, FRAME_LEN))
+    for scale in (300, 3000, 12000):
+        frames.extend(rng.normal(0, scale, (20, FRAME_LEN)))
+    frames.extend(np.zeros((10, FRAME_LEN)))
+    frames.append(np.full(FRAME_LEN, 5000.0))  # DC: loud but no zero crossings
+    return np.clip(np.array(frames), -32768, 32767).astype(np.int16)
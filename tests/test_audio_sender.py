@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+from audio_capture import CapturedFrame
+from audio_sender import AudioSender
+
+def frames(count):
+    return [CapturedFrame(b"\0\0" * 1024, i, time.monotonic(), i * 0.064) for i in range(count)]
+
+def test_send_errors_are_counted_reported_once_and_draining_continues():
+    calls, reported = [], []
+
+    def send(payload):
+        calls.append(payload)
+        if len(calls) <= 2:
+            raise ConnectionError("socket closed")
+        return True
+
+    async def run():
+        sender = AudioSender(send, max_coalesce_frames=1, on_error=reported.append)
+        task = asyncio.create_task(sender.run())
+        sender.submit(frames(5))
+        sender.submit_control('{"type": "KeepAlive"}')
+        sender.stop()
+        await task
+        return sender
+
+    sender = asyncio.run(run())
+    assert len(calls) == 6
+    assert sender.failed_sends == 2
+    assert sender.backlog() == 0
+    assert [type(error) for error in reported] == [ConnectionError]
@@ -0,0 +1,63 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from filter_server import MAX_SPEAKERS_LIMIT, FilterSession, SessionManager, parse_header
+from phrase_dictionary import DEFAULT_DICTIONARY_PATH
+
+def test_header_options_are_parsed():
+    header = parse_header(b'{"session": "kitchen", "voice_profile": "alice,bob", "max_speakers": 2}\n')
+    assert header == {"session": "kitchen", "voice_profile": "alice,bob", "max_speakers": 2}
+    assert parse_header(b"\n") == {}
+
+@pytest.mark.parametrize("line", [
+    b"not json\n",
+    b"[1, 2]\n",
+    b'{"max_speakers": "two"}\n',
+    b'{"max_speakers": 2.5}\n',
+    b'{"max_speakers": true}\n',
+    b'{"max_speakers": 0}\n',
+    b'{"max_speakers": %d}\n' % (MAX_SPEAKERS_LIMIT + 1),
+    b'{"voice_profile": 7}\n',
+])
+def test_bad_headers_raise_value_error(line):
+    with pytest.raises(ValueError):
+        parse_header(line)
+
+def test_sessions_share_one_dictionary_and_one_watcher(tmp_path):
+    path = tmp_path / "phrases.json"
+    data = json.loads(DEFAULT_DICTIONARY_PATH.read_text())
+    data['version'] = 1
+    path.write_text(json.dumps(data))
+    logs = []
+    manager = SessionManager(dsp_workers=1, engine_options={'dictionary_path': path}, log=logs.append)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        for name in ("kitchen", "den"):
+            session = FilterSession(name, None, loop)
+            session.engine = manager.make_engine(session, {})
+            manager.sessions[name] = session
+        engines = [session.engine for session in manager.sessions.values()]
+        assert all(engine.tv_filter.phrase_matcher is manager.dictionary.matcher for engine in engines)
+        assert not any(engine.watch_dictionary_file for engine in engines)
+
+        watcher = asyncio.create_task(manager.watch_dictionary(interval=0.01))
+        data['version'] = 2
+        data['phrases']['commercial'].append("call our hotline today")
+        path.write_text(json.dumps(data))
+        os.utime(path, ns=(1, 1))  # a new stamp even on coarse-mtime filesystems
+        for _ in range(200):
+            if manager.dictionary.version == 2:
+                break
+            await asyncio.sleep(0.01)
+        watcher.cancel()
+        return engines
+
+    engines = asyncio.run(scenario())
+    manager.dsp_pool.shutdown()
+    assert manager.dictionary.version == 2
+    assert all(engine.tv_filter.dictionary is manager.dictionary for engine in engines)
+    assert len(logs) == 1 and "v2" in logs[0]
@@ -0,0 +1,49 @@
+import json
+
+import numpy as np
+
+from filter_engine import VoiceFilterEngine
+from raw_results import RawResult
+from voiceprint import normalized
+
+def interim(text, speaker=0, start=0.0, is_final=False):
+    words = [{"word": word, "punctuated_word": word, "start": start + 0.3 * i, "end": start + 0.3 * i + 0.25,
+              "confidence": 0.95, "speaker": speaker} for i, word in enumerate(text.split())]
+    return RawResult.from_json(json.dumps({
+        "type": "Results", "is_final": is_final, "speech_final": is_final, "start": start, "duration": 0.3 * len(words),
+        "channel": {"alternatives": [{"transcript": text, "confidence": 0.95, "words": words}]},
+    }))
+
+def make_engine():
+    decisions = []
+    engine = VoiceFilterEngine(on_log=lambda message: None, incremental=True,
+                               on_provisional=lambda text, accepted: decisions.append(accepted))
+    engine.is_running = True
+    return engine, decisions
+
+def test_interims_rejected_while_prearmed_voiceprint_is_unbound():
+    engine, decisions = make_engine()
+    engine.speaker_locks.add("default", profile=True).enroll(normalized(np.ones(24)), 5.0)
+
+    engine.process_interim(interim("exit filter now"))
+
+    assert decisions == [False]
+    assert engine.is_running  # the command did not fire from unverified speech
+
+def test_interims_accepted_without_locks():
+    engine, decisions = make_engine()
+
+    engine.process_interim(interim("show stats please"))
+
+    assert decisions == [True]
+    assert engine.interim_filter.fired_commands == {'stats'}  # harmless commands run from the interim
+
+def test_exit_waits_for_the_final_result():
+    engine, decisions = make_engine()
+
+    engine.process_interim(interim("exit filter now"))
+    assert decisions == [True]
+    assert engine.is_running  # a later Stage 1/2/4 rejection could not undo an exit
+
+    engine.process_transcript(interim("exit filter now", is_final=True))
+    assert not engine.is_running
@@ -0,0 +1,31 @@
+import pytest
+
+import phrase_matcher
+from phrase_dictionary import PhraseDictionary
+from phrase_matcher import PhraseMatcher
+from transcript_tokens import tokenize
+
+TRANSCRIPTS = [
+    "so i was thinking we could also grab dinner",
+    "breaking news: the mayor says we'll be right back after this",
+    "call now! this amazing offer ends tonight",
+    "um, i think the newsletter came, uh, yesterday",
+    "coming up next on the show previously on our story",
+    "the summer number was higher than expected",
+]
+
+@pytest.fixture(params=[True, False], ids=["small-dictionary", "automaton"], autouse=True)
+def text_path(request, monkeypatch):
+    """Run each test with match_text() on the `in` scan and on the automaton"""
+    if not request.param:
+        monkeypatch.setattr(phrase_matcher, 'SMALL_DICTIONARY_PHRASES', 0)
+
+def test_match_text_agrees_with_token_matching():
+    matcher = PhraseMatcher(PhraseDictionary.load().phrases)
+    for text in TRANSCRIPTS:
+        assert matcher.match_text(text) == matcher.match(tokenize(text)), text
+
+def test_phrases_only_match_whole_words():
+    words = PhraseMatcher({'short': ["so", "um", "er", "news"]})
+    assert words.match_text("we also hummed her newsletter") == {}
+    assert words.match_text("so, um, er, the news") == {'short': {0, 1, 2, 3}}
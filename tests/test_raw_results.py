@@ -0,0 +1,63 @@
+import json
+
+import deepgram
+import pytest
+from deepgram import (DeepgramClientOptions, LiveResultResponse, LiveTranscriptionEvents,
+                      SpeechStartedResponse, UtteranceEndResponse)
+
+import raw_results
+from raw_results import RawResult, raw_listen_client
+
+RESULTS = json.dumps({
+    "type": "Results", "channel_index": [0, 1], "is_final": True, "speech_final": True,
+    "start": 1.0, "duration": 0.6,
+    "channel": {"alternatives": [{"transcript": "turn it off", "confidence": 0.93, "words": [
+        {"word": "turn", "start": 1.0, "end": 1.2, "confidence": 0.9, "speaker": 0},
+        {"word": "it", "start": 1.2, "end": 1.3, "confidence": 0.95, "speaker": 0},
+        {"word": "off", "start": 1.3, "end": 1.6, "confidence": 0.94, "speaker": 0}]}]},
+    "metadata": {"request_id": "test", "model_uuid": "test",
+                 "model_info": {"name": "nova-3", "version": "test", "arch": "nova-3"}},
+    "from_finalize": False,
+})
+SPEECH_STARTED = json.dumps({"type": "SpeechStarted", "channel": [0, 1], "timestamp": 0.9})
+UTTERANCE_END = json.dumps({"type": "UtteranceEnd", "channel": [0, 1], "last_word_end": 1.6})
+
+def make_client(on_text):
+    client = raw_listen_client(DeepgramClientOptions(api_key="test"), on_text)
+    client._kwargs = {}  # start() normally sets these; no connection is opened here
+    events = []
+    client.on(LiveTranscriptionEvents.Transcript, lambda _, result, **kwargs: events.append(result))
+    client.on(LiveTranscriptionEvents.SpeechStarted, lambda _, speech_started, **kwargs: events.append(speech_started))
+    client.on(LiveTranscriptionEvents.UtteranceEnd, lambda _, utterance_end, **kwargs: events.append(utterance_end))
+    return client, events
+
+def test_results_take_the_raw_path_and_vad_events_reach_sdk_handlers():
+    handled = []
+    def on_text(message):
+        if not raw_results.is_results(message):
+            return False
+        handled.append(RawResult.from_json(message))
+        return True
+
+    client, events = make_client(on_text)
+    for message in (SPEECH_STARTED, RESULTS, UTTERANCE_END):
+        client._process_text(message)
+
+    assert [type(event) for event in events] == [SpeechStartedResponse, UtteranceEndResponse]
+    assert events[0].timestamp == 0.9 and events[1].last_word_end == 1.6
+    result, = handled
+    assert result.is_final and result.transcript == "turn it off"
+    assert [word.speaker for word in result.channel.alternatives[0].words] == [0, 0, 0]
+
+def test_declined_results_reach_the_sdk_transcript_handler():
+    client, events = make_client(lambda message: False)
+    client._process_text(RESULTS)
+
+    result, = events
+    assert isinstance(result, LiveResultResponse)
+    assert result.channel.alternatives[0].transcript == "turn it off"
+
+def test_other_sdk_versions_are_refused(monkeypatch):
+    monkeypatch.setattr(deepgram, '__version__', "v5.0.0")
+    with pytest.raises(RuntimeError, match="deepgram-sdk 4.1.0"):
+        raw_listen_client(DeepgramClientOptions(api_key="test"), lambda message: False)
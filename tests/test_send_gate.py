@@ -0,0 +1,67 @@
+from send_gate import SendGate, FINALIZE_MESSAGE, KEEPALIVE_MESSAGE
+
+def make_gate():
+    return SendGate(frame_seconds=0.125, idle_after=1.5, max_quiet=4.0, onset_frames=2,
+                    preroll_frames=3, keepalive_interval=5.0)
+
+def test_idle_finalize_keepalive_then_resume():
+    gate = make_gate()
+    downstream_saw = []
+    def downstream(frames):
+        downstream_saw.extend(frames)
+        return frames
+
+    sent, controls = [], []
+    def tick(frame, voiced):
+        out = gate.push([frame], voiced, downstream)
+        sent.extend(out)
+        if gate.control:
+            controls.append((frame, gate.control))
+        return out
+
+    for frame in range(5):
+        assert tick(frame, True) == [frame]
+
+    # Silence still streams (Deepgram needs it for endpointing) until max_quiet without UtteranceEnd
+    frame = 5
+    while gate.streaming:
+        tick(frame, False)
+        frame += 1
+    finalized_at = frame - 1
+    assert controls == [(finalized_at, FINALIZE_MESSAGE)]
+    assert sent[-1] == finalized_at - 1
+    assert abs(gate.quiet_seconds - 4.0) < 1e-9
+
+    # Idle: nothing is sent, and a KeepAlive follows keepalive_interval (40 ticks) after the Finalize
+    for _ in range(40):
+        assert tick(frame, False) == []
+        frame += 1
+    assert controls[-1] == (frame - 1, KEEPALIVE_MESSAGE)
+    assert [control for _, control in controls] == [FINALIZE_MESSAGE, KEEPALIVE_MESSAGE]
+
+    # Voice onset resumes with the pre-roll, and only released frames reach the downstream gate
+    assert tick(frame, True) == []
+    released = tick(frame + 1, True)
+    assert gate.streaming and gate.resumes == 1
+    assert released == [frame - 1, frame, frame + 1]
+    assert downstream_saw == sent
+
+def test_utterance_end_idles_early_without_finalize():
+    gate = make_gate()
+    gate.push([0], True)
+    gate.on_utterance_end()
+    ticks = 0
+    while gate.streaming:
+        gate.push([ticks], False)
+        assert gate.control is None
+        ticks += 1
+    assert ticks == 12  # idle_after of 1.5 s at 0.125 s per tick
+
+def test_keepalive_while_downstream_holds_everything_back():
+    gate = make_gate()
+    controls = []
+    for frame in range(60):
+        gate.push([frame], True, lambda frames: [])
+        controls.append(gate.control)
+    assert gate.streaming
+    assert controls.count(KEEPALIVE_MESSAGE) == 1 and controls[39] == KEEPALIVE_MESSAGE
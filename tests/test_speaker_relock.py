@@ -0,0 +1,52 @@
+import numpy as np
+
+from filter_engine import VoiceFilterEngine
+from voiceprint import Voiceprint, normalized
+from voiceprint_store import VoiceprintStore
+
+def make_engine(tmp_path):
+    return VoiceFilterEngine(on_log=lambda message: None, voice_profile="default", voiceprint_dir=tmp_path)
+
+def tv_like(engine, speaker_id, utterances=5):
+    """Record a speaker whose recent results all failed Stages 1-4"""
+    for _ in range(utterances):
+        engine.speaker_activity.tick()
+        engine.speaker_activity.record(speaker_id, 6, 5.4, rejected=True)
+
+def test_tv_like_profile_lock_is_released_and_not_rebound(tmp_path):
+    engine = make_engine(tmp_path)
+    lock = engine.speaker_locks.locks[0]
+    vector = normalized(np.arange(1, 25, dtype=np.float64))
+
+    # The profile lock enrolled the TV's voice and saved it
+    engine.speaker_locks.bind(lock, 1)
+    lock.enroll(vector, 5.0)
+    engine.save_voice_profiles()
+    assert 'default' in VoiceprintStore(tmp_path, engine.voiceprints.extractor.signature)
+
+    # Speaker 1 keeps failing Stages 1-4 and still sounds exactly like the enrolled print
+    tv_like(engine, 1)
+    engine.voiceprints.speakers[1] = Voiceprint.from_vector(vector, 5.0)
+    engine.speaker_activity.tick()
+    engine.update_speaker_locks([1], np.array([6]), {1: (vector, 1.0)})
+
+    assert engine.speaker_locks.bound_ids() == []
+    assert lock.voiceprint is None
+    assert 'default' not in VoiceprintStore(tmp_path, engine.voiceprints.extractor.signature)
+
+def test_silent_profile_lock_moves_to_the_active_human_speaker(tmp_path):
+    engine = make_engine(tmp_path)
+    lock = engine.speaker_locks.locks[0]
+    engine.speaker_locks.bind(lock, 1)
+    lock.enroll(normalized(np.ones(24)), 5.0)
+    lock.idle = engine.relock_silent_after
+
+    # Speaker 2 has been talking, and passing Stages 1-4, while speaker 1 was silent
+    for _ in range(5):
+        engine.speaker_activity.tick()
+        engine.speaker_activity.record(2, 6, 5.7)
+    engine.speaker_activity.tick()
+    engine.update_speaker_locks([2], np.array([6]), {})
+
+    assert engine.speaker_locks.bound_ids() == [2]
+    assert lock.voiceprint is None
@@ -0,0 +1,56 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from stage1_analyzer import Stage1Analyzer, StreamingSTFT
+from stage_pipeline import verdict_code
+from tv_noise_filter import AdvancedTVNoiseFilter
+
+def peak_allocation(call, frames):
+    """Largest scratch memory traced over call(frame) for each frame"""
+    tracemalloc.start()
+    worst = 0
+    for frame in frames:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        call(frame)
+        worst = max(worst, tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+    return worst
+
+@pytest.mark.parametrize("in_place", [True, False], ids=["rfft-out", "rfft-allocating"])
+def test_codes_match_the_single_frame_filter(stage1_frames, in_place):
+    tv_filter = AdvancedTVNoiseFilter()
+    analyzer = Stage1Analyzer(tv_filter)
+    analyzer._rfft_in_place = analyzer._rfft_in_place and in_place
+
+    for frame in stage1_frames:
+        data = frame.tobytes()
+        assert analyzer.analyze(data) == verdict_code(tv_filter.stage1_frequency_code(data))
+
+def test_analyze_writes_the_spectrum_into_its_buffers(stage1_frames):
+    analyzer = Stage1Analyzer(AdvancedTVNoiseFilter())
+    if not analyzer._rfft_in_place:
+        pytest.skip("numpy without np.fft out=")
+    frames = [frame.tobytes() for frame in stage1_frames[:120]]  # speech-like: every check runs, FFT included
+    for data in frames[:10]:
+        analyzer.analyze(data)
+    # float32 buffers made rfft allocate a float64 copy and a complex128 result (~16 KB) per frame
+    assert peak_allocation(analyzer.analyze, frames) < 4096
+
+def test_stft_columns_match_a_windowed_rfft(stage1_frames):
+    stft = StreamingSTFT(n_fft=1024, hop=256)
+    audio = stage1_frames[:8].reshape(-1).astype(np.float32)
+    stft.push(audio[:1024])
+    for k in range(4):
+        start = 1024 + 256 * k
+        stft.push(audio[start:start + 256])
+        expected = np.abs(np.fft.rfft(audio[256 * (k + 1):256 * (k + 1) + 1024] * stft.window))[:stft.n_bins]
+        column = stft.spectrogram[stft.latest_column()]
+        assert np.allclose(column, expected, rtol=1e-4, atol=1e-2)
+        assert stft.peak_bins[stft.latest_column()] == np.argmax(expected)
+
+    if stft._rfft_in_place:
+        chunks = [audio[start:start + 256] for start in range(2048, 4096, 256)]
+        assert peak_allocation(stft.push, chunks) < 4096
@@ -0,0 +1,27 @@
+import numpy as np
+
+from stage_pipeline import verdict_code
+from tv_noise_filter import AdvancedTVNoiseFilter
+
+def test_batch_matches_per_frame_analysis(stage1_frames):
+    tv_filter = AdvancedTVNoiseFilter()
+    batch = tv_filter.stage1_batch_analysis(stage1_frames)
+
+    per_frame = [verdict_code(tv_filter.stage1_frequency_code(frame.tobytes())) for frame in stage1_frames]
+    assert batch['verdicts'].tolist() == per_frame
+    assert len(set(per_frame)) == len(tv_filter.stage1_verdict_names())  # every outcome is exercised
+
+    names = tv_filter.stage1_verdict_names()
+    assert [names[code] for code in batch['verdicts']] == [
+        tv_filter.stage1_frequency_analysis(frame.tobytes()) for frame in stage1_frames]
+
+def test_long_buffer_is_cut_at_hop(stage1_frames):
+    tv_filter = AdvancedTVNoiseFilter()
+    audio = stage1_frames[:40].reshape(-1)
+    hop = 512
+    batch = tv_filter.stage1_batch_analysis(audio.tobytes(), hop=hop)
+
+    starts = range(0, len(audio) - 1024 + 1, hop)
+    assert len(batch['verdicts']) == len(starts)
+    assert batch['verdicts'].tolist() == [
+        verdict_code(tv_filter.stage1_frequency_code(audio[start:start + 1024].tobytes())) for start in starts]
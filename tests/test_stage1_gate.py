@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+from stage1_analyzer import Stage1Gate
+from tv_noise_filter import AdvancedTVNoiseFilter, STAGE1_PASSED, STAGE1_LOW_ENERGY, STAGE1_FIRST_BAND
+
+class ScriptedAnalyzer:
+    """Stands in for Stage1Analyzer: returns the code scripted for each frame"""
+
+    def __init__(self):
+        self.tv_filter = AdvancedTVNoiseFilter()
+        self.verdict_names = self.tv_filter.stage1_verdict_names()
+        self.energy = 0.0
+        self.zcr = 0.0
+
+    def analyze(self, code):
+        return code
+
+def run(gate, codes):
+    return [frame for code in codes for frame in gate.push(code)]
+
+def test_silence_after_speech_keeps_the_gate_open():
+    gate = Stage1Gate(ScriptedAnalyzer())
+    codes = [STAGE1_PASSED] * 10 + [STAGE1_LOW_ENERGY] * 40
+    assert run(gate, codes) == codes
+    assert not gate.gated
+
+def test_tv_closes_the_gate_and_only_speech_reopens_it():
+    gate = Stage1Gate(ScriptedAnalyzer(), window=8, gate_after=6, onset_frames=2)
+    tv = STAGE1_FIRST_BAND
+    sent = run(gate, [tv] * 8)
+    assert gate.gated and sent == [tv] * 5
+
+    # Silence while closed is held, not taken for speech onset
+    assert run(gate, [STAGE1_LOW_ENERGY] * 10) == []
+    assert gate.gated
+
+    released = run(gate, [STAGE1_PASSED] * 2)
+    assert not gate.gated
+    assert released[-2:] == [STAGE1_PASSED] * 2
+
+def test_release_reuses_features_from_analyze():
+    analyzer = ScriptedAnalyzer()
+    calls = []
+    analyze = analyzer.analyze
+    analyzer.analyze = lambda data: calls.append(data) or analyze(data)
+    gate = Stage1Gate(analyzer)
+
+    frames = [SimpleNamespace(data=STAGE1_FIRST_BAND, index=i) for i in range(8)]
+    for frame in frames:
+        gate.analyze(frame)
+    assert gate.release(frames) == frames[:5]
+    assert gate.gated and gate.changed
+    assert len(calls) == 8  # analyzed once each, not again on release
@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+import pytest
+
+from transcript_tokens import TranscriptTokens, tokenize
+
+def test_contractions_stay_whole_and_punctuation_splits_off():
+    assert tokenize("we'll be right back, don't go!") == ["we'll", "be", "right", "back", ",", "don't", "go", "!"]
+    assert tokenize("50% off") == ["50", "%", "off"]
+
+@pytest.mark.parametrize("text, phrase, expected", [
+    ("the newsletter arrived", "news", False),
+    ("breaking news tonight", "news", True),
+    ("Breaking News, tonight", "breaking news", True),
+    ("we also went", "so", False),
+    ("so we went", "so", True),
+    ("we'll be right back", "be right back", True),
+    ("well be right back", "we'll be right back", False),
+    ("don't touch that dial!", "don't touch that dial", True),
+    ("call now!", "!", True),
+    ("breaking, news", "breaking news", False),  # a comma is a token between the words
+    ("anything", "", False),
+])
+def test_contains_matches_whole_tokens(text, phrase, expected):
+    assert TranscriptTokens.from_text(text).contains(phrase) is expected
+
+def test_offsets_point_at_each_token():
+    tokens = TranscriptTokens.from_text("  Stay tuned, we'll be right back!  ")
+    assert tokens.text == "stay tuned, we'll be right back!"
+    for i, token in enumerate(tokens.tokens):
+        start, end = tokens.span(i)
+        assert tokens.text[start:end] == token
+    assert tokens.span(3) == (12, 17)  # "we'll"
+
+def test_ngrams_cover_every_window():
+    tokens = TranscriptTokens.from_text("a b c d")
+    assert tokens.ngrams(1) == {("a",), ("b",), ("c",), ("d",)}
+    assert tokens.ngrams(3) == {("a", "b", "c"), ("b", "c", "d")}
+    assert tokens.ngrams(5) == set()
+
+def test_select_words_rebuilds_one_speakers_transcript():
+    words = [SimpleNamespace(word=text) for text in ["turn", "breaking", "it", "news", "off"]]
+    tokens = TranscriptTokens.from_words(words, "Turn breaking it news off")
+    mine = tokens.select_words([0, 2, 4])
+    assert mine.text == "turn it off" and mine.word_count == 3
+    assert mine.tokens == ["turn", "it", "off"]
+    assert not mine.contains("breaking news") and not tokens.contains("breaking news")
+    assert tokens.contains("turn breaking")
@@ -0,0 +1,42 @@
+import json
+
+import numpy as np
+from deepgram import LiveResultResponse
+
+from tv_noise_filter import AdvancedTVNoiseFilter
+
+def tone(freq, seconds=1024 / 16000):
+    t = np.arange(int(seconds * 16000)) / 16000
+    return (8000 * np.sin(2 * np.pi * freq * t)).astype(np.int16).tobytes()
+
+def result(confidence, words):
+    return LiveResultResponse.from_json(json.dumps({
+        "type": "Results", "channel_index": [0, 1], "is_final": True, "speech_final": True,
+        "start": 0.0, "duration": 1.0,
+        "channel": {"alternatives": [{"transcript": " ".join(w["word"] for w in words),
+                                      "confidence": confidence, "words": words}]},
+        "metadata": {"request_id": "test", "model_uuid": "test",
+                     "model_info": {"name": "nova-3", "version": "test", "arch": "nova-3"}},
+    }))
+
+def test_string_results_keep_their_pre_verdict_form():
+    tv_filter = AdvancedTVNoiseFilter()
+    assert tv_filter.stage1_frequency_analysis(tone(60)) == "filtered_tv_bass_boost"
+    assert tv_filter.stage1_frequency_analysis(bytes(2048)) == "filtered_low_energy"
+    assert tv_filter.stage1_frequency_analysis(tone(1000)) == "passed_stage1"
+
+    words = [{"word": "hello", "start": 0.0, "end": 0.3, "confidence": 0.3}]
+    assert tv_filter.stage2_confidence_analysis(result(0.32, words)) == "filtered_very_low_confidence_0.32"
+
+    assert tv_filter.stage3_content_analysis("and now breaking news from downtown") == "filtered_news_phrase_breaking_news"
+    scripted = "furthermore the committee decided that consequently the plan will proceed as announced"
+    assert tv_filter.stage3_content_analysis(scripted) == "filtered_scripted_content"
+
+    assert tv_filter.process_audio_through_stages(tone(60)) == ("filtered_tv_bass_boost", 1)
+
+def test_scores_stay_available_on_the_verdict():
+    tv_filter = AdvancedTVNoiseFilter()
+    verdict = tv_filter.run_stages(tone(60))
+    assert verdict.reason == "filtered_tv_bass_boost"
+    assert 40 <= verdict.score <= 100
+    assert tv_filter.filter_stats['reasons']['stage1_frequency'] == {"filtered_tv_bass_boost": 1}
@@ -0,0 +1,60 @@
+import json
+import threading
+
+import numpy as np
+
+from voiceprint import Voiceprint, normalized
+from voiceprint_store import VoiceprintStore
+
+SIGNATURE = "test-signature"
+
+def voiceprint(seed):
+    return Voiceprint.from_vector(normalized(np.random.default_rng(seed).normal(size=24)), 3.0)
+
+def test_two_stores_on_one_directory_keep_each_others_users(tmp_path):
+    a = VoiceprintStore(tmp_path, SIGNATURE)
+    b = VoiceprintStore(tmp_path, SIGNATURE)
+    alice, bob = voiceprint(1), voiceprint(2)
+    a.save('alice', alice)
+    b.save('bob', bob)
+
+    store = VoiceprintStore(tmp_path, SIGNATURE)
+    assert sorted(store.users) == ['alice', 'bob']
+    assert np.allclose(store.get('alice').vector, alice.vector, atol=1e-6)
+    assert np.allclose(store.get('bob').vector, bob.vector, atol=1e-6)
+
+    a.delete('alice')
+    assert sorted(VoiceprintStore(tmp_path, SIGNATURE).users) == ['bob']
+
+def test_concurrent_saves_from_threads_are_all_kept(tmp_path):
+    stores = [VoiceprintStore(tmp_path, SIGNATURE) for _ in range(4)]
+    names = [f"user{i}" for i in range(16)]
+
+    def save(i):
+        stores[i % len(stores)].save(names[i], voiceprint(i))
+
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(len(names))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(VoiceprintStore(tmp_path, SIGNATURE).users) == sorted(names)
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_delete_then_load_from_a_second_store(tmp_path):
+    writer = VoiceprintStore(tmp_path, SIGNATURE)
+    prints = {name: voiceprint(seed) for seed, name in enumerate(['alice', 'bob', 'carol'])}
+    for name, print_ in prints.items():
+        writer.save(name, print_)
+
+    reader = VoiceprintStore(tmp_path, SIGNATURE)
+    stale_index = json.loads((tmp_path / "index.json").read_text())
+    writer.delete('alice')  # renumbers bob and carol
+
+    # The index a slow reader already holds can no longer be paired with the new rows
+    assert not (tmp_path / stale_index['profiles']).exists()
+    reader.load()
+    assert sorted(reader.users) == ['bob', 'carol']
+    for name in ('bob', 'carol'):
+        assert np.allclose(reader.get(name).vector, prints[name].vector, atol=1e-6)
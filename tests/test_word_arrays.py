@@ -0,0 +1,35 @@
+import json
+
+import numpy as np
+from deepgram import LiveResultResponse
+
+from raw_results import RawResult
+from word_arrays import WordArrays
+
+def message(words):
+    return json.dumps({
+        "type": "Results", "channel_index": [0, 1], "is_final": True, "speech_final": True,
+        "start": 0.0, "duration": 1.0,
+        "channel": {"alternatives": [{"transcript": " ".join(w["word"] for w in words), "confidence": 0.8,
+                                      "words": words}]},
+        "metadata": {"request_id": "test", "model_uuid": "test",
+                     "model_info": {"name": "nova-3", "version": "test", "arch": "nova-3"}},
+        "from_finalize": False,
+    })
+
+WORDS = [
+    {"word": "turn", "start": 0.0, "end": 0.2, "confidence": 0.0, "speaker": 0},
+    {"word": "it", "start": 0.3, "end": 0.4, "confidence": None},   # no speaker, no confidence
+    {"word": "off", "start": 0.5, "end": 0.7, "confidence": 0.9, "speaker": 1},
+]
+
+def test_raw_and_sdk_paths_give_the_same_columns():
+    text = message(WORDS)
+    raw = RawResult.from_json(text).word_arrays()
+    sdk = WordArrays.from_result(LiveResultResponse.from_json(text))
+
+    for words in (raw, sdk):
+        assert words.confidence.tolist() == [0.0, 0.5, 0.9]  # a real 0.0 is kept, only None gets the default
+        assert words.speaker.tolist() == [0, 0, 1]
+    for name in ('confidence', 'speaker', 'start', 'end'):
+        assert np.array_equal(raw.column(name), sdk.column(name))
@@ -0,0 +1,104 @@
+import re
+
+# Words (letters, digits, inner apostrophes) or single non-space symbols such as '!' and '%'
+TOKEN_PATTERN = re.compile(r"[\w']+|[^\w\s]")
+
+def tokenize(text):
+    """Split lowercased text into word and symbol tokens"""
+    return TOKEN_PATTERN.findall(text)
+
+class TranscriptTokens:
+    """One tokenization of a final transcript, shared by Stage 3 and Stage 5.
+
+    Holds the lowercased transcript and its word/symbol tokens. When built
+    from a Deepgram result it also keeps each word's text in order, so Stage 5
+    can rebuild one speaker's transcript by index instead of walking the word
+    objects again. Tokens of derived transcripts, character offsets and n-gram
+    sets are computed lazily, on first use.
+    """
+
+    __slots__ = ('text', 'word_texts', 'word_count', '_tokens', '_starts', '_ends', '_ngrams')
+
+    def __init__(self, text, tokens=None, word_texts=None):
+        self.text = text
+        self.word_texts = word_texts    # Deepgram word.word values, in order (None for plain text)
+        self.word_count = len(text.split()) if word_texts is None else len(word_texts)
+        self._tokens = tokens
+        self._starts = None
+        self._ends = None
+        self._ngrams = {}
+
+    @classmethod
+    def from_text(cls, text):
+        """Tokenize a plain transcript string"""
+        text = text.lower().strip()
+        return cls(text, TOKEN_PATTERN.findall(text))
+
+    @classmethod
+    def from_words(cls, words, transcript=None):
+        """Tokenize a transcript and keep its Deepgram words' text for Stage 5"""
+        return cls.from_word_texts([getattr(word, 'word', '') or '' for word in words], transcript)
+    
+    @classmethod
+    def from_word_texts(cls, word_texts, transcript=None):
+        """Tokenize a transcript given its words' text directly (e.g. from decoded JSON)"""
+        text = (transcript if transcript else ' '.join(word_texts)).lower().strip()
+        return cls(text, TOKEN_PATTERN.findall(text), word_texts)
+
+    @classmethod
+    def from_result(cls, result):
+        """Tokenize a Deepgram result's transcript (and its words, when present)"""
+        alternative = result.channel.alternatives[0]
+        words = getattr(alternative, 'words', None)
+        if words:
+            return cls.from_words(words, alternative.transcript)
+        return cls.from_text(alternative.transcript or '')
+
+    @property
+    def tokens(self):
+        """Word and symbol tokens of text"""
+        if self._tokens is None:
+            self._tokens = TOKEN_PATTERN.findall(self.text)
+        return self._tokens
+
+    @property
+    def starts(self):
+        """Character offset of each token in text"""
+        if self._starts is None:
+            self._locate()
+        return self._starts
+
+    @property
+    def ends(self):
+        """Character offset just past each token in text"""
+        if self._ends is None:
+            self._locate()
+        return self._ends
+
+    def _locate(self):
+        spans = [match.span() for match in TOKEN_PATTERN.finditer(self.text)]
+        self._starts = [start for start, _ in spans]
+        self._ends = [end for _, end in spans]
+
+    def span(self, index):
+        """Character span of a token in text"""
+        return self.starts[index], self.ends[index]
+
+    def ngrams(self, n):
+        """Set of n-token tuples (hashed once, cached per n)"""
+        grams = self._ngrams.get(n)
+        if grams is None:
+            tokens = self.tokens
+            grams = {tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1)}
+            self._ngrams[n] = grams
+        return grams
+
+    def contains(self, phrase):
+        """Whether phrase occurs on token boundaries"""
+        key = tuple(tokenize(phrase.lower()))
+        return bool(key) and key in self.ngrams(len(key))
+
+    def select_words(self, indices):
+        """Tokens of the transcript rebuilt from a subset of Deepgram words"""
+        word_texts = [self.word_texts[i] for i in indices]
+        return TranscriptTokens(' '.join(word_texts).lower(), None, word_texts)
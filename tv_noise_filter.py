@@ -0,0 +1,597 @@
+import numpy as np
+
+from phrase_matcher import PhraseMatcher
+from phrase_dictionary import PhraseDictionary
+from transcript_tokens import TranscriptTokens
+from word_arrays import WordArrays
+from stage_pipeline import FilterStage, StagePipeline, as_verdict, score_bucket, verdict_code
+
+# Stage 1 verdict codes used by the batch (and streaming) paths.
+# Band verdicts follow STAGE1_FIRST_BAND in tv_frequency_ranges order.
+STAGE1_PASSED = 0
+STAGE1_LOW_ENERGY = 1
+STAGE1_MONOTONOUS = 2
+STAGE1_HIGH_FREQUENCY_NOISE = 3
+STAGE1_FIRST_BAND = 4
+
+# Stage 2-4 verdict codes (0 = passed); each stage's *_VERDICT_NAMES maps code → name
+STAGE2_PASSED = 0
+STAGE2_VERY_LOW_CONFIDENCE = 1
+STAGE2_LOW_CONFIDENCE = 2
+STAGE2_LOW_WORD_CONFIDENCE = 3
+STAGE2_CONFIDENCE_VARIATION = 4
+STAGE2_VERDICT_NAMES = ["passed_stage2", "filtered_very_low_confidence", "filtered_low_confidence",
+                        "filtered_low_word_confidence", "filtered_confidence_variation"]
+
+STAGE3_PASSED = 0
+STAGE3_COMMERCIAL_PHRASE = 1
+STAGE3_NEWS_PHRASE = 2
+STAGE3_SHOW_PHRASE = 3
+STAGE3_SCRIPTED = 4
+STAGE3_COMMERCIAL_PATTERN = 5
+STAGE3_VERDICT_NAMES = ["passed_stage3", "filtered_commercial_phrase", "filtered_news_phrase",
+                        "filtered_show_phrase", "filtered_scripted_content", "filtered_commercial_speech_pattern"]
+
+STAGE4_PASSED = 0
+STAGE4_RAPID_SPEAKER_CHANGES = 1
+STAGE4_UNNATURAL_TIMING = 2
+STAGE4_TOO_MANY_SPEAKERS = 3
+STAGE4_VERDICT_NAMES = ["passed_stage4", "filtered_rapid_speaker_changes",
+                        "filtered_unnatural_speaker_timing", "filtered_too_many_speakers"]
+
+# Frames analyzed per NumPy call in batch mode (bounds peak memory on long recordings)
+STAGE1_BATCH_BLOCK = 256
+
+# Share of an utterance's voiced frames that must carry a TV signature for Stage 1 to reject it
+STAGE1_UTTERANCE_SHARE = 0.75
+
+# Stages whose string results have always ended in the score ('filtered_low_confidence_0.52');
+# the others return the bare reason, plus the matched phrase for Stage 3 phrase hits
+LEGACY_SCORED_STAGES = (2, 4)
+
+class AdvancedTVNoiseFilter:
+    """Advanced 5-stage TV noise filtering system"""
+    
+    def __init__(self, dictionary=None):
+        # TV content detection phrases, disfluencies and commercial indicators
+        # come from a versioned data file (dictionaries/tv_phrases.json)
+        self.use_dictionary(dictionary or PhraseDictionary.load())
+        
+        # Audio analysis thresholds
+        self.noise_floor_threshold = 1000
+        self.tv_frequency_ranges = {
+            'tv_bass_boost': (40, 100),     # TV speakers boost bass
+            'tv_compression': (200, 800),   # TV audio compression artifacts  
+            'tv_enhancement': (2000, 6000), # TV audio processing
+        }
+        
+        # Statistics tracking
+        self.filter_stats = {
+            'stage1_frequency': 0,
+            'stage2_confidence': 0, 
+            'stage3_content': 0,
+            'stage4_speaker_pattern': 0,
+            'stage5_voice_lock': {},  # {speaker: {'accepted': words, 'filtered': words}}
+            'passed_all_stages': 0,
+            'total_processed': 0
+        }
+        
+        # Per-reason rejection counts and score histograms:
+        # {stage name: {reason: count}} and {stage name: {reason: {score bucket: count}}}
+        self.filter_stats['reasons'] = {}
+        self.filter_stats['score_histograms'] = {}
+        
+        # Stages 1-4 as a registry; add_stage() plugs in custom stages
+        self.pipeline = StagePipeline(adaptive=True, input_builders={
+            'tokens': TranscriptTokens.from_result,
+            'words': WordArrays.from_result,
+        })
+        self.stage1 = self.pipeline.add_stage(FilterStage('stage1_frequency', self.stage1_audio_code, 'audio',
+                                                          self.stage1_verdict_names(), "Frequency Analysis", 1))
+        self.stage2 = self.pipeline.add_stage(FilterStage('stage2_confidence', self.stage2_confidence_code, 'words',
+                                                          STAGE2_VERDICT_NAMES, "Confidence Scoring", 2))
+        self.stage3 = self.pipeline.add_stage(FilterStage('stage3_content', self.stage3_content_code, 'tokens',
+                                                          STAGE3_VERDICT_NAMES, "Content Analysis", 3))
+        self.stage4 = self.pipeline.add_stage(FilterStage('stage4_speaker_pattern', self.stage4_speaker_pattern_code, 'words',
+                                                          STAGE4_VERDICT_NAMES, "Speaker Patterns", 4))
+    
+    def stage1_frequency_analysis(self, audio_data):
+        """Stage 1: Frequency domain analysis for TV audio signatures"""
+        return self.render_outcome(self.stage1, self.stage1_frequency_code(audio_data))
+    
+    def render_outcome(self, stage, outcome):
+        """String form of a check outcome, as the *_analysis methods always returned it"""
+        verdict = as_verdict(stage, outcome)
+        return self.legacy_string(verdict) if verdict else stage.reason_names[0]
+    
+    @staticmethod
+    def legacy_string(verdict):
+        """A Verdict as the pre-Verdict string, e.g. 'filtered_tv_bass_boost' or 'filtered_low_confidence_0.52'.
+        
+        The score is only part of the string where it always was; the Verdicts
+        from run_stages() and the *_code methods carry it separately.
+        """
+        if isinstance(verdict.detail, str) or verdict.stage.number in LEGACY_SCORED_STAGES:
+            return str(verdict)
+        return verdict.reason
+    
+    def stage1_audio_code(self, audio):
+        """Stage 1 on the pipeline's 'audio' input: an AudioSpan (see audio_history) or raw PCM bytes"""
+        codes = getattr(audio, 'codes', None)
+        if codes is None:
+            return self.stage1_frequency_code(audio)
+        return self.stage1_span_code(codes)
+    
+    def stage1_span_code(self, codes):
+        """Stage 1 for a whole utterance from the per-frame codes the pre-filter already computed.
+        
+        Low-energy frames are the pauses between words, so they are left out;
+        the utterance is rejected when STAGE1_UTTERANCE_SHARE of the remaining
+        frames failed Stage 1, with the most common failure as the reason and
+        that share as the score.
+        """
+        voiced = codes[codes != STAGE1_LOW_ENERGY]
+        if len(voiced) == 0:
+            return STAGE1_PASSED
+        failed = voiced[voiced != STAGE1_PASSED]
+        share = len(failed) / len(voiced)
+        if share < STAGE1_UTTERANCE_SHARE:
+            return STAGE1_PASSED
+        return int(np.bincount(failed).argmax()), share
+    
+    def stage1_frequency_code(self, audio_data):
+        """Stage 1 as a STAGE1_* code, or (code, score): energy, ZCR or peak frequency"""
+        try:
+            # Convert bytes to numpy array
+            audio_array = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32)
+            
+            # Basic energy check
+            energy = np.sum(audio_array ** 2) / len(audio_array)
+            if energy < self.noise_floor_threshold:
+                return STAGE1_LOW_ENERGY, float(energy)
+            
+            # Zero-crossing rate analysis
+            zero_crossings = np.sum(np.diff(np.sign(audio_array)) != 0)
+            zcr = zero_crossings / len(audio_array)
+            
+            # TV music/soundtrack detection (very steady)
+            if zcr < 0.005:  
+                return STAGE1_MONOTONOUS, float(zcr)
+            
+            # Static/interference detection (too chaotic)
+            elif zcr > 0.35:
+                return STAGE1_HIGH_FREQUENCY_NOISE, float(zcr)
+            
+            # Frequency analysis using FFT
+            fft = np.fft.fft(audio_array)
+            freqs = np.fft.fftfreq(len(fft), 1/16000)
+            power = np.abs(fft)
+            
+            # Find dominant frequency
+            positive_freqs = freqs[:len(freqs)//2]
+            positive_power = power[:len(power)//2]
+            
+            if len(positive_power) > 0:
+                peak_freq = positive_freqs[np.argmax(positive_power)]
+                
+                # Check for TV-specific frequency signatures
+                for band_index, (low, high) in enumerate(self.tv_frequency_ranges.values()):
+                    if low <= abs(peak_freq) <= high:
+                        # Check if it's sustained (likely TV)
+                        if self.is_sustained_frequency(positive_power, positive_freqs):
+                            return STAGE1_FIRST_BAND + band_index, float(abs(peak_freq))
+            
+            return STAGE1_PASSED
+            
+        except Exception as e:
+            print(f"Stage 1 error: {e}")
+            return STAGE1_PASSED  # Default to pass on error
+    
+    def is_sustained_frequency(self, power, freqs):
+        """Check if frequency is sustained (TV) vs varied (speech)"""
+        try:
+            if len(power) < 10:
+                return False
+                
+            # Find top 3 frequency peaks
+            peak_indices = np.argsort(power)[-3:]
+            peak_powers = power[peak_indices]
+            
+            # If top frequency dominates heavily, it's likely sustained TV audio
+            if len(peak_powers) > 1 and peak_powers[-1] > peak_powers[-2] * 3:
+                return True
+            
+            return False
+        except:
+            return False
+    
+    def stage1_verdict_names(self):
+        """Map Stage 1 verdict codes to the strings stage1_frequency_analysis returns"""
+        names = ["passed_stage1", "filtered_low_energy",
+                 "filtered_monotonous_tv_audio", "filtered_high_frequency_noise"]
+        names.extend(f"filtered_{tv_type}" for tv_type in self.tv_frequency_ranges)
+        return names
+    
+    def stage1_batch_analysis(self, audio, frame_len=1024, hop=None, sample_rate=16000):
+        """Stage 1 over many frames at once, for offline replay and threshold tuning.
+        
+        `audio` is either an (N, frame_len) int16 array, or one long int16 buffer
+        (array or raw bytes) cut into frame_len frames every `hop` samples.
+        Returns a dict of per-frame arrays: 'verdicts' (STAGE1_* codes, see
+        stage1_verdict_names), 'energy', 'zcr', 'peak_freq' and 'peak_ratio'
+        (top spectral peak over the runner-up). Verdicts match
+        stage1_frequency_analysis frame for frame; filter_stats is not touched.
+        """
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            audio = np.frombuffer(audio, dtype=np.int16)
+        audio = np.asarray(audio)
+        
+        if audio.ndim == 1:
+            hop = hop or frame_len
+            if hop <= 0:
+                raise ValueError("hop must be a positive number of samples")
+            if len(audio) < frame_len:
+                frames = np.empty((0, frame_len), dtype=audio.dtype)
+            else:
+                frames = np.lib.stride_tricks.sliding_window_view(audio, frame_len)[::hop]
+        else:
+            frames = audio
+            frame_len = frames.shape[1]
+        
+        n_frames = frames.shape[0]
+        n_bins = frame_len // 2
+        
+        # Frequency axis and band lookup are shared by every frame
+        bin_freqs = np.fft.rfftfreq(frame_len, 1/sample_rate)[:n_bins]
+        bin_codes = np.full(n_bins, STAGE1_PASSED, dtype=np.int8)
+        bands = list(self.tv_frequency_ranges.values())
+        for band_index in reversed(range(len(bands))):  # first matching band wins
+            low, high = bands[band_index]
+            bin_codes[(low <= bin_freqs) & (bin_freqs <= high)] = STAGE1_FIRST_BAND + band_index
+        
+        verdicts = np.zeros(n_frames, dtype=np.int8)
+        energy = np.zeros(n_frames, dtype=np.float32)
+        zcr = np.zeros(n_frames, dtype=np.float64)
+        peak_freq = np.zeros(n_frames, dtype=np.float64)
+        peak_ratio = np.zeros(n_frames, dtype=np.float32)
+        
+        for start in range(0, n_frames, STAGE1_BATCH_BLOCK):
+            stop = min(start + STAGE1_BATCH_BLOCK, n_frames)
+            block = frames[start:stop].astype(np.float32)
+            
+            block_energy = np.sum(block ** 2, axis=1) / frame_len
+            block_zcr = np.count_nonzero(np.diff(np.sign(block), axis=1), axis=1) / frame_len
+            
+            block_verdicts = np.full(stop - start, STAGE1_PASSED, dtype=np.int8)
+            if n_bins > 0:
+                power = np.abs(np.fft.rfft(block, axis=1))[:, :n_bins]
+                peak_idx = np.argmax(power, axis=1)
+                peak_freq[start:stop] = bin_freqs[peak_idx]
+                
+                if n_bins >= 10:
+                    # Top two peaks only - a partial selection, not a full sort
+                    top2 = np.take_along_axis(power, np.argpartition(power, -2, axis=1)[:, -2:], axis=1)
+                    runner_up = top2.min(axis=1)
+                    top = top2.max(axis=1)
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        peak_ratio[start:stop] = top / runner_up
+                    sustained = top > runner_up * 3
+                    block_verdicts = np.where(sustained, bin_codes[peak_idx], STAGE1_PASSED).astype(np.int8)
+            
+            # Apply checks in reverse priority so earlier checks win, as in the single-frame path
+            block_verdicts[block_zcr > 0.35] = STAGE1_HIGH_FREQUENCY_NOISE
+            block_verdicts[block_zcr < 0.005] = STAGE1_MONOTONOUS
+            block_verdicts[block_energy < self.noise_floor_threshold] = STAGE1_LOW_ENERGY
+            
+            verdicts[start:stop] = block_verdicts
+            energy[start:stop] = block_energy
+            zcr[start:stop] = block_zcr
+        
+        return {
+            'verdicts': verdicts,
+            'energy': energy,
+            'zcr': zcr,
+            'peak_freq': peak_freq,
+            'peak_ratio': peak_ratio,
+        }
+    
+    def stage2_confidence_analysis(self, result):
+        """Stage 2: Deepgram confidence scoring for processed audio detection"""
+        return self.render_outcome(self.stage2, self.stage2_confidence_code(WordArrays.from_result(result)))
+    
+    def stage2_confidence_code(self, words):
+        """Stage 2 over a result's WordArrays: STAGE2_PASSED or (code, confidence score)"""
+        try:
+            # Check transcript confidence
+            confidence = words.transcript_confidence
+            if confidence is not None:
+                # TV audio often has lower confidence due to processing
+                if confidence < 0.4:
+                    return STAGE2_VERY_LOW_CONFIDENCE, float(confidence)
+                elif confidence < 0.6:
+                    return STAGE2_LOW_CONFIDENCE, float(confidence)
+            
+            # Check word-level confidence if available
+            if len(words):
+                word_confidences = words.confidence
+                avg_confidence = float(np.add.reduce(word_confidences)) / len(word_confidences)
+                
+                # TV dialogue often has inconsistent word confidence
+                if avg_confidence < 0.5:
+                    return STAGE2_LOW_WORD_CONFIDENCE, avg_confidence
+                
+                # Check for confidence variation (TV audio is often inconsistent)
+                if len(word_confidences) > 1:
+                    deviation = word_confidences - avg_confidence
+                    confidence_std = (float(np.dot(deviation, deviation)) / len(deviation)) ** 0.5
+                    if confidence_std > 0.3:  # High variation suggests processed audio
+                        return STAGE2_CONFIDENCE_VARIATION, confidence_std
+            
+            return STAGE2_PASSED
+            
+        except Exception as e:
+            print(f"Stage 2 error: {e}")
+            return STAGE2_PASSED
+    
+    def use_dictionary(self, dictionary):
+        """Switch Stage 3 to a loaded PhraseDictionary (safe while transcripts are being filtered)"""
+        phrases = dictionary.phrases
+        self.tv_commercial_phrases = phrases['commercial']
+        self.tv_news_phrases = phrases['news']
+        self.tv_show_phrases = phrases['show']
+        self.disfluency_phrases = phrases['disfluency']
+        self.complex_words = phrases['complex']
+        self.commercial_indicators = phrases['commercial_indicator']
+        self.dictionary = dictionary
+        # Single reference swap: Stage 3 only reads lists through the matcher it picked up
+        self.phrase_matcher = dictionary.matcher
+    
+    def rebuild_phrase_matcher(self):
+        """Compile all Stage 3 phrase lists into one matcher (call after editing the lists)"""
+        self.phrase_matcher = PhraseMatcher({
+            'commercial': self.tv_commercial_phrases,
+            'news': self.tv_news_phrases,
+            'show': self.tv_show_phrases,
+            'disfluency': self.disfluency_phrases,
+            'complex': self.complex_words,
+            'commercial_indicator': self.commercial_indicators,
+        })
+    
+    def stage3_content_analysis(self, transcript, tokens=None):
+        """Stage 3: Content analysis for TV-specific phrases and patterns"""
+        if tokens is None:
+            tokens = TranscriptTokens.from_text(transcript)
+        return self.render_outcome(self.stage3, self.stage3_content_code(tokens))
+    
+    def stage3_content_code(self, tokens):
+        """Stage 3 from the transcript's TranscriptTokens: STAGE3_PASSED or (code, score[, phrase])"""
+        try:
+            if not tokens.text or len(tokens.text) < 3:
+                return STAGE3_PASSED  # Too short to analyze
+            
+            # One pass finds every phrase category in the transcript
+            # (one matcher reference, in case the dictionary is swapped mid-call)
+            matcher = self.phrase_matcher
+            hits = matcher.match(tokens.tokens)
+            phrase_outcome = self.stage3_phrase_code(tokens, hits, matcher)
+            if phrase_outcome:
+                return phrase_outcome
+            
+            # Check for overly perfect speech (TV dialogue characteristics)
+            if self.sounds_too_scripted(tokens, hits):
+                return STAGE3_SCRIPTED, len(hits.get('complex', ()))
+            
+            # Check for rapid commercial-style speech patterns
+            if tokens.word_count > 15:  # Only analyze longer phrases
+                if self.detect_commercial_speech_pattern(tokens, hits):
+                    return STAGE3_COMMERCIAL_PATTERN, len(hits.get('commercial_indicator', ())) / tokens.word_count
+            
+            return STAGE3_PASSED
+            
+        except Exception as e:
+            print(f"Stage 3 error: {e}")
+            return STAGE3_PASSED
+    
+    def stage3_phrase_code(self, tokens, hits=None, matcher=None):
+        """Stage 3 phrase-list checks alone (also run on interim hypotheses): STAGE3_PASSED or (code, score, phrase)"""
+        matcher = matcher or self.phrase_matcher
+        if hits is None:
+            hits = matcher.match(tokens.tokens)
+        
+        # Commercial, then news, then TV show phrases; score = distinct phrases hit,
+        # detail = the first listed one
+        for category, code in (('commercial', STAGE3_COMMERCIAL_PHRASE),
+                               ('news', STAGE3_NEWS_PHRASE),
+                               ('show', STAGE3_SHOW_PHRASE)):
+            if category in hits:
+                indices = hits[category]
+                return code, len(indices), matcher.categories[category][min(indices)]
+        return STAGE3_PASSED
+    
+    def sounds_too_scripted(self, tokens, hits=None):
+        """Detect if content sounds too scripted/perfect for natural speech"""
+        if isinstance(tokens, str):
+            tokens = TranscriptTokens.from_text(tokens)
+        
+        if tokens.word_count > 8:  # Only check longer phrases
+            if hits is None:
+                hits = self.phrase_matcher.match(tokens.tokens)
+            
+            # Natural speech should have some disfluencies (whole words only)
+            has_disfluency = 'disfluency' in hits
+            
+            # Check for overly complex sentence structure (TV dialogue)
+            has_complex_words = 'complex' in hits
+            
+            # TV dialogue is often too perfect
+            if not has_disfluency and has_complex_words:
+                return True
+        
+        return False
+    
+    def detect_commercial_speech_pattern(self, tokens, hits=None):
+        """Detect rapid, enthusiastic commercial-style speech"""
+        if isinstance(tokens, str):
+            tokens = TranscriptTokens.from_text(tokens)
+        if hits is None:
+            hits = self.phrase_matcher.match(tokens.tokens)
+        indicator_count = len(hits.get('commercial_indicator', ()))
+        
+        # High density of commercial language
+        if tokens.word_count > 0:
+            commercial_density = indicator_count / tokens.word_count
+            return commercial_density > 0.15  # 15% commercial language
+        
+        return False
+    
+    def stage4_speaker_pattern_analysis(self, result):
+        """Stage 4: Speaker diarization patterns for TV dialogue detection"""
+        return self.render_outcome(self.stage4, self.stage4_speaker_pattern_code(WordArrays.from_result(result)))
+    
+    def stage4_speaker_pattern_code(self, words):
+        """Stage 4 over a result's WordArrays: STAGE4_PASSED or (code, speaker count / changes)"""
+        try:
+            word_count = len(words)
+            if not word_count:
+                return STAGE4_PASSED  # No speaker data
+            
+            # Analyze speaker switching patterns
+            speaker_count = words.speaker_count()
+            
+            if speaker_count > 1:  # Multiple speakers detected
+                # Count rapid speaker changes (TV dialogue characteristic)
+                speaker_changes = words.speaker_changes()
+                
+                # TV dialogue often has very rapid speaker alternation
+                words_per_speaker_change = word_count / max(speaker_changes, 1)
+                
+                if speaker_changes > 3 and words_per_speaker_change < 4:
+                    return STAGE4_RAPID_SPEAKER_CHANGES, speaker_changes
+                
+                # Check for unnatural speaker timing (TV editing)
+                if self.detect_unnatural_speaker_timing(words):
+                    return STAGE4_UNNATURAL_TIMING
+            
+            # Check for TV-style perfect speaker separation
+            if speaker_count > 2 and word_count < 20:
+                # Too many distinct speakers in short utterance (TV scene)
+                return STAGE4_TOO_MANY_SPEAKERS, speaker_count
+            
+            return STAGE4_PASSED
+            
+        except Exception as e:
+            print(f"Stage 4 error: {e}")
+            return STAGE4_PASSED
+    
+    def detect_unnatural_speaker_timing(self, words):
+        """Detect unnaturally perfect speaker timing (TV editing)"""
+        try:
+            if not isinstance(words, WordArrays):
+                words = WordArrays.from_words(words)
+            if len(words) < 6:
+                return False
+            
+            # Perfectly alternating speakers (A B A) are unrealistic in natural conversation;
+            # too much alternation suggests TV dialogue
+            return words.alternations() > len(words) * 0.3
+            
+        except:
+            return False
+    
+    def run_stages(self, audio_data, result=None, tokens=None, words=None):
+        """Run the stage pipeline; returns the rejecting Verdict, or None if all stages passed"""
+        self.filter_stats['total_processed'] += 1
+        
+        verdict = self.pipeline.run(audio_data, result, tokens=tokens, words=words)
+        if verdict is None:
+            self.filter_stats['passed_all_stages'] += 1
+        else:
+            self.record_verdict(verdict)
+        return verdict
+    
+    def record_verdict(self, verdict):
+        """Count a rejection under its stage and reason, and histogram its score"""
+        stats = self.filter_stats
+        name = verdict.stage.name
+        stats[name] = stats.get(name, 0) + 1
+        
+        reason = verdict.reason
+        reasons = stats['reasons'].setdefault(name, {})
+        reasons[reason] = reasons.get(reason, 0) + 1
+        
+        if verdict.score is not None:
+            histogram = stats['score_histograms'].setdefault(name, {}).setdefault(reason, {})
+            bucket = score_bucket(verdict.score)
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+    
+    def process_audio_through_stages(self, audio_data, result=None, tokens=None, words=None):
+        """Process audio through all 5 stages of filtering"""
+        verdict = self.run_stages(audio_data, result, tokens, words)
+        if verdict is None:
+            return "passed_all_stages", 0
+        return self.legacy_string(verdict), verdict.stage.number
+    
+    def reset_statistics(self):
+        """Zero filter_stats, keeping counters for any custom stages"""
+        for key, value in self.filter_stats.items():
+            if isinstance(value, dict):
+                value.clear()
+            else:
+                self.filter_stats[key] = 0
+    
+    def get_filter_statistics(self):
+        """Get comprehensive filtering statistics"""
+        total = self.filter_stats['total_processed']
+        if total == 0:
+            return "No audio processed yet"
+        
+        stats = []
+        stats.append(f"📊 ADVANCED TV NOISE FILTER STATISTICS")
+        stats.append(f"{'='*50}")
+        stats.append(f"Total Audio Processed: {total}")
+        stats.append(f"")
+        stats.append(f"🎯 FILTERING STAGES:")
+        stats.append(f"Stage 1 (Frequency): {self.filter_stats['stage1_frequency']} ({self.filter_stats['stage1_frequency']/total*100:.1f}%)")
+        stats.append(f"Stage 2 (Confidence): {self.filter_stats['stage2_confidence']} ({self.filter_stats['stage2_confidence']/total*100:.1f}%)")
+        stats.append(f"Stage 3 (Content): {self.filter_stats['stage3_content']} ({self.filter_stats['stage3_content']/total*100:.1f}%)")
+        stats.append(f"Stage 4 (Speaker Pattern): {self.filter_stats['stage4_speaker_pattern']} ({self.filter_stats['stage4_speaker_pattern']/total*100:.1f}%)")
+        voice_lock = self.filter_stats['stage5_voice_lock']
+        stats.append(f"Stage 5 (Voice Lock): {sum(counts['filtered'] for counts in voice_lock.values())} words (tracked separately)")
+        stats.append(f"")
+        stats.append(f"✅ Passed All Stages: {self.filter_stats['passed_all_stages']} ({self.filter_stats['passed_all_stages']/total*100:.1f}%)")
+        stats.append(f"🚫 Total Filtered: {total - self.filter_stats['passed_all_stages']} ({(total - self.filter_stats['passed_all_stages'])/total*100:.1f}%)")
+        
+        custom = [stage for stage in self.pipeline.stages if stage.number is None]
+        if custom:
+            stats.append(f"")
+            stats.append(f"🧩 CUSTOM STAGES:")
+            for stage in custom:
+                count = self.filter_stats.get(stage.name, 0)
+                stats.append(f"{stage.label}: {count} ({count/total*100:.1f}%)")
+        
+        if self.filter_stats['reasons']:
+            stats.append(f"")
+            stats.append(f"🔎 REJECTIONS BY REASON:")
+            for name, reasons in self.filter_stats['reasons'].items():
+                histograms = self.filter_stats['score_histograms'].get(name, {})
+                for reason, count in sorted(reasons.items(), key=lambda item: -item[1]):
+                    line = f"{name} / {reason.replace('filtered_', '')}: {count}"
+                    if reason in histograms:
+                        buckets = histograms[reason]
+                        line += f" (score {min(buckets):.3g}–{max(buckets):.3g})"
+                    stats.append(line)
+        
+        if voice_lock:
+            stats.append(f"")
+            stats.append(f"🔒 VOICE LOCK BY SPEAKER (words):")
+            for speaker, counts in voice_lock.items():
+                stats.append(f"{speaker}: {counts['accepted']} accepted, {counts['filtered']} filtered")
+        
+        order = self.pipeline.summary()
+        if any(stage.calls for stage in self.pipeline.stages):
+            stats.append(f"")
+            stats.append(f"⚙️ STAGE ORDER ({'adaptive' if self.pipeline.adaptive else 'fixed'}):")
+            for name, cost_us, rejection_rate in order:
+                stats.append(f"{name}: {cost_us:.1f} µs/call, {rejection_rate*100:.1f}% rejected")
+        
+        return "\n".join(stats)
@@ -1,21 +1,11 @@
 import datetime
 import threading
+import queue
 import asyncio
-import pyaudio
 import tkinter as tk
 from tkinter import ttk
-from deepgram import DeepgramClient, DeepgramClientOptions, LiveTranscriptionEvents, LiveOptions
-import os
-from dotenv import load_dotenv
-from pathlib import Path
-import ssl
-import certifi
 import time
-import numpy as np
-import re
-
-# Load environment variables from .env file
-load_dotenv()
+from filter_engine import VoiceFilterEngine
 
 # Deepgram-inspired Color Palette
 DEEPGRAM_COLORS = {
@@ -37,766 +27,109 @@ DEEPGRAM_COLORS = {
     'terminal_text': '#E5E7EB'       # Light terminal text
 }
 
-class AdvancedTVNoiseFilter:
-    """Advanced 5-stage TV noise filtering system"""
-    
-    def __init__(self):
-        # TV content detection phrases
-        self.tv_commercial_phrases = [
-            "call now", "limited time", "but wait", "act fast", "operators standing by",
-            "special offer", "don't delay", "order today", "satisfaction guaranteed",
-            "money back guarantee", "as seen on tv", "not sold in stores"
-        ]
-        
-        self.tv_news_phrases = [
-            "breaking news", "this just in", "we'll be right back", "coming up next",
-            "stay tuned", "live from", "reporting live", "back to you", "developing story",
-            "news update", "weather forecast", "traffic report"
-        ]
-        
-        self.tv_show_phrases = [
-            "previously on", "next time on", "don't touch that dial", "after these messages",
-            "brought to you by", "we now return to", "tonight's episode", "season finale",
-            "coming up after the break", "stay with us"
-        ]
-        
-        # Audio analysis thresholds
-        self.noise_floor_threshold = 1000
-        self.tv_frequency_ranges = {
-            'tv_bass_boost': (40, 100),     # TV speakers boost bass
-            'tv_compression': (200, 800),   # TV audio compression artifacts  
-            'tv_enhancement': (2000, 6000), # TV audio processing
-        }
-        
-        # Statistics tracking
-        self.filter_stats = {
-            'stage1_frequency': 0,
-            'stage2_confidence': 0, 
-            'stage3_content': 0,
-            'stage4_speaker_pattern': 0,
-            'stage5_voice_lock': 0,
-            'passed_all_stages': 0,
-            'total_processed': 0
-        }
-    
-    def stage1_frequency_analysis(self, audio_data):
-        """Stage 1: Frequency domain analysis for TV audio signatures"""
-        try:
-            # Convert bytes to numpy array
-            audio_array = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32)
-            
-            # Basic energy check
-            energy = np.sum(audio_array ** 2) / len(audio_array)
-            if energy < self.noise_floor_threshold:
-                return "filtered_low_energy"
-            
-            # Zero-crossing rate analysis
-            zero_crossings = np.sum(np.diff(np.sign(audio_array)) != 0)
-            zcr = zero_crossings / len(audio_array)
-            
-            # TV music/soundtrack detection (very steady)
-            if zcr < 0.005:  
-                return "filtered_monotonous_tv_audio"
-            
-            # Static/interference detection (too chaotic)
-            elif zcr > 0.35:
-                return "filtered_high_frequency_noise"
-            
-            # Frequency analysis using FFT
-            fft = np.fft.fft(audio_array)
-            freqs = np.fft.fftfreq(len(fft), 1/16000)
-            power = np.abs(fft)
-            
-            # Find dominant frequency
-            positive_freqs = freqs[:len(freqs)//2]
-            positive_power = power[:len(power)//2]
-            
-            if len(positive_power) > 0:
-                peak_freq = positive_freqs[np.argmax(positive_power)]
-                
-                # Check for TV-specific frequency signatures
-                for tv_type, (low, high) in self.tv_frequency_ranges.items():
-                    if low <= abs(peak_freq) <= high:
-                        # Check if it's sustained (likely TV)
-                        if self.is_sustained_frequency(positive_power, positive_freqs):
-                            return f"filtered_{tv_type}"
-            
-            return "passed_stage1"
-            
-        except Exception as e:
-            print(f"Stage 1 error: {e}")
-            return "passed_stage1"  # Default to pass on error
-    
-    def is_sustained_frequency(self, power, freqs):
-        """Check if frequency is sustained (TV) vs varied (speech)"""
-        try:
-            if len(power) < 10:
-                return False
-                
-            # Find top 3 frequency peaks
-            peak_indices = np.argsort(power)[-3:]
-            peak_powers = power[peak_indices]
-            
-            # If top frequency dominates heavily, it's likely sustained TV audio
-            if len(peak_powers) > 1 and peak_powers[-1] > peak_powers[-2] * 3:
-                return True
-            
-            return False
-        except:
-            return False
-    
-    def stage2_confidence_analysis(self, result):
-        """Stage 2: Deepgram confidence scoring for processed audio detection"""
-        try:
-            # Check transcript confidence
-            if hasattr(result.channel.alternatives[0], 'confidence'):
-                confidence = result.channel.alternatives[0].confidence
-                
-                # TV audio often has lower confidence due to processing
-                if confidence < 0.4:
-                    return f"filtered_very_low_confidence_{confidence:.2f}"
-                elif confidence < 0.6:
-                    return f"filtered_low_confidence_{confidence:.2f}"
-            
-            # Check word-level confidence if available
-            if hasattr(result.channel.alternatives[0], 'words'):
-                words = result.channel.alternatives[0].words
-                if words:
-                    word_confidences = [getattr(w, 'confidence', 0.5) for w in words]
-                    avg_confidence = sum(word_confidences) / len(word_confidences)
-                    
-                    # TV dialogue often has inconsistent word confidence
-                    if avg_confidence < 0.5:
-                        return f"filtered_low_word_confidence_{avg_confidence:.2f}"
-                    
-                    # Check for confidence variation (TV audio is often inconsistent)
-                    confidence_std = np.std(word_confidences) if len(word_confidences) > 1 else 0
-                    if confidence_std > 0.3:  # High variation suggests processed audio
-                        return f"filtered_confidence_variation_{confidence_std:.2f}"
-            
-            return "passed_stage2"
-            
-        except Exception as e:
-            print(f"Stage 2 error: {e}")
-            return "passed_stage2"
-    
-    def stage3_content_analysis(self, transcript):
-        """Stage 3: Content analysis for TV-specific phrases and patterns"""
-        try:
-            transcript_lower = transcript.lower().strip()
-            
-            if not transcript_lower or len(transcript_lower) < 3:
-                return "passed_stage3"  # Too short to analyze
-            
-            # Check for commercial phrases
-            for phrase in self.tv_commercial_phrases:
-                if phrase in transcript_lower:
-                    return f"filtered_commercial_phrase_{phrase.replace(' ', '_')}"
-            
-            # Check for news phrases
-            for phrase in self.tv_news_phrases:
-                if phrase in transcript_lower:
-                    return f"filtered_news_phrase_{phrase.replace(' ', '_')}"
-            
-            # Check for TV show phrases
-            for phrase in self.tv_show_phrases:
-                if phrase in transcript_lower:
-                    return f"filtered_show_phrase_{phrase.replace(' ', '_')}"
-            
-            # Check for overly perfect speech (TV dialogue characteristics)
-            if self.sounds_too_scripted(transcript_lower):
-                return "filtered_scripted_content"
-            
-            # Check for rapid commercial-style speech patterns
-            word_count = len(transcript_lower.split())
-            if word_count > 15:  # Only analyze longer phrases
-                if self.detect_commercial_speech_pattern(transcript_lower):
-                    return "filtered_commercial_speech_pattern"
-            
-            return "passed_stage3"
-            
-        except Exception as e:
-            print(f"Stage 3 error: {e}")
-            return "passed_stage3"
-    
-    def sounds_too_scripted(self, transcript):
-        """Detect if content sounds too scripted/perfect for natural speech"""
-        # Natural speech has disfluencies
-        natural_patterns = ['um', 'uh', 'ah', 'er', 'well', 'you know', 'like', 'so']
-        
-        words = transcript.split()
-        if len(words) > 8:  # Only check longer phrases
-            # Natural speech should have some disfluencies
-            has_disfluency = any(pattern in transcript for pattern in natural_patterns)
-            
-            # Check for overly complex sentence structure (TV dialogue)
-            complex_words = ['furthermore', 'consequently', 'nevertheless', 'therefore', 'however']
-            has_complex_words = any(word in transcript for word in complex_words)
-            
-            # TV dialogue is often too perfect
-            if not has_disfluency and has_complex_words:
-                return True
-        
-        return False
-    
-    def detect_commercial_speech_pattern(self, transcript):
-        """Detect rapid, enthusiastic commercial-style speech"""
-        # Commercial indicators
-        commercial_indicators = [
-            '!',  # Excessive exclamation
-            'amazing', 'incredible', 'fantastic', 'revolutionary',
-            'percent off', '% off', 'save', 'discount',
-            'free shipping', 'free trial', 'risk free'
-        ]
-        
-        indicator_count = sum(1 for indicator in commercial_indicators if indicator in transcript)
-        
-        # High density of commercial language
-        word_count = len(transcript.split())
-        if word_count > 0:
-            commercial_density = indicator_count / word_count
-            return commercial_density > 0.15  # 15% commercial language
-        
-        return False
-    
-    def stage4_speaker_pattern_analysis(self, result):
-        """Stage 4: Speaker diarization patterns for TV dialogue detection"""
-        try:
-            if not hasattr(result.channel.alternatives[0], 'words') or not result.channel.alternatives[0].words:
-                return "passed_stage4"  # No speaker data
-            
-            words = result.channel.alternatives[0].words
-            
-            # Analyze speaker switching patterns
-            speakers = [getattr(word, 'speaker', 0) for word in words]
-            
-            if len(set(speakers)) > 1:  # Multiple speakers detected
-                # Count rapid speaker changes (TV dialogue characteristic)
-                speaker_changes = sum(1 for i in range(1, len(speakers)) 
-                                    if speakers[i] != speakers[i-1])
-                
-                # TV dialogue often has very rapid speaker alternation
-                words_per_speaker_change = len(words) / max(speaker_changes, 1)
-                
-                if speaker_changes > 3 and words_per_speaker_change < 4:
-                    return f"filtered_rapid_speaker_changes_{speaker_changes}"
-                
-                # Check for unnatural speaker timing (TV editing)
-                if self.detect_unnatural_speaker_timing(words):
-                    return "filtered_unnatural_speaker_timing"
-            
-            # Check for TV-style perfect speaker separation
-            if len(set(speakers)) > 2 and len(words) < 20:
-                # Too many distinct speakers in short utterance (TV scene)
-                return f"filtered_too_many_speakers_{len(set(speakers))}"
-            
-            return "passed_stage4"
-            
-        except Exception as e:
-            print(f"Stage 4 error: {e}")
-            return "passed_stage4"
-    
-    def detect_unnatural_speaker_timing(self, words):
-        """Detect unnaturally perfect speaker timing (TV editing)"""
-        try:
-            if len(words) < 6:
-                return False
-            
-            # Check for perfectly alternating speakers (unrealistic in natural conversation)
-            speakers = [getattr(word, 'speaker', 0) for word in words]
-            
-            # Count alternating patterns
-            alternating_count = 0
-            for i in range(2, len(speakers)):
-                if (speakers[i] != speakers[i-1] and 
-                    speakers[i-1] != speakers[i-2] and
-                    speakers[i] == speakers[i-2]):
-                    alternating_count += 1
-            
-            # Too much alternation suggests TV dialogue
-            return alternating_count > len(speakers) * 0.3
-            
-        except:
-            return False
-    
-    def process_audio_through_stages(self, audio_data, result=None):
-        """Process audio through all 5 stages of filtering"""
-        self.filter_stats['total_processed'] += 1
-        
-        # Stage 1: Frequency Analysis
-        stage1_result = self.stage1_frequency_analysis(audio_data)
-        if stage1_result.startswith('filtered_'):
-            self.filter_stats['stage1_frequency'] += 1
-            return stage1_result, 1
-        
-        # Stage 2: Confidence Analysis (requires Deepgram result)
-        if result:
-            stage2_result = self.stage2_confidence_analysis(result)
-            if stage2_result.startswith('filtered_'):
-                self.filter_stats['stage2_confidence'] += 1
-                return stage2_result, 2
-            
-            # Stage 3: Content Analysis
-            transcript = result.channel.alternatives[0].transcript
-            stage3_result = self.stage3_content_analysis(transcript)
-            if stage3_result.startswith('filtered_'):
-                self.filter_stats['stage3_content'] += 1
-                return stage3_result, 3
-            
-            # Stage 4: Speaker Pattern Analysis
-            stage4_result = self.stage4_speaker_pattern_analysis(result)
-            if stage4_result.startswith('filtered_'):
-                self.filter_stats['stage4_speaker_pattern'] += 1
-                return stage4_result, 4
-        
-        # Passed all stages
-        self.filter_stats['passed_all_stages'] += 1
-        return "passed_all_stages", 0
-    
-    def get_filter_statistics(self):
-        """Get comprehensive filtering statistics"""
-        total = self.filter_stats['total_processed']
-        if total == 0:
-            return "No audio processed yet"
-        
-        stats = []
-        stats.append(f"📊 ADVANCED TV NOISE FILTER STATISTICS")
-        stats.append(f"{'='*50}")
-        stats.append(f"Total Audio Processed: {total}")
-        stats.append(f"")
-        stats.append(f"🎯 FILTERING STAGES:")
-        stats.append(f"Stage 1 (Frequency): {self.filter_stats['stage1_frequency']} ({self.filter_stats['stage1_frequency']/total*100:.1f}%)")
-        stats.append(f"Stage 2 (Confidence): {self.filter_stats['stage2_confidence']} ({self.filter_stats['stage2_confidence']/total*100:.1f}%)")
-        stats.append(f"Stage 3 (Content): {self.filter_stats['stage3_content']} ({self.filter_stats['stage3_content']/total*100:.1f}%)")
-        stats.append(f"Stage 4 (Speaker Pattern): {self.filter_stats['stage4_speaker_pattern']} ({self.filter_stats['stage4_speaker_pattern']/total*100:.1f}%)")
-        stats.append(f"Stage 5 (Voice Lock): {self.filter_stats['stage5_voice_lock']} (tracked separately)")
-        stats.append(f"")
-        stats.append(f"✅ Passed All Stages: {self.filter_stats['passed_all_stages']} ({self.filter_stats['passed_all_stages']/total*100:.1f}%)")
-        stats.append(f"🚫 Total Filtered: {total - self.filter_stats['passed_all_stages']} ({(total - self.filter_stats['passed_all_stages'])/total*100:.1f}%)")
-        
-        return "\n".join(stats)
+class TextLogQueue:
+    """Thread-safe, batched logging into a Tk Text widget.
 
-class VoiceFilter:
-    def __init__(self, terminal_display, status_display):
-        self.terminal_display = terminal_display
-        self.status_display = status_display
-        self.deepgram = None
-        self.dg_connection = None
-        self.audio_stream = None
-        self.is_running = False
-        self.loop = None
-        
-        # Advanced TV noise filtering system
-        self.tv_filter = AdvancedTVNoiseFilter()
-        
-        # Speaker diarization settings (Stage 5)
-        self.primary_speaker_id = None  # Track the primary user
-        self.speaker_lock_enabled = True
-        self.min_words_to_lock = 3  # Minimum words before locking speaker
-        self.total_speakers_detected = set()
-        self.filtered_count = 0
-        self.accepted_count = 0
-        
-        # Initialize Deepgram client with SSL context
-        try:
-            print("🔧 Initializing Voice Filter with Deepgram...")
-            self.log_to_terminal("🔧 Initializing Voice Filter with Advanced TV Noise Filtering...")
-            
-            # Import EmbeddedConfig for proper API key handling
-            from embedded_config import EmbeddedConfig
-            
-            api_key = EmbeddedConfig.get_deepgram_key()
-            if not api_key:
-                print("❌ Warning: DEEPGRAM_API_KEY not found")
-                self.log_to_terminal("❌ Warning: DEEPGRAM_API_KEY not found")
-                return
-            
-            print(f"🔑 API Key found (length: {len(api_key)})") 
-            self.log_to_terminal(f"🔑 Deepgram API Key configured")
-            
-            # Use SSL context for certificate verification
-            ssl_context = ssl.create_default_context(cafile=certifi.where())
-            
-            config = DeepgramClientOptions(
-                options={
-                    "keepalive": "true",
-                    "ssl_context": ssl_context
-                }
-            )
-            self.deepgram = DeepgramClient(api_key, config)
-            print("✅ Voice Filter initialized successfully with SSL context")
-            self.log_to_terminal("✅ Voice Filter with Advanced TV Filtering initialized successfully")
-        except Exception as e:
-            print(f"❌ Error initializing Voice Filter: {e}")
-            self.log_to_terminal(f"❌ Error initializing Voice Filter: {e}")
-    
-    def log_to_terminal(self, message):
-        """Log message to terminal display with timestamp"""
-        try:
-            timestamp = datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3]
-            formatted_message = f"[{timestamp}] {message}\n"
-            self.terminal_display.insert(tk.END, formatted_message)
-            self.terminal_display.see(tk.END)
-            self.terminal_display.update()
-        except Exception as e:
-            print(f"Error logging to terminal: {e}")
+    Any thread can push() a record; only the Tk main thread touches the
+    widget, draining up to `lines_per_tick` records every `interval_ms`
+    with a single insert. The widget is trimmed to `max_lines` so long
+    sessions don't grow without bound.
+    """
     
-    def update_status(self, message, color=None):
-        """Update status display"""
-        try:
-            if color:
-                self.status_display.config(text=message, fg=color)
-            else:
-                self.status_display.config(text=message)
-        except Exception as e:
-            print(f"Error updating status: {e}")
+    def __init__(self, widget, root, timestamp_format="%H:%M:%S.%f", max_lines=2000,
+                 lines_per_tick=200, interval_ms=50):
+        self.widget = widget
+        self.root = root
+        self.timestamp_format = timestamp_format
+        self.max_lines = max_lines
+        self.lines_per_tick = lines_per_tick
+        self.interval_ms = interval_ms
+        self.records = queue.SimpleQueue()
+        self.dropped_lines = 0
     
-    def apply_5_stage_filtering(self, result, audio_data):
-        """Apply the 5-stage TV noise filtering system"""
-        self.log_to_terminal("🎯 Applying 5-stage TV noise filtering...")
-        
-        # Process through stages 1-4 using the advanced TV filter
-        filter_result, failed_stage = self.tv_filter.process_audio_through_stages(audio_data, result)
-        
-        if filter_result.startswith('filtered_'):
-            # Audio was filtered out at one of the first 4 stages
-            stage_names = ["", "Frequency Analysis", "Confidence Scoring", "Content Analysis", "Speaker Patterns"]
-            self.log_to_terminal(f"🚫 STAGE {failed_stage} FILTER: {stage_names[failed_stage]} - {filter_result}")
-            
-            # Log detailed reason
-            reason = filter_result.replace('filtered_', '').replace('_', ' ').title()
-            self.log_to_terminal(f"   Reason: {reason}")
-            
-            return None  # Audio filtered out before voice locking
-        
-        # Passed stages 1-4, now apply Stage 5 (Voice Locking)
-        self.log_to_terminal("✅ Passed Stages 1-4 → Applying Stage 5 (Voice Locking)")
-        return self.filter_by_primary_speaker(result)
+    def push(self, message):
+        """Queue a (timestamp, message) record; safe from any thread, never blocks"""
+        self.records.put((datetime.datetime.now(), message))
     
-    def filter_by_primary_speaker(self, result):
-        """Stage 5: Filter transcript to only include primary speaker's words"""
-        if not hasattr(result.channel.alternatives[0], 'words') or not result.channel.alternatives[0].words:
-            self.log_to_terminal("🔍 No word-level data available, using full transcript")
-            return result.channel.alternatives[0].transcript
-        
-        words = result.channel.alternatives[0].words
-        
-        # Group words by speaker
-        speaker_words = {}
-        for word_info in words:
-            speaker_id = getattr(word_info, 'speaker', 0)
-            if speaker_id not in speaker_words:
-                speaker_words[speaker_id] = []
-            speaker_words[speaker_id].append(word_info)
-            
-            # Track all detected speakers
-            self.total_speakers_detected.add(speaker_id)
-        
-        self.log_to_terminal(f"🎤 Stage 5 - Speakers in utterance: {list(speaker_words.keys())}")
-        self.log_to_terminal(f"📊 Total speakers detected in session: {len(self.total_speakers_detected)}")
-        
-        # Lock onto first speaker if not already locked
-        if self.primary_speaker_id is None and self.speaker_lock_enabled:
-            # Find speaker with most words in this utterance
-            if speaker_words:
-                primary_candidate = max(speaker_words.keys(), 
-                                      key=lambda s: len(speaker_words[s]))
-                
-                # Only lock if they said enough words
-                if len(speaker_words[primary_candidate]) >= self.min_words_to_lock:
-                    self.primary_speaker_id = primary_candidate
-                    self.log_to_terminal(f"🔒 STAGE 5 VOICE LOCK: Locked to Speaker {self.primary_speaker_id}")
-                    self.update_status(f"🔒 Voice Locked to Speaker {self.primary_speaker_id}", DEEPGRAM_COLORS['success_green'])
-                    
-                    # Update speaker lock display
-                    try:
-                        speaker_lock_label.config(text=f"🔒 Speaker {self.primary_speaker_id} Locked", 
-                                                 fg=DEEPGRAM_COLORS['success_green'])
-                    except:
-                        pass
-        
-        # Return only primary speaker's words
-        if self.primary_speaker_id is not None and self.primary_speaker_id in speaker_words:
-            primary_words = speaker_words[self.primary_speaker_id]
-            # Reconstruct transcript from primary speaker's words only
-            filtered_transcript = ' '.join([getattr(word, 'word', '') for word in primary_words])
-            
-            self.accepted_count += 1
-            self.tv_filter.filter_stats['stage5_voice_lock'] += len([s for s in speaker_words.keys() if s != self.primary_speaker_id])
-            
-            self.log_to_terminal(f"✅ STAGE 5 ACCEPTED: Speaker {self.primary_speaker_id} said: '{filtered_transcript}'")
-            self.log_to_terminal(f"📈 Session Stats - Accepted: {self.accepted_count} | Stage 5 Filtered: {self.filtered_count}")
-            
-            return filtered_transcript
-        elif self.primary_speaker_id is not None:
-            self.filtered_count += 1
-            # Log which speakers were filtered out
-            filtered_speakers = [s for s in speaker_words.keys() if s != self.primary_speaker_id]
-            self.log_to_terminal(f"🚫 STAGE 5 FILTERED: Speaker(s) {filtered_speakers} (not primary speaker)")
-            self.log_to_terminal(f"📈 Session Stats - Accepted: {self.accepted_count} | Stage 5 Filtered: {self.filtered_count}")
-            return None
-        
-        # Fallback to full transcript if no speaker lock
-        self.log_to_terminal("⚠️ No speaker lock active - processing all speech")
-        return result.channel.alternatives[0].transcript
+    def start(self):
+        """Begin draining on the Tk main thread"""
+        self.root.after(self.interval_ms, self._drain)
     
-    def reset_speaker_lock(self):
-        """Reset speaker lock to re-identify primary speaker"""
-        self.primary_speaker_id = None
-        self.total_speakers_detected = set()
-        self.filtered_count = 0
-        self.accepted_count = 0
-        
-        self.log_to_terminal("🔓 SPEAKER LOCK RESET - will re-identify on next speech")
-        self.update_status("🔓 Ready to lock onto voice", DEEPGRAM_COLORS['warning'])
-        
-        try:
-            speaker_lock_label.config(text="🔓 No Speaker Lock", fg=DEEPGRAM_COLORS['text_muted'])
-        except:
-            pass
+    def _format(self, timestamp, message):
+        stamp = timestamp.strftime(self.timestamp_format)
+        if self.timestamp_format.endswith("%f"):
+            stamp = stamp[:-3]  # milliseconds
+        return f"[{stamp}] {message}\n"
     
-    def show_filter_statistics(self):
-        """Display comprehensive filtering statistics in terminal"""
-        stats = self.tv_filter.get_filter_statistics()
-        self.log_to_terminal("\n" + stats + "\n")
-        
-    def process_transcript(self, result):
-        """Process the recognized text from Deepgram with 5-stage filtering"""
+    def _drain(self):
+        """Tk timer callback: insert one batch of queued records, trim, reschedule"""
         try:
-            # Extract text from Deepgram result
-            if result.is_final:
-                self.log_to_terminal(f"📝 Raw transcript received: '{result.channel.alternatives[0].transcript}'")
+            lines = []
+            while len(lines) < self.lines_per_tick:
+                try:
+                    timestamp, message = self.records.get_nowait()
+                except queue.Empty:
+                    break
+                lines.append(self._format(timestamp, message))
+            
+            if lines:
+                self.widget.insert(tk.END, "".join(lines))
                 
-                # Apply the revolutionary 5-stage filtering system
-                # This integrates all TV noise filtering with voice locking
-                filtered_transcript = self.apply_5_stage_filtering(result, None)  # audio_data not available here
+                # Cap the widget's size by deleting the oldest lines
+                line_count = int(self.widget.index("end-1c").split(".")[0])
+                excess = line_count - self.max_lines
+                if excess > 0:
+                    self.widget.delete("1.0", f"{excess + 1}.0")
+                    self.dropped_lines += excess
                 
-                if filtered_transcript and filtered_transcript.strip():
-                    self.log_to_terminal(f"📝 Final filtered transcript: '{filtered_transcript}'")
-                    
-                    # Add to transcription display
-                    try:
-                        import datetime
-                        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-                        transcription_display.insert(tk.END, f"[{timestamp}] {filtered_transcript}\n")
-                        transcription_display.see(tk.END)
-                        transcription_display.update()
-                    except Exception as e:
-                        print(f"Error updating transcription display: {e}")
-                    
-                    # Check for exit command
-                    if "exit filter" in filtered_transcript.lower() or "stop filter" in filtered_transcript.lower():
-                        self.log_to_terminal("🛑 Exit command detected - stopping Voice Filter")
-                        self.stop_filter()
-                    
-                    # Check for statistics command
-                    elif "show stats" in filtered_transcript.lower() or "show statistics" in filtered_transcript.lower():
-                        self.show_filter_statistics()
-                        
-                elif filtered_transcript is None:
-                    # This means the speech was filtered out by one of the 5 stages
-                    pass  # Already logged in filtering stages
-                    
+                self.widget.see(tk.END)
         except Exception as e:
-            self.log_to_terminal(f"❌ Error processing transcript: {e}")
-            print(f"Error processing transcript: {e}")
-    
-    def on_message(self, result, **kwargs):
-        """Handle Deepgram message events"""
-        try:
-            sentence = result.channel.alternatives[0].transcript
-            if len(sentence) == 0:
-                return
-            
-            self.process_transcript(result)
-        except Exception as e:
-            self.log_to_terminal(f"❌ Error in on_message: {e}")
-    
-    def on_error(self, error, **kwargs):
-        """Handle Deepgram error events"""
-        self.log_to_terminal(f"🔴 Deepgram error: {error}")
-    
-    def on_close(self, close, **kwargs):
-        """Handle Deepgram connection close"""
-        self.log_to_terminal(f"🔌 Deepgram connection closed: {close}")
-    
-    async def start_audio_stream(self):
-        """Start the audio stream and Deepgram transcription"""
-        try:
-            self.log_to_terminal("🎯 Starting Voice Filter audio stream...")
-            
-            if not self.deepgram:
-                self.log_to_terminal("❌ Deepgram client not initialized")
-                return
-                
-            self.log_to_terminal("🎤 Initializing PyAudio...")
-            # Initialize PyAudio
-            p = pyaudio.PyAudio()
-            
-            # Set up audio stream
-            self.audio_stream = p.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=16000,
-                input=True,
-                frames_per_buffer=1024
-            )
-            self.log_to_terminal("✅ Audio stream initialized")
-            
-            # Configure Deepgram options
-            self.log_to_terminal("⚙️ Configuring Deepgram with speaker diarization...")
-            options = LiveOptions(
-                model="nova-3",  
-                language="en-US",
-                smart_format=True,
-                interim_results=True,
-                utterance_end_ms=1000,
-                vad_events=True,
-                endpointing=300,
-                punctuate=True,
-                diarize=True,                 # ← ENABLED for speaker diarization
-                encoding="linear16",
-                sample_rate=16000
-            )
-            self.log_to_terminal("✅ Deepgram configured: model=nova-3, diarize=True")
-            
-            # Create a websocket connection
-            self.log_to_terminal("🌐 Creating WebSocket connection...")
-            self.dg_connection = self.deepgram.listen.websocket.v("1")
-            
-            # Store reference to access VoiceFilter instance from event handlers
-            voice_filter = self
-            
-            # Define event handlers
-            def on_open(self, open, **kwargs):
-                voice_filter.log_to_terminal("🟢 Voice Filter connection opened!")
-                voice_filter.update_status("🟢 Connected & Listening", DEEPGRAM_COLORS['success_green'])
+            print(f"Error draining log queue: {e}")
+        finally:
+            self.root.after(self.interval_ms, self._drain)
 
-            def on_message(self, result, **kwargs):
-                try:
-                    sentence = result.channel.alternatives[0].transcript
-                    if len(sentence) == 0:
-                        return
-                    
-                    if result.is_final:
-                        voice_filter.log_to_terminal(f"📝 Raw transcript received: '{sentence}'")
-                        voice_filter.process_transcript(result)
-                    else:
-                        voice_filter.log_to_terminal(f"📝 Interim: '{sentence}'")
-                except Exception as e:
-                    voice_filter.log_to_terminal(f"❌ Error in transcript handler: {e}")
+# Engine callbacks arrive on worker threads; widget updates are queued here
+# and applied on the Tk main thread
+ui_updates = queue.SimpleQueue()
 
-            def on_error(self, error, **kwargs):
-                voice_filter.log_to_terminal(f"🔴 Deepgram error: {error}")
-                voice_filter.update_status("🔴 Connection Error", DEEPGRAM_COLORS['danger'])
+STATUS_COLORS = {
+    'success': DEEPGRAM_COLORS['success_green'],
+    'warning': DEEPGRAM_COLORS['warning'],
+    'danger': DEEPGRAM_COLORS['danger'],
+    'muted': DEEPGRAM_COLORS['text_muted'],
+}
 
-            def on_close(self, close, **kwargs):
-                voice_filter.log_to_terminal("🔌 Deepgram connection closed")
-                voice_filter.update_status("🔌 Disconnected", DEEPGRAM_COLORS['text_muted'])
-            
-            # Register event handlers
-            self.dg_connection.on(LiveTranscriptionEvents.Open, on_open)
-            self.dg_connection.on(LiveTranscriptionEvents.Transcript, on_message)
-            self.dg_connection.on(LiveTranscriptionEvents.Error, on_error)
-            self.dg_connection.on(LiveTranscriptionEvents.Close, on_close)
-            
-            self.log_to_terminal("✅ Event handlers registered")
-            
-            # Start Deepgram connection
-            self.log_to_terminal("🚀 Starting Deepgram connection...")
-            start_result = self.dg_connection.start(options)
-            
-            if not start_result:
-                self.log_to_terminal("❌ Failed to start Deepgram connection")
-                return
-            
-            self.log_to_terminal("✅ Voice Filter started successfully!")
-            self.log_to_terminal("=" * 50)
-            self.log_to_terminal("🎤 VOICE FILTER - ACTIVE")
-            self.log_to_terminal("🔍 Listening for speakers...")
-            self.log_to_terminal("🔒 Will lock onto first speaker with 3+ words")
-            self.log_to_terminal("🗣️ Say 'exit filter' or 'stop filter' to stop")
-            self.log_to_terminal("=" * 50)
-            
-            # Give the connection a moment to fully establish
-            await asyncio.sleep(0.5)
-            
-            self.is_running = True
-            
-            # Audio streaming loop
-            loop_count = 0
-            while self.is_running:
-                try:
-                    # Read audio data
-                    audio_data = self.audio_stream.read(1024, exception_on_overflow=False)
-                    
-                    # STAGE 1 PRE-FILTERING: Apply frequency analysis before sending to Deepgram
-                    if loop_count % 10 == 0:  # Check every 10th frame for efficiency
-                        stage1_result = self.tv_filter.stage1_frequency_analysis(audio_data)
-                        if stage1_result.startswith('filtered_'):
-                            self.tv_filter.filter_stats['stage1_frequency'] += 1
-                            self.tv_filter.filter_stats['total_processed'] += 1
-                            
-                            if loop_count % 100 == 0:  # Log occasionally to avoid spam
-                                reason = stage1_result.replace('filtered_', '').replace('_', ' ').title()
-                                self.log_to_terminal(f"🚫 STAGE 1 PRE-FILTER: {reason}")
-                            
-                            # Skip sending this audio to Deepgram
-                            await asyncio.sleep(0.01)
-                            loop_count += 1
-                            continue
-                    
-                    # Send to Deepgram (will go through Stages 2-5 in process_transcript)
-                    if self.dg_connection:
-                        self.dg_connection.send(audio_data)
-                        
-                        # Debug every 500 loops (roughly every 5 seconds)
-                        loop_count += 1
-                        if loop_count % 500 == 0:
-                            self.log_to_terminal(f"🔄 Audio streaming active (loop {loop_count}) - Stage 1 pre-filtering enabled")
-                        
-                    # Small delay to prevent overwhelming the API
-                    await asyncio.sleep(0.01)
-                    
-                except Exception as e:
-                    self.log_to_terminal(f"❌ Error in audio loop: {e}")
-                    await asyncio.sleep(0.1)  # Brief pause before retrying
-            
-        except Exception as e:
-            self.log_to_terminal(f"❌ Error starting audio stream: {e}")
-            print(f"❌ Error starting audio stream: {e}")
-            import traceback
-            print(f"🔍 Full traceback: {traceback.format_exc()}")
-        finally:
-            await self.cleanup()
-    
-    async def cleanup(self):
-        """Clean up resources"""
-        self.log_to_terminal("🛑 Stopping Voice Filter...")
-        self.is_running = False
-        
-        if self.dg_connection:
+def apply_ui_updates():
+    """Tk timer callback: run queued widget updates from the engine"""
+    try:
+        while True:
             try:
-                self.dg_connection.finish()
-                self.log_to_terminal("✅ Deepgram connection finished")
-            except Exception as e:
-                self.log_to_terminal(f"❌ Error finishing Deepgram connection: {e}")
-            
-        if self.audio_stream:
-            try:
-                self.audio_stream.stop_stream()
-                self.audio_stream.close()
-                self.log_to_terminal("✅ Audio stream closed")
-            except Exception as e:
-                self.log_to_terminal(f"❌ Error closing audio stream: {e}")
-        
-        self.log_to_terminal("✅ Voice Filter cleanup completed")
-        self.update_status("🔴 Stopped", DEEPGRAM_COLORS['text_muted'])
-    
-    def stop_filter(self):
-        """Stop the voice filter"""
-        self.log_to_terminal("🛑 Voice Filter termination requested...")
-        self.is_running = False
+                update = ui_updates.get_nowait()
+            except queue.Empty:
+                break
+            update()
+    except Exception as e:
+        print(f"Error applying UI update: {e}")
+    finally:
+        root.after(50, apply_ui_updates)
+
+def on_engine_status(message, level=None):
+    """Engine status callback → status label"""
+    def update():
+        if level:
+            status_label.config(text=message, fg=STATUS_COLORS.get(level, DEEPGRAM_COLORS['text_primary']))
+        else:
+            status_label.config(text=message)
+    ui_updates.put(update)
+
+def on_engine_speaker_lock(speaker_id):
+    """Engine Stage 5 lock callback → speaker lock label"""
+    def update():
+        if speaker_id is None:
+            speaker_lock_label.config(text="🔓 No Speaker Lock", fg=DEEPGRAM_COLORS['text_muted'])
+        else:
+            speaker_lock_label.config(text=f"🔒 Speaker {speaker_id} Locked", fg=DEEPGRAM_COLORS['success_green'])
+    ui_updates.put(update)
 
 # Global variable to store the filter instance
 current_filter = None
@@ -804,7 +137,10 @@ current_filter = None
 def start_voice_filter():
     """Start the voice filter"""
     global current_filter
-    current_filter = VoiceFilter(terminal_display, status_label)
+    current_filter = VoiceFilterEngine(on_log=terminal_log.push,
+                                       on_status=on_engine_status,
+                                       on_transcript=transcription_log.push,
+                                       on_speaker_lock=on_engine_speaker_lock)
     
     # Update UI
     start_button.config(text="🛑 Stop Filter", command=stop_voice_filter, 
@@ -851,15 +187,7 @@ def clear_terminal():
     # Reset statistics if voice filter is running
     global current_filter
     if current_filter and current_filter.tv_filter:
-        current_filter.tv_filter.filter_stats = {
-            'stage1_frequency': 0,
-            'stage2_confidence': 0, 
-            'stage3_content': 0,
-            'stage4_speaker_pattern': 0,
-            'stage5_voice_lock': 0,
-            'passed_all_stages': 0,
-            'total_processed': 0
-        }
+        current_filter.tv_filter.reset_statistics()
         current_filter.filtered_count = 0
         current_filter.accepted_count = 0
         current_filter.log_to_terminal("📊 Statistics reset - starting fresh filtering metrics")
@@ -1097,6 +425,13 @@ def show_welcome_message():
 # Show welcome message on startup
 root.after(100, show_welcome_message)
 
+# Log pipelines: worker threads queue records, the Tk main loop drains them in batches
+terminal_log = TextLogQueue(terminal_display, root)
+transcription_log = TextLogQueue(transcription_display, root, timestamp_format="%H:%M:%S")
+terminal_log.start()
+transcription_log.start()
+root.after(50, apply_ui_updates)
+
 # Button hover effects
 def on_enter(event):
     """Button hover effect with Deepgram colors"""
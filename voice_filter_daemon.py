@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Voice Filter - Headless daemon
+Runs the 5-stage TV noise filter without a display. Accepted transcripts go
+to stdout (plain text or JSON lines); activity logs go to stderr.
+
+    python voice_filter_daemon.py [--json] [--quiet] [--dictionary PATH] [--raw-json] [--incremental]
+                                  [--voice-profile NAME[,NAME...]] [--voiceprint-dir DIR] [--max-speakers N]
+
+Send SIGHUP to reload the phrase dictionary (it is also reloaded whenever the
+file changes); the Deepgram session keeps running.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import signal
+import sys
+
+from filter_engine import VoiceFilterEngine
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Headless Voice Filter daemon")
+    parser.add_argument("--json", action="store_true", help="emit accepted transcripts as JSON lines")
+    parser.add_argument("--quiet", action="store_true", help="suppress activity logs on stderr")
+    parser.add_argument("--dictionary", help="Stage 3 phrase dictionary (default: dictionaries/tv_phrases.json)")
+    parser.add_argument("--raw-json", action="store_true",
+                        help="decode transcript messages straight from the websocket JSON (faster at high message rates)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="provisional decisions on interim results; voice commands fire before the final")
+    parser.add_argument("--voice-profile",
+                        help="save the enrolled voiceprint(s) under these names, comma-separated, and pre-arm "
+                             "the speaker locks from them on the next start (default: none, nothing is stored)")
+    parser.add_argument("--voiceprint-dir", help="voiceprint store (default: ~/.local/share/voice_filter/voiceprints)")
+    parser.add_argument("--max-speakers", type=int, default=1,
+                        help="speakers Stage 5 may lock at once (at least one per voice profile)")
+    return parser.parse_args()
+
+def make_log_sink(quiet):
+    """Timestamped log lines on stderr, keeping stdout for transcripts"""
+    def log(message):
+        if quiet:
+            return
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3]
+        print(f"[{timestamp}] {message}", file=sys.stderr, flush=True)
+    return log
+
+def make_transcript_sink(as_json):
+    """Accepted transcripts on stdout"""
+    def emit(text):
+        if as_json:
+            print(json.dumps({"time": datetime.datetime.now().isoformat(), "transcript": text}), flush=True)
+        else:
+            print(text, flush=True)
+    return emit
+
+async def run(engine):
+    """Run one session until it stops or the process is signalled"""
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, engine.stop_filter)
+        except NotImplementedError:
+            pass  # Windows: fall back to KeyboardInterrupt
+    if hasattr(signal, 'SIGHUP'):
+        # Recompile off the loop; the swap itself is a single reference assignment
+        loop.add_signal_handler(signal.SIGHUP, lambda: loop.run_in_executor(None, engine.reload_dictionary))
+    await engine.start_audio_stream()
+
+def main():
+    args = parse_args()
+    log = make_log_sink(args.quiet)
+    engine = VoiceFilterEngine(
+        on_log=log,
+        on_status=lambda message, level=None: log(message),
+        on_transcript=make_transcript_sink(args.json),
+        dictionary_path=args.dictionary,
+        raw_results=args.raw_json,
+        incremental=args.incremental,
+        voice_profile=args.voice_profile or None,
+        voiceprint_dir=args.voiceprint_dir,
+        max_locked_speakers=args.max_speakers,
+    )
+    # Without --incremental interim results are only logged; with --quiet the fast path can skip them unparsed
+    engine.show_interim = not args.quiet
+    try:
+        asyncio.run(run(engine))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
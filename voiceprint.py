@@ -0,0 +1,170 @@
+import numpy as np
+
+class VoiceprintExtractor:
+    """Lightweight CPU voiceprint: statistics of liftered MFCCs, in NumPy.
+
+    Frames of `frame_len` samples every `hop` samples are Hamming-windowed,
+    reduced to `n_mels` log mel-filterbank energies and `n_mfcc` cepstra (c0,
+    which mostly tracks loudness, is dropped). Frames below the noise floor
+    are ignored. The voiceprint is the mean and standard deviation of each
+    cepstrum over the voiced frames, L2-normalized so voiceprints compare by
+    dot product. The window, mel matrix, DCT and lifter are built once.
+    """
+
+    def __init__(self, sample_rate=16000, frame_len=400, hop=160, n_fft=512, n_mels=26, n_mfcc=13,
+                 low_hz=80.0, high_hz=7600.0, lifter=22, noise_floor=1000.0):
+        self.signature = f"mfcc-{sample_rate}-{frame_len}-{hop}-{n_fft}-{n_mels}-{n_mfcc}-{low_hz:g}-{high_hz:g}-{lifter}"
+        self.sample_rate = sample_rate
+        self.frame_len = frame_len
+        self.hop = hop
+        self.n_fft = n_fft
+        self.noise_floor = noise_floor  # mean-square int16 energy, as Stage 1's noise_floor_threshold
+        self.window = np.hamming(frame_len).astype(np.float32)
+        self.mel = mel_filterbank(sample_rate, n_fft, n_mels, low_hz, high_hz)
+
+        # DCT-II rows for c1..c(n_mfcc-1), with the sinusoidal lifter folded in
+        k = np.arange(1, n_mfcc)[:, None]
+        n = np.arange(n_mels)[None, :]
+        lift = 1 + (lifter / 2) * np.sin(np.pi * np.arange(1, n_mfcc) / lifter)
+        self.dct = (np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * lift[:, None]).astype(np.float32)
+
+    @property
+    def size(self):
+        return 2 * len(self.dct)
+
+    def frames(self, samples):
+        """Overlapping frames of samples as a strided (n_frames, frame_len) view"""
+        if len(samples) < self.frame_len:
+            return np.empty((0, self.frame_len), dtype=samples.dtype)
+        return np.lib.stride_tricks.sliding_window_view(samples, self.frame_len)[::self.hop]
+
+    def embed(self, samples, min_frames=30):
+        """(voiceprint, voiced seconds) of int16 samples, or (None, seconds) if too little voice"""
+        frames = self.frames(np.asarray(samples, dtype=np.float32))
+        if len(frames):
+            frames = frames[np.mean(frames * frames, axis=1) >= self.noise_floor]
+        seconds = len(frames) * self.hop / self.sample_rate
+        if len(frames) < min_frames:
+            return None, seconds
+
+        power = np.abs(np.fft.rfft(frames * self.window, self.n_fft)) ** 2
+        log_mel = np.log(power @ self.mel.T + 1e-6)
+        cepstra = log_mel @ self.dct.T
+
+        vector = np.concatenate([cepstra.mean(axis=0), cepstra.std(axis=0)])
+        return normalized(vector), seconds
+
+def mel_filterbank(sample_rate, n_fft, n_mels, low_hz, high_hz):
+    """(n_mels, n_fft // 2 + 1) triangular mel filters"""
+    def to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+    def to_hz(mel):
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+    edges = to_hz(np.linspace(to_mel(low_hz), to_mel(high_hz), n_mels + 2))
+    bin_freqs = np.fft.rfftfreq(n_fft, 1 / sample_rate)
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bin_freqs - lower) / (center - lower)
+    falling = (upper - bin_freqs) / (upper - center)
+    return np.maximum(0.0, np.minimum(rising, falling)).astype(np.float32)
+
+def normalized(vector):
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+class Voiceprint:
+    """Running, duration-weighted mean of voiceprint vectors"""
+
+    __slots__ = ('total', 'seconds', 'version', 'vector')
+
+    def __init__(self, size):
+        self.total = np.zeros(size, dtype=np.float64)
+        self.seconds = 0.0
+        self.version = 0  # bumped on every update, for similarity caches
+        self.vector = self.total
+
+    @classmethod
+    def from_vector(cls, vector, seconds):
+        """A voiceprint resumed from a stored vector and the seconds of voice behind it"""
+        voiceprint = cls(len(vector))
+        voiceprint.add(vector, seconds)
+        return voiceprint
+
+    def add(self, vector, seconds):
+        self.total += vector * seconds
+        self.seconds += seconds
+        self.version += 1
+        self.vector = normalized(self.total)
+
+class VoiceprintTracker:
+    """Stage 5 voiceprints of each diarization speaker ID, compared with enrolled users'.
+
+    Every utterance is split by speaker over its word spans and each speaker's
+    audio is embedded, both to check that utterance against a locked user and
+    to build a running voiceprint for that speaker ID in the current
+    connection. Cosine similarities of the ID voiceprints to an enrolled one
+    are cached until either changes, so finding which ID is a user after
+    Deepgram renumbers speakers is a lookup.
+    """
+
+    def __init__(self, extractor=None, match_threshold=0.85, reject_threshold=0.6,
+                 min_seconds=0.5, adapt_threshold=0.9):
+        self.extractor = extractor or VoiceprintExtractor()
+        self.match_threshold = match_threshold    # similarity at which an ID is taken to be the user
+        self.reject_threshold = reject_threshold  # below this the locked ID's words are not the user
+        self.min_seconds = min_seconds            # voiced audio needed to judge a speaker
+        self.adapt_threshold = adapt_threshold    # confident matches also refine the enrolled voiceprint
+
+        self.speakers = {}     # diarization speaker ID -> Voiceprint, this connection only
+        self._similarity = {}  # (speaker ID, enrolled Voiceprint) -> (ID version, enrolled version, similarity)
+
+    def new_session(self):
+        """Forget per-ID voiceprints; diarization IDs mean nothing across connections"""
+        self.speakers = {}
+        self._similarity = {}
+
+    def observe(self, words, audio):
+        """Embed each speaker's words in an utterance; returns {speaker ID: (voiceprint, seconds)}"""
+        prints = {}
+        if audio is None or not len(words):
+            return prints
+        starts, ends, speaker = words.start, words.end, words.speaker
+        for speaker_id in words.speakers()[0].tolist():
+            which = speaker == speaker_id
+            samples = np.concatenate([audio.clip(start, end) for start, end in zip(starts[which], ends[which])])
+            vector, seconds = self.extractor.embed(samples)
+            if vector is None or seconds < self.min_seconds:
+                continue
+            prints[speaker_id] = vector, seconds
+            voiceprint = self.speakers.get(speaker_id)
+            if voiceprint is None:
+                voiceprint = self.speakers[speaker_id] = Voiceprint(len(vector))
+            voiceprint.add(vector, seconds)
+        return prints
+
+    @staticmethod
+    def similarity(vector, enrolled):
+        """Cosine similarity of one voiceprint vector to an enrolled Voiceprint"""
+        return float(vector @ enrolled.vector)
+
+    def speaker_similarity(self, speaker_id, enrolled):
+        """Cached cosine similarity of a speaker ID's running voiceprint to an enrolled Voiceprint"""
+        voiceprint = self.speakers.get(speaker_id)
+        if voiceprint is None:
+            return None
+        key = speaker_id, enrolled
+        cached = self._similarity.get(key)
+        if cached is not None and cached[0] == voiceprint.version and cached[1] == enrolled.version:
+            return cached[2]
+        value = self.similarity(voiceprint.vector, enrolled)
+        self._similarity[key] = voiceprint.version, enrolled.version, value
+        return value
+
+    def best_match(self, speaker_ids, enrolled):
+        """(speaker ID, similarity) of the ID most like an enrolled Voiceprint, if above match_threshold"""
+        best_id, best = None, self.match_threshold
+        for speaker_id in speaker_ids:
+            value = self.speaker_similarity(speaker_id, enrolled)
+            if value is not None and value >= best:
+                best_id, best = speaker_id, value
+        return (best_id, best) if best_id is not None else (None, None)
@@ -0,0 +1,166 @@
+import datetime
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from voiceprint import Voiceprint
+
+try:
+    import fcntl  # POSIX advisory locks between processes sharing a store
+except ImportError:
+    fcntl = None
+
+# Bump VOICEPRINT_FORMAT for incompatible changes to the files below
+VOICEPRINT_FORMAT = 1
+
+DEFAULT_VOICEPRINT_DIR = Path(os.environ.get("VOICE_FILTER_DATA_DIR",
+                                             Path.home() / ".local" / "share" / "voice_filter")) / "voiceprints"
+
+# One lock per store directory for every VoiceprintStore in this process
+_directory_locks = {}
+_directory_locks_guard = threading.Lock()
+
+def directory_lock(directory):
+    key = os.path.abspath(directory)
+    with _directory_locks_guard:
+        return _directory_locks.setdefault(key, threading.RLock())
+
+class VoiceprintStore:
+    """Enrolled user voiceprints on disk, so the Stage 5 lock survives restarts.
+
+    A profiles-*.npy matrix holds one float32 row per user and is opened
+    memory-mapped; index.json names that matrix and maps user names to its
+    rows, with the seconds of voice behind each profile and the extractor
+    signature the rows were computed with. Profiles from a different
+    extractor are ignored. Every save writes a new, uniquely named matrix and
+    then renames a new index into place, so the index is the single switch:
+    a reader never pairs one write's index with another write's rows. A
+    reader that finds its matrix already cleaned up re-reads the index.
+    Writers re-read the store under a lock (a thread lock per directory plus
+    a file lock where the OS has one) and merge their change into it, so
+    sessions or processes sharing a directory keep each other's users.
+    """
+
+    def __init__(self, directory=None, signature=None):
+        self.directory = Path(directory or DEFAULT_VOICEPRINT_DIR)
+        self.signature = signature
+        self.users = {}    # user -> {'row', 'seconds', 'updated'}
+        self.rows = None   # memory-mapped (n_users, size) float32, or None when empty
+        self._lock = directory_lock(self.directory)
+        self.load()
+
+    @property
+    def index_path(self):
+        return self.directory / "index.json"
+
+
+    @contextmanager
+    def locked(self):
+        """Exclusive access to the store directory, for a read-merge-write"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.directory / "store.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load(self):
+        """(Re)read the index and map the profiles; an unreadable or foreign store reads as empty"""
+        with self._lock:
+            self._load()
+
+    def _load(self, attempts=3):
+        self.users, self.rows = {}, None
+        for _ in range(attempts):
+            try:
+                index = json.loads(self.index_path.read_text())
+                if index.get('format') != VOICEPRINT_FORMAT or index.get('signature') != self.signature:
+                    return
+                profiles = index.get('profiles', "profiles.npy")  # stores written before matrices were named
+            except FileNotFoundError:
+                return
+            except Exception as e:
+                print(f"Voiceprint store error: {e}")
+                return
+            try:
+                rows = np.load(self.directory / profiles, mmap_mode='r')
+            except FileNotFoundError:
+                continue  # a writer replaced the store between the two reads; follow the new index
+            except Exception as e:
+                print(f"Voiceprint store error: {e}")
+                return
+            self.users = {user: entry for user, entry in index.get('users', {}).items() if entry['row'] < len(rows)}
+            self.rows = rows
+            return
+        print(f"Voiceprint store error: {self.index_path} kept changing while loading")
+
+    def __contains__(self, user):
+        return user in self.users
+
+    def get(self, user):
+        """The stored Voiceprint of a user, or None"""
+        with self._lock:
+            entry = self.users.get(user)
+            if entry is None:
+                return None
+            return Voiceprint.from_vector(np.array(self.rows[entry['row']], dtype=np.float64), entry['seconds'])
+
+    def save(self, user, voiceprint):
+        """Store (or replace) a user's voiceprint, keeping users others saved meanwhile"""
+        with self.locked():
+            self._load()
+            vectors = {name: np.array(self.rows[entry['row']]) for name, entry in self.users.items()}
+            seconds = {name: entry['seconds'] for name, entry in self.users.items()}
+            vectors[user] = voiceprint.vector
+            seconds[user] = voiceprint.seconds
+            self._write(vectors, seconds, {user})
+
+    def delete(self, user):
+        with self.locked():
+            self._load()
+            if user not in self.users:
+                return
+            vectors = {name: np.array(self.rows[entry['row']]) for name, entry in self.users.items() if name != user}
+            seconds = {name: entry['seconds'] for name, entry in self.users.items() if name != user}
+            self._write(vectors, seconds, set())
+
+    def _write(self, vectors, seconds, updated):
+        self.rows = None  # release the map before replacing the file under it
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Existing users keep their row order and new ones are appended
+        names = sorted(vectors, key=lambda name: self.users[name]['row'] if name in self.users else len(self.users))
+        now = datetime.datetime.now().isoformat(timespec='seconds')
+        users = {name: {'row': row, 'seconds': float(seconds[name]),
+                        'updated': now if name in updated else self.users[name].get('updated')}
+                 for row, name in enumerate(names)}
+
+        # A new matrix under a name of its own, then the index that points into it
+        with tempfile.NamedTemporaryFile(dir=self.directory, prefix="profiles-", suffix=".npy", delete=False) as f:
+            size = len(next(iter(vectors.values()))) if vectors else 0
+            matrix = np.array([vectors[name] for name in names], dtype=np.float32).reshape(len(names), size)
+            np.save(f, matrix)
+        profiles = Path(f.name).name
+
+        with tempfile.NamedTemporaryFile('w', dir=self.directory, prefix="index.", suffix=".tmp", delete=False) as f:
+            f.write(json.dumps({'format': VOICEPRINT_FORMAT, 'signature': self.signature,
+                                'profiles': profiles, 'users': users}, indent=2))
+        os.replace(f.name, self.index_path)
+
+        # Older matrices are unreachable now; readers that still map one keep their mapping
+        for old in self.directory.glob("profiles*.npy"):
+            if old.name != profiles:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass  # still mapped on a platform that refuses; the next save retries
+        self._load()
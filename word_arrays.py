@@ -0,0 +1,100 @@
+from operator import attrgetter, itemgetter
+
+import numpy as np
+
+# Column name -> (dtype, default used when a word lacks the field or it is None)
+WORD_COLUMNS = {
+    'confidence': (np.float64, 0.5),
+    'speaker': (np.int64, 0),
+    'start': (np.float64, 0.0),
+    'end': (np.float64, 0.0),
+}
+
+class WordArrays:
+    """Columnar view of a final result's words, built once and shared by Stages 2, 4 and 5.
+
+    Each column (confidence, speaker, start, end) is filled from the Deepgram
+    word objects (or decoded JSON word dicts) in one C-level pass the first time a stage asks for it, so a
+    result only pays for the fields its stages read. The stages then run
+    vectorized over the columns instead of each walking the word list.
+    """
+
+    __slots__ = ('words', 'transcript_confidence', 'getter', '_columns', '_speakers')
+
+    def __init__(self, words=(), transcript_confidence=None, getter=attrgetter):
+        self.words = words                                  # the source word objects
+        self.transcript_confidence = transcript_confidence  # alternative-level confidence, if any
+        self.getter = getter                                # attrgetter (SDK objects) or itemgetter (dicts)
+        self._columns = {}                                  # name -> ndarray, filled on demand
+        self._speakers = None
+
+    @classmethod
+    def from_words(cls, words, transcript_confidence=None):
+        return cls(words or (), transcript_confidence)
+
+    @classmethod
+    def from_dicts(cls, words, transcript_confidence=None):
+        """Columns over word dicts decoded from websocket JSON"""
+        return cls(words or (), transcript_confidence, itemgetter)
+
+    @classmethod
+    def from_result(cls, result):
+        alternative = result.channel.alternatives[0]
+        return cls(getattr(alternative, 'words', None) or (), getattr(alternative, 'confidence', None))
+
+    def column(self, name):
+        """One column as an ndarray; missing or None fields get the defaults (confidence 0.5, speaker 0)"""
+        values = self._columns.get(name)
+        if values is None:
+            dtype, default = WORD_COLUMNS[name]
+            words = self.words
+            try:
+                values = np.fromiter(map(self.getter(name), words), dtype, len(words))
+                if dtype is np.float64:
+                    # fromiter reads None as NaN in float columns; JSON has no NaN, so it can only be a None
+                    values[np.isnan(values)] = default
+            except (AttributeError, KeyError, TypeError):
+                # Field missing (e.g. diarization off) or None on some words; 0 and 0.0 are real values
+                if self.getter is itemgetter:
+                    fields = (w.get(name) for w in words)
+                else:
+                    fields = (getattr(w, name, None) for w in words)
+                values = np.fromiter((default if value is None else value for value in fields), dtype, len(words))
+            self._columns[name] = values
+        return values
+
+    confidence = property(lambda self: self.column('confidence'))
+    speaker = property(lambda self: self.column('speaker'))
+    start = property(lambda self: self.column('start'))
+    end = property(lambda self: self.column('end'))
+
+    def __len__(self):
+        return len(self.words)
+
+    def speaker_changes(self):
+        """Number of adjacent word pairs with different speakers"""
+        speaker = self.speaker
+        return int(np.count_nonzero(speaker[1:] != speaker[:-1]))
+
+    def alternations(self):
+        """Words where the speaker flips back to the one two words earlier (A B A)"""
+        s = self.speaker
+        if len(s) < 3:
+            return 0
+        return int(np.count_nonzero((s[2:] != s[1:-1]) & (s[1:-1] != s[:-2]) & (s[2:] == s[:-2])))
+
+    def speakers(self):
+        """(speaker IDs in order of first appearance, word count of each) - computed once"""
+        if self._speakers is None:
+            ids, first, counts = np.unique(self.speaker, return_index=True, return_counts=True)
+            order = np.argsort(first, kind='stable')
+            self._speakers = ids[order], counts[order]
+        return self._speakers
+
+    def speaker_count(self):
+        """Number of distinct speakers"""
+        return len(self.speakers()[0])
+
+    def words_of(self, speaker_id):
+        """Word indices spoken by one speaker"""
+        return np.flatnonzero(self.speaker == speaker_id)